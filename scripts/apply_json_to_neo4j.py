@@ -10,96 +10,64 @@ Usage:
     python scripts/apply_json_to_neo4j.py path/to/export.json
 """
 import os
-import json
+import sys
 from pathlib import Path
 from datetime import datetime
 import argparse
-from neo4j import GraphDatabase
 from dotenv import load_dotenv
 
+from load_to_neo4j import Neo4jLoader, primary_label
 
-def get_driver():
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from graph.graph_export import fetch_snapshot, load_records, write_snapshot
+from graph.neo4j_client import get_client
+
+
+def get_credentials():
     load_dotenv()
     uri = os.getenv('NEO4J_URI')
     user = os.getenv('NEO4J_USER')
     password = os.getenv('NEO4J_PASSWORD')
     if not uri or not user or not password:
         raise RuntimeError('Missing Neo4j credentials in environment')
-    return GraphDatabase.driver(uri, auth=(user, password))
+    return uri, user, password
 
 
-def backup_current_graph(limit=5000):
-    # Use the export script's logic via a simple query
-    driver = get_driver()
-    nodes = {}
-    links = []
-    try:
-        with driver.session() as session:
-            query = """
-            MATCH (n)-[r]->(m)
-            RETURN n, r, m
-            LIMIT $limit
-            """
-            result = session.run(query, limit=limit)
-            for record in result:
-                n = record['n']
-                m = record['m']
-                r = record['r']
-                nid = n.get('id') if 'id' in n else str(n.id)
-                mid = m.get('id') if 'id' in m else str(m.id)
-                if nid not in nodes:
-                    nodes[nid] = {'id': nid, 'properties': dict(n), 'group': list(n.labels)[0] if hasattr(n, 'labels') and n.labels else 'Unknown'}
-                if mid not in nodes:
-                    nodes[mid] = {'id': mid, 'properties': dict(m), 'group': list(m.labels)[0] if hasattr(m, 'labels') and m.labels else 'Unknown'}
-                links.append({'source': nid, 'target': mid, 'type': r.type, 'properties': dict(r)})
-    finally:
-        driver.close()
+def backup_current_graph():
+    # Full columnar snapshot of the current graph (same format as export_graph_to_json.py)
+    snapshot = fetch_snapshot(get_client(*get_credentials()).driver)
 
     ts = datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')
-    out_dir = Path('data/backup')
-    out_dir.mkdir(parents=True, exist_ok=True)
-    out_path = out_dir / f'neo4j_backup_{ts}.json'
-    with open(out_path, 'w', encoding='utf-8') as f:
-        json.dump({'meta': {'backup_at': datetime.utcnow().isoformat() + 'Z'}, 'nodes': list(nodes.values()), 'links': links}, f, indent=2, ensure_ascii=False)
+    out_path = Path('data/backup') / f'neo4j_backup_{ts}.json'
+    write_snapshot(snapshot, out_path)
     print(f'Backup written to: {out_path}')
     return out_path
 
 
 def apply_json(path):
-    with open(path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-
-    nodes = data.get('nodes', [])
-    links = data.get('links', [])
+    # Columnar snapshots and older node/link exports are both accepted
+    data = load_records(path)
+    nodes = data['nodes']
+    links = data['links']
 
-    driver = get_driver()
+    # Batched UNWIND writes (shared with load_to_neo4j.py)
+    loader = Neo4jLoader(*get_credentials())
     try:
-        with driver.session() as session:
-            # Create/merge nodes
-            for n in nodes:
-                nid = n.get('id')
-                props = n.get('properties', {})
-                label = n.get('group') or 'Entity'
-                # Use parameterized query
-                q = f"MERGE (x:{label} {{id: $id}}) SET x += $props"
-                session.run(q, id=nid, props=props)
-
-            # Create relationships
-            for r in links:
-                s = r.get('source')
-                t = r.get('target')
-                rtype = r.get('type') or 'RELATED'
-                props = r.get('properties', {})
-                q = """
-                MATCH (a {id: $s}), (b {id: $t})
-                MERGE (a)-[rel:%s]->(b)
-                SET rel += $props
-                """ % rtype
-                session.run(q, s=s, t=t, props=props)
-
+        loader.create_constraints()
+        node_count = loader.merge_nodes([
+            {'label': primary_label([n['group']] if n.get('group') else []), 'id': n.get('id'), 'props': n.get('properties', {})}
+            for n in nodes
+        ])
+        link_count = loader.merge_relationships([
+            {'type': r.get('type') or 'RELATED', 'source_id': r.get('source'),
+             'target_id': r.get('target'), 'props': r.get('properties', {})}
+            for r in links
+        ])
     finally:
-        driver.close()
+        loader.close()
 
+    print(f'Merged {node_count} nodes and {link_count} relationships')
     print('Applied JSON to Neo4j successfully')
 
 
@@ -1,9 +1,36 @@
+"""
+RUSSINT - Neo4j backup / restore (strumieniowo, stała pamięć).
+
+Backup pobiera węzły stronami (keyset po n.id na etykiecie :Node), relacje
+stronami po relacji (keyset po (s.id, elementId(r)) - węzeł-hub nie rozdmuchuje
+strony), rekordy czyta strumieniowo i od razu zapisuje jako skompresowany
+NDJSON (gzip, opcjonalnie zstd):
+najpierw wszystkie linie {"kind": "node"}, potem {"kind": "edge"}.
+Obok powstaje manifest z liczbami i sumami kontrolnymi.
+
+Restore czyta plik linia po linii i zapisuje paczkami UNWIND.
+
+Usage:
+    python scripts/backup_neo4j.py                      # backup do data/backup
+    python scripts/backup_neo4j.py backup --compression zstd
+    python scripts/backup_neo4j.py restore data/backup/neo4j_backup_<ts>.ndjson.gz [--clear]
+"""
+import argparse
+import gzip
+import hashlib
+import io
 import os
 import json
+import sys
 import datetime
-from neo4j import GraphDatabase
+from pathlib import Path
 from dotenv import load_dotenv
 
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from graph.graph_export import BASE_LABEL
+from load_to_neo4j import Neo4jLoader, quote_name
+
 # Load environment variables
 load_dotenv()
 
@@ -11,67 +38,309 @@ NEO4J_URI = os.getenv("NEO4J_URI")
 NEO4J_USER = os.getenv("NEO4J_USER")
 NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD")
 
-def backup_neo4j():
+BACKUP_DIR = Path(__file__).parent.parent / "data" / "backup"
+BACKUP_FORMAT = "russint-neo4j-ndjson"
+BACKUP_VERSION = 1
+PAGE_SIZE = 5000
+
+# Keyset: indeks unikalności na n.id daje zakres >= $after_id; $first wpuszcza id ''
+NODES_PAGE_QUERY = f"""
+MATCH (n:{BASE_LABEL})
+WHERE n.id >= $after_id AND ($first OR n.id > $after_id)
+WITH n ORDER BY n.id LIMIT $limit
+RETURN n.id AS id, labels(n) AS labels, properties(n) AS props
+"""
+
+# Strona = $limit relacji, keyset po (id źródła, elementId relacji)
+EDGES_PAGE_QUERY = f"""
+MATCH (s:{BASE_LABEL})
+WHERE s.id >= $after_id
+WITH s ORDER BY s.id
+MATCH (s)-[r]->(t:{BASE_LABEL})
+WITH s, r, t, elementId(r) AS rel_key
+WHERE $first OR s.id > $after_id OR rel_key > $after_rel
+WITH s, r, t, rel_key ORDER BY s.id, rel_key LIMIT $limit
+RETURN s.id AS source_id, rel_key, type(r) AS type, t.id AS target_id, properties(r) AS props
+"""
+
+# Id nie będące tekstem (liczby, listy) nie porównują się z '' - osobne zapytania.
+# Porównanie różnych typów daje null, więc (n.id >= '') IS NULL wybiera właśnie je.
+OTHER_ID = "{var}.id IS NOT NULL AND ({var}.id >= '') IS NULL"
+
+NODES_OTHER_ID_QUERY = f"""
+MATCH (n:{BASE_LABEL})
+WHERE {OTHER_ID.format(var='n')}
+RETURN n.id AS id, labels(n) AS labels, properties(n) AS props
+"""
+
+EDGES_OTHER_ID_QUERY = f"""
+MATCH (s:{BASE_LABEL})-[r]->(t:{BASE_LABEL})
+WHERE {OTHER_ID.format(var='s')}
+RETURN s.id AS source_id, type(r) AS type, t.id AS target_id, properties(r) AS props
+"""
+
+SKIPPED_NODES_QUERY = f"""
+MATCH (n) WHERE n.id IS NULL OR NOT n:{BASE_LABEL}
+RETURN count(n) AS total,
+       count(CASE WHEN n.id IS NULL THEN 1 END) AS without_id,
+       count(CASE WHEN NOT n:{BASE_LABEL} THEN 1 END) AS without_label
+"""
+
+COMPRESSION_SUFFIX = {'gzip': '.gz', 'zstd': '.zst'}
+
+
+def open_compressed(path, mode, compression):
+    """Strumień tekstowy (utf-8) do pliku gzip/zstd. zstd wymaga pakietu `zstandard`."""
+    if compression == 'gzip':
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    if compression == 'zstd':
+        try:
+            import zstandard
+        except ImportError:
+            raise SystemExit("Kompresja zstd wymaga pakietu: pip install zstandard")
+        raw = open(path, mode + 'b')
+        if mode == 'w':
+            stream = zstandard.ZstdCompressor().stream_writer(raw, closefd=True)
+        else:
+            stream = zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+        return io.TextIOWrapper(stream, encoding='utf-8')
+    raise ValueError(f"Unknown compression: {compression}")
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def iter_pages(session, query, keys, page_size):
+    """
+    Rekordy kolejnych stron zapytania keyset, czytane strumieniowo (bez list()).
+    keys: {parametr: kolumna} - parametry następnej strony to kolumny ostatniego rekordu.
+    """
+    after = {param: '' for param in keys}
+    first = True
+    while True:
+        count = 0
+        for record in session.run(query, limit=page_size, first=first, **after):
+            count += 1
+            last = record
+            yield record
+        if count < page_size:
+            return
+        after = {param: last[column] for param, column in keys.items()}
+        first = False
+
+
+def backup_neo4j(out_dir=BACKUP_DIR, compression='gzip', page_size=PAGE_SIZE):
     if not all([NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD]):
         print("Error: Missing Neo4j credentials in .env")
         return
 
-    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
-    
-    data = {
-        "meta": {
-            "generated_at": datetime.datetime.now().isoformat(),
-            "type": "full_backup"
-        },
-        "nodes": [],
-        "edges": []
+    loader = Neo4jLoader(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD)
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    filepath = out_dir / f"neo4j_backup_{timestamp}.ndjson{COMPRESSION_SUFFIX[compression]}"
+    manifest = {
+        "format": BACKUP_FORMAT,
+        "version": BACKUP_VERSION,
+        "generated_at": datetime.datetime.now().isoformat(),
+        "file": filepath.name,
+        "compression": compression,
+        "nodes": 0,
+        "edges": 0,
+        "labels": {},
+        "relationship_types": {},
+        "non_string_ids": 0
     }
+    content_digest = hashlib.sha256()
 
-    with driver.session() as session:
-        # Fetch all nodes
-        print("Fetching nodes...")
-        result = session.run("MATCH (n) RETURN n")
-        for record in result:
-            node = record["n"]
-            node_data = dict(node)
-            # Ensure id is present (it should be a property, not the internal id)
-            if "id" not in node_data:
-                # If no id property, use element_id or skip? 
-                # The project schema relies on 'id' property.
-                # We will warn if missing.
-                pass
-            
-            # Add labels
-            node_data["labels"] = list(node.labels)
-            data["nodes"].append(node_data)
-
-        # Fetch all relationships
-        print("Fetching relationships...")
-        result = session.run("MATCH ()-[r]->() RETURN r, startNode(r).id as source_id, endNode(r).id as target_id")
-        for record in result:
-            rel = record["r"]
-            rel_data = dict(rel)
-            rel_data["source_id"] = record["source_id"]
-            rel_data["target_id"] = record["target_id"]
-            rel_data["relationship_type"] = rel.type
-            data["edges"].append(rel_data)
-
-    driver.close()
-
-    # Ensure backup directory exists
-    backup_dir = os.path.join("data", "backup")
-    os.makedirs(backup_dir, exist_ok=True)
+    def write(out, record):
+        # Typy Neo4j bez odpowiednika w JSON (daty, punkty) zapisywane jako tekst
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        content_digest.update(line.encode('utf-8'))
+        out.write(line)
 
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"neo4j_backup_{timestamp}.json"
-    filepath = os.path.join(backup_dir, filename)
+    def write_node(out, record):
+        labels = [l for l in record['labels'] if l != BASE_LABEL]
+        write(out, {"kind": "node", "id": record['id'], "labels": labels, "props": record['props']})
+        manifest["nodes"] += 1
+        for label in labels:
+            manifest["labels"][label] = manifest["labels"].get(label, 0) + 1
+
+    def write_edge(out, record):
+        write(out, {"kind": "edge", "type": record['type'], "source_id": record['source_id'],
+                    "target_id": record['target_id'], "props": record['props']})
+        manifest["edges"] += 1
+        types = manifest["relationship_types"]
+        types[record['type']] = types.get(record['type'], 0) + 1
 
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    try:
+        with loader.driver.session() as session, open_compressed(filepath, 'w', compression) as out:
+            print("Fetching nodes...")
+            for record in iter_pages(session, NODES_PAGE_QUERY, {'after_id': 'id'}, page_size):
+                write_node(out, record)
+            for record in session.run(NODES_OTHER_ID_QUERY):
+                write_node(out, record)
+                manifest["non_string_ids"] += 1
+
+            print("Fetching relationships...")
+            edge_keys = {'after_id': 'source_id', 'after_rel': 'rel_key'}
+            for record in iter_pages(session, EDGES_PAGE_QUERY, edge_keys, page_size):
+                write_edge(out, record)
+            for record in session.run(EDGES_OTHER_ID_QUERY):
+                write_edge(out, record)
+
+            # Węzły bez `id` albo bez :Node (baza przed migrate_node_label.py) są pomijane
+            skipped = session.run(SKIPPED_NODES_QUERY).single()
+            manifest["skipped_nodes"] = skipped['total']
+            manifest["skipped_without_id"] = skipped['without_id']
+            manifest["skipped_without_label"] = skipped['without_label']
+    finally:
+        loader.close()
+
+    manifest["content_sha256"] = content_digest.hexdigest()
+    manifest["sha256"] = file_sha256(filepath)
+    manifest_path = filepath.with_name(f"neo4j_backup_{timestamp}.manifest.json")
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
 
     print(f"Backup saved to: {filepath}")
-    print(f"Nodes: {len(data['nodes'])}")
-    print(f"Edges: {len(data['edges'])}")
+    print(f"Manifest: {manifest_path}")
+    print(f"Nodes: {manifest['nodes']}")
+    print(f"Edges: {manifest['edges']}")
+    if manifest["non_string_ids"]:
+        print(f"Note: {manifest['non_string_ids']} nodes have a non-string `id` (backed up as is)")
+    if manifest["skipped_without_id"]:
+        print(f"Warning: {manifest['skipped_without_id']} nodes without `id` were not backed up")
+    if manifest["skipped_without_label"]:
+        print(f"Warning: {manifest['skipped_without_label']} nodes without :{BASE_LABEL} label were not backed up "
+              f"(run scripts/migrate_node_label.py)")
+    return filepath
+
+
+def manifest_for(filepath):
+    """Manifest zapisany obok pliku backupu (None, jeśli go nie ma)."""
+    name = filepath.name.split('.ndjson')[0]
+    manifest_path = filepath.with_name(f"{name}.manifest.json")
+    if not manifest_path.exists():
+        return None
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class RestoreLoader(Neo4jLoader):
+    """Neo4jLoader z zapisem węzłów o wielu etykietach (jak w backupie)."""
+
+    def restore_nodes(self, rows):
+        by_labels = {}
+        for row in rows:
+            by_labels.setdefault(tuple(row['labels']), []).append({'id': row['id'], 'props': row['props']})
+
+        count = 0
+        for labels, label_rows in by_labels.items():
+            set_labels = ''.join(f", n:{quote_name(label)}" for label in labels)
+            query = f"""
+            UNWIND $rows AS row
+            MERGE (n:{BASE_LABEL} {{id: row.id}})
+            SET n += row.props{set_labels}
+            RETURN count(*) AS count
+            """
+            count += self._run_batches(query, label_rows)
+        return count
+
+
+def restore_neo4j(filepath, clear=False, batch_size=None):
+    if not all([NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD]):
+        print("Error: Missing Neo4j credentials in .env")
+        return
+
+    filepath = Path(filepath)
+    compression = 'zstd' if filepath.suffix == '.zst' else 'gzip'
+    manifest = manifest_for(filepath)
+    if manifest:
+        if manifest.get("format") != BACKUP_FORMAT:
+            raise SystemExit(f"Unknown backup format: {manifest.get('format')}")
+        if file_sha256(filepath) != manifest["sha256"]:
+            raise SystemExit("Checksum mismatch - backup file is damaged")
+        compression = manifest["compression"]
+    else:
+        print("Warning: manifest not found, restoring without checksum verification")
+
+    loader = RestoreLoader(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD)
+    if batch_size:
+        loader.batch_size = batch_size
+    counts = {"nodes": 0, "edges": 0}
+    content_digest = hashlib.sha256()
+    try:
+        if clear:
+            loader.clear_database()
+        loader.create_constraints()
+
+        nodes, edges = [], []
+        with open_compressed(filepath, 'r', compression) as f:
+            for line in f:
+                content_digest.update(line.encode('utf-8'))
+                record = json.loads(line)
+                if record["kind"] == "node":
+                    nodes.append(record)
+                    if len(nodes) >= loader.batch_size:
+                        counts["nodes"] += loader.restore_nodes(nodes)
+                        nodes = []
+                else:
+                    # Wszystkie węzły są w pliku przed relacjami
+                    if nodes:
+                        counts["nodes"] += loader.restore_nodes(nodes)
+                        nodes = []
+                    edges.append(record)
+                    if len(edges) >= loader.batch_size:
+                        counts["edges"] += loader.merge_relationships(edges)
+                        edges = []
+                        print(f"  ... {counts['nodes']} nodes, {counts['edges']} edges")
+        if nodes:
+            counts["nodes"] += loader.restore_nodes(nodes)
+        if edges:
+            counts["edges"] += loader.merge_relationships(edges)
+    finally:
+        loader.close()
+
+    print(f"Restored from: {filepath}")
+    print(f"Nodes: {counts['nodes']}")
+    print(f"Edges: {counts['edges']}")
+    if manifest:
+        if content_digest.hexdigest() != manifest["content_sha256"]:
+            print("Warning: content checksum differs from manifest")
+        if (counts["nodes"], counts["edges"]) != (manifest["nodes"], manifest["edges"]):
+            print(f"Warning: manifest lists {manifest['nodes']} nodes, {manifest['edges']} edges")
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RUSSINT Neo4j backup/restore (NDJSON)")
+    subparsers = parser.add_subparsers(dest='command')
+
+    backup_parser = subparsers.add_parser('backup', help='Backup the graph (default)')
+    backup_parser.add_argument('--out-dir', type=Path, default=BACKUP_DIR)
+    backup_parser.add_argument('--compression', choices=sorted(COMPRESSION_SUFFIX), default='gzip')
+    backup_parser.add_argument('--page-size', type=int, default=PAGE_SIZE)
+
+    restore_parser = subparsers.add_parser('restore', help='Restore a backup file')
+    restore_parser.add_argument('file', type=Path)
+    restore_parser.add_argument('--clear', action='store_true', help='Delete all nodes before restoring')
+    restore_parser.add_argument('--batch-size', type=int)
+
+    args = parser.parse_args()
+    if args.command == 'restore':
+        restore_neo4j(args.file, clear=args.clear, batch_size=args.batch_size)
+    elif args.command == 'backup':
+        backup_neo4j(args.out_dir, args.compression, args.page_size)
+    else:
+        backup_neo4j()
+
 
 if __name__ == "__main__":
-    backup_neo4j()
+    main()
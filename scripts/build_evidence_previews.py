@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Generate WebP previews and thumbnails (db/evidence_media.py) for screenshots
+already in data/evidence. New screenshots get them when collected; this fills
+in the older ones. Existing previews are kept unless --force. Requires Pillow.
+
+Usage:
+  python scripts/build_evidence_previews.py
+  python scripts/build_evidence_previews.py --root data/evidence/facebook/BraterstwaLudziWolnych --workers 4
+"""
+
+import sys
+import argparse
+import os
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from db.evidence_catalog import EVIDENCE_ROOT
+from db.evidence_media import EvidenceWriter, HAS_PIL, PREVIEW_DIRS, DEFAULT_WORKERS
+
+SCREENSHOT_SUFFIXES = ('.png', '.jpg', '.jpeg')
+
+
+def find_masters(root: Path):
+    """Screenshot files under root, skipping preview directories."""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in PREVIEW_DIRS]
+        for name in filenames:
+            if Path(name).suffix.lower() in SCREENSHOT_SUFFIXES:
+                yield Path(dirpath) / name
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build WebP previews/thumbnails for evidence screenshots.')
+    parser.add_argument('--root', type=Path, default=EVIDENCE_ROOT, help='Directory to process (default: data/evidence)')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='Encoding threads')
+    parser.add_argument('--force', action='store_true', help='Rebuild existing previews')
+    args = parser.parse_args()
+
+    if not HAS_PIL:
+        print("❌ Pillow is required: pip install Pillow")
+        sys.exit(1)
+
+    masters = list(find_masters(args.root.resolve()))
+    writer = EvidenceWriter(workers=args.workers)
+    futures = [writer.add_previews(path, overwrite=args.force) for path in masters]
+
+    built = failed = 0
+    master_bytes = preview_bytes = 0
+    for path, future in zip(masters, futures):
+        try:
+            written = future.result()
+        except Exception as e:
+            failed += 1
+            print(f"   [!] {path.name}: {e}")
+            continue
+        if written:
+            built += 1
+            master_bytes += path.stat().st_size
+            preview_bytes += sum(p.stat().st_size for p in written)
+    writer.close()
+
+    print(f"✅ Previews built: {built}, up to date: {len(masters) - built - failed}, failed: {failed}")
+    if built:
+        print(f"   Screenshots: {master_bytes / 1e6:.1f} MB -> previews + thumbnails: {preview_bytes / 1e6:.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
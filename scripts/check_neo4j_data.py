@@ -3,8 +3,14 @@
 
 from neo4j import GraphDatabase
 import os
+import sys
+from pathlib import Path
 from dotenv import load_dotenv
 
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from graph.graph_export import BASE_LABEL
+
 load_dotenv()
 
 driver = GraphDatabase.driver(
@@ -27,7 +33,7 @@ with driver.session() as session:
     
     # Przykładowe relacje
     print("\n📊 PRZYKŁADOWE RELACJE:")
-    result = session.run('MATCH (a)-[r]->(b) RETURN labels(a)[0] as from_type, a.name as from_name, type(r) as rel_type, labels(b)[0] as to_type, b.name as to_name LIMIT 10')
+    result = session.run(f'MATCH (a)-[r]->(b) RETURN [l IN labels(a) WHERE l <> "{BASE_LABEL}"][0] as from_type, a.name as from_name, type(r) as rel_type, [l IN labels(b) WHERE l <> "{BASE_LABEL}"][0] as to_type, b.name as to_name LIMIT 10')
     for record in result:
         print(f"   ({record['from_type']}: {record['from_name']}) -[{record['rel_type']}]-> ({record['to_type']}: {record['to_name']})")
 
@@ -1,16 +1,21 @@
 from neo4j import GraphDatabase
 import os
+import sys
+from pathlib import Path
 from dotenv import load_dotenv
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from db.evidence_catalog import get_evidence_catalog
+
 load_dotenv()
 
 uri = os.getenv("NEO4J_URI")
 user = os.getenv("NEO4J_USER")
 password = os.getenv("NEO4J_PASSWORD")
 
-driver = GraphDatabase.driver(uri, auth=(user, password))
 
-def check_missing_screenshots(tx):
+def check_missing_screenshots(tx, catalog):
     print("--- Posts with missing screenshots ---")
     result = tx.run("""
         MATCH (n:Post) 
@@ -20,8 +25,20 @@ def check_missing_screenshots(tx):
     """)
     for record in result:
         print(f"ID: {record['n.id']}, Name: {record['n.name']}")
+        # Indexed lookup in the evidence catalog instead of globbing data/evidence
+        for row in catalog.find_by_post_id(record['n.id']):
+            print(f"    candidate: {row['path']}")
+
+
+def main():
+    catalog = get_evidence_catalog()
+    catalog.scan()
+    driver = GraphDatabase.driver(uri, auth=(user, password))
+    with driver.session() as session:
+        session.execute_read(check_missing_screenshots, catalog)
+    driver.close()
+    catalog.close()
 
-with driver.session() as session:
-    session.execute_read(check_missing_screenshots)
 
-driver.close()
+if __name__ == '__main__':
+    main()
@@ -2,87 +2,41 @@
 """Export Neo4j graph to a JSON file for offline editing.
 
 Usage:
-    python scripts/export_graph_to_json.py [--limit N] [--out path]
+    python scripts/export_graph_to_json.py [--limit N] [--workers N] [--format columnar|records] [--out path]
 
 Creates a file under `data/processed/graph_exports/` with timestamp.
+The whole graph is paged through (src/graph/graph_export.py); --limit caps relationships.
 """
-import os
+import sys
 import json
 from pathlib import Path
 from datetime import datetime
 import argparse
-from neo4j import GraphDatabase
-from dotenv import load_dotenv
 
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
 
-def get_driver():
-    load_dotenv()
-    uri = os.getenv('NEO4J_URI')
-    user = os.getenv('NEO4J_USER')
-    password = os.getenv('NEO4J_PASSWORD')
-    if not uri or not user or not password:
-        raise RuntimeError('Missing Neo4j credentials in environment')
-    return GraphDatabase.driver(uri, auth=(user, password))
+from graph.graph_export import PAGE_SIZE, fetch_snapshot, snapshot_records, write_snapshot
+from graph.neo4j_client import get_client
 
 
-def fetch_graph(limit=1000):
-    driver = get_driver()
-    nodes = {}
-    links = []
-    try:
-        with driver.session() as session:
-            query = """
-            MATCH (n)-[r]->(m)
-            RETURN n, r, m
-            LIMIT $limit
-            """
-            result = session.run(query, limit=limit)
-            for record in result:
-                n = record['n']
-                m = record['m']
-                r = record['r']
-
-                def proc(node):
-                    nid = None
-                    try:
-                        nid = node.get('id')
-                    except Exception:
-                        nid = str(node.id)
-                    props = dict(node)
-                    labels = list(node.labels) if hasattr(node, 'labels') else []
-                    return nid or str(node.id), {
-                        'id': nid or str(node.id),
-                        'name': props.get('name') or props.get('title') or str(node.id),
-                        'group': labels[0] if labels else 'Unknown',
-                        'properties': props
-                    }
-
-                src_id, src_node = proc(n)
-                tgt_id, tgt_node = proc(m)
-                if src_id not in nodes:
-                    nodes[src_id] = src_node
-                if tgt_id not in nodes:
-                    nodes[tgt_id] = tgt_node
-
-                links.append({
-                    'source': src_id,
-                    'target': tgt_id,
-                    'type': r.type,
-                    'properties': dict(r)
-                })
-    finally:
-        driver.close()
-
-    return {'nodes': list(nodes.values()), 'links': links}
+def fetch_graph(limit=None, workers=1, page_size=PAGE_SIZE):
+    """Columnar snapshot of the graph (all of it when limit is None)."""
+    return fetch_snapshot(get_client().driver, limit=limit, page_size=page_size, workers=workers)
 
 
 def main():
     parser = argparse.ArgumentParser()
-    parser.add_argument('--limit', type=int, default=2000)
+    parser.add_argument('--limit', type=int, default=None,
+                        help='Max relationships (default: whole graph)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Parallel read sessions (id ranges) for full exports')
+    parser.add_argument('--page-size', type=int, default=PAGE_SIZE)
+    parser.add_argument('--format', choices=['columnar', 'records'], default='columnar',
+                        help='columnar snapshot (compact) or node/link records')
     parser.add_argument('--out', type=str, default=None)
     args = parser.parse_args()
 
-    data = fetch_graph(limit=args.limit)
+    snapshot = fetch_graph(limit=args.limit, workers=args.workers, page_size=args.page_size)
 
     ts = datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')
     out_dir = Path('data/processed/graph_exports')
@@ -90,19 +44,14 @@ def main():
     filename = args.out or f'export_graph_{ts}.json'
     out_path = out_dir / filename
 
-    payload = {
-        'meta': {
-            'exported_at': datetime.utcnow().isoformat() + 'Z',
-            'limit': args.limit
-        },
-        'nodes': data['nodes'],
-        'links': data['links']
-    }
-
-    with open(out_path, 'w', encoding='utf-8') as f:
-        json.dump(payload, f, indent=2, ensure_ascii=False)
+    if args.format == 'columnar':
+        write_snapshot(snapshot, out_path)
+    else:
+        payload = {'meta': snapshot['meta'], **snapshot_records(snapshot)}
+        with open(out_path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, indent=2, ensure_ascii=False, default=str)
 
-    print(f'Exported graph to: {out_path}')
+    print(f"Exported graph to: {out_path} ({snapshot['meta']['nodes']} nodes, {snapshot['meta']['links']} links)")
 
 
 if __name__ == '__main__':
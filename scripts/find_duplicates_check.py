@@ -1,7 +1,13 @@
 from neo4j import GraphDatabase
 import os
+import sys
+from pathlib import Path
 from dotenv import load_dotenv
 
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from graph.graph_export import BASE_LABEL
+
 load_dotenv()
 
 NEO4J_URI = os.getenv("NEO4J_URI", "neo4j+s://1f589f65.databases.neo4j.io")
@@ -12,11 +18,11 @@ driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
 
 def list_potential_duplicates():
     with driver.session() as session:
-        # 1. Check for nodes with only 'Entity' label (and no specific label)
+        # 1. Check for nodes with only 'Entity' label (and no specific label; shared :Node is ignored)
         print("--- Nodes with only generic 'Entity' label ---")
-        result = session.run("""
+        result = session.run(f"""
             MATCH (n:Entity)
-            WHERE size(labels(n)) = 1
+            WHERE size([l IN labels(n) WHERE l <> '{BASE_LABEL}']) = 1
             RETURN n.id, n.name, labels(n)
         """)
         for record in result:
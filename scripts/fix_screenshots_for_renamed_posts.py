@@ -1,7 +1,13 @@
 from neo4j import GraphDatabase
 import os
+import sys
+from pathlib import Path
 from dotenv import load_dotenv
 
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from graph.graph_export import BASE_LABEL
+
 load_dotenv()
 
 uri = os.getenv("NEO4J_URI")
@@ -37,7 +43,7 @@ def fix_screenshots(uri, user, password, mappings):
                 print(f"Updating {new_id} with screenshot: {screenshot_path}")
                 
                 session.run(
-                    "MATCH (n {id: $new_id}) SET n.screenshot = $screenshot RETURN n",
+                    f"MATCH (n:{BASE_LABEL} {{id: $new_id}}) SET n.screenshot = $screenshot RETURN n",
                     new_id=new_id, screenshot=screenshot_path
                 )
                 
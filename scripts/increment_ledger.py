@@ -0,0 +1,109 @@
+"""
+RUSSINT - rejestr plików przyrostowych (graph_increments) załadowanych do Neo4j.
+
+Wpis na plik: ścieżka względna + hash treści + wersja loadera + status fazy
+('pending' -> 'nodes' -> 'done'). Plik zmieniony po załadowaniu (inny hash) albo
+załadowany starszą wersją loadera jest ładowany ponownie; plik przerwany po fazie
+węzłów dostaje przy wznowieniu tylko fazę relacji.
+
+Rejestr to dziennik JSON Lines: każda zmiana statusu jest dopisywana jedną linią
+(ostatni wpis dla ścieżki wygrywa), a compact() przepisuje go do bieżącego stanu.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+PHASE_PENDING = 'pending'
+PHASE_NODES = 'nodes'
+PHASE_DONE = 'done'
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """sha1 zawartości pliku."""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class IncrementLedger:
+    """Stan ładowania plików przyrostowych (dziennik JSON Lines)."""
+
+    def __init__(self, ledger_file, base_dir, loader_version):
+        self.ledger_file = Path(ledger_file)
+        self.base_dir = Path(base_dir)
+        self.loader_version = loader_version
+        self.entries = {}
+        if self.ledger_file.exists():
+            with open(self.ledger_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Ucięta ostatnia linia po przerwanym zapisie
+                        continue
+                    self.entries[entry['path']] = entry
+
+    def key(self, path):
+        return Path(path).relative_to(self.base_dir).as_posix()
+
+    def check(self, path):
+        """
+        Faza, od której trzeba (ponownie) załadować plik: PHASE_PENDING, PHASE_NODES
+        albo PHASE_DONE (nic do zrobienia). Hash liczony tylko, gdy zmienił się rozmiar/mtime.
+        """
+        stat = Path(path).stat()
+        entry = self.entries.get(self.key(path))
+        if entry is None or entry.get('loader_version') != self.loader_version:
+            return PHASE_PENDING
+        if entry.get('size') != stat.st_size or entry.get('mtime') != stat.st_mtime_ns:
+            if entry.get('hash') != file_hash(path):
+                return PHASE_PENDING
+            # Ta sama treść (np. touch) - zapamiętaj nowe mtime bez zmiany fazy
+            self.record(path, entry['phase'], hash=entry['hash'],
+                        nodes=entry.get('nodes'), edges=entry.get('edges'))
+        if entry['phase'] == PHASE_DONE:
+            return PHASE_DONE
+        return PHASE_NODES if entry['phase'] == PHASE_NODES else PHASE_PENDING
+
+    def record(self, path, phase, hash=None, **counts):
+        """Dopisuje (i od razu utrwala) status pliku."""
+        stat = Path(path).stat()
+        previous = self.entries.get(self.key(path), {})
+        entry = {
+            'path': self.key(path),
+            'hash': hash or previous.get('hash') or file_hash(path),
+            'size': stat.st_size,
+            'mtime': stat.st_mtime_ns,
+            'loader_version': self.loader_version,
+            'phase': phase,
+            'updated_at': datetime.now().isoformat()
+        }
+        entry.update({k: v for k, v in counts.items() if v is not None})
+        self.entries[entry['path']] = entry
+        self.ledger_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.ledger_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def start(self, path, digest):
+        """Nowa lub zmieniona treść pliku (digest: sha1 wczytanych bajtów) - zaczyna od fazy węzłów."""
+        self.record(path, PHASE_PENDING, hash=digest)
+
+    def compact(self):
+        """Przepisuje dziennik do jednego wpisu na istniejący plik."""
+        entries = [e for p, e in sorted(self.entries.items()) if (self.base_dir / p).exists()]
+        self.entries = {e['path']: e for e in entries}
+        tmp_file = self.ledger_file.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        os.replace(tmp_file, self.ledger_file)
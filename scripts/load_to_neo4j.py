@@ -4,11 +4,19 @@ RUSSINT - Neo4j Loader
 """
 
 from neo4j import GraphDatabase
+import argparse
+import hashlib
 import json
+import sys
 from pathlib import Path
 from datetime import datetime
 import os
 
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from graph.graph_export import BASE_LABEL
+from increment_ledger import IncrementLedger, PHASE_PENDING, PHASE_NODES, PHASE_DONE
+
 # Załaduj zmienne z .env jeśli istnieje
 try:
     from dotenv import load_dotenv
@@ -22,7 +30,10 @@ DATA_DIR = BASE_DIR / "data"
 RAW_DIR = DATA_DIR / "raw"
 PROCESSED_DIR = DATA_DIR / "processed"
 INCREMENTS_DIR = PROCESSED_DIR / "graph_increments"
-TRACKING_FILE = PROCESSED_DIR / "loaded_files.txt"
+# Rejestr załadowanych plików przyrostowych (zastępuje loaded_files.txt)
+LEDGER_FILE = PROCESSED_DIR / "increment_ledger.jsonl"
+# Odciski (hash) węzłów i relacji z ostatniej synchronizacji
+SYNC_STATE_FILE = PROCESSED_DIR / "neo4j_sync_state.json"
 
 ENTITIES_FILE = RAW_DIR / "graph_nodes.json"
 RELATIONSHIPS_FILE = RAW_DIR / "graph_edges.json"
@@ -32,34 +43,460 @@ NEO4J_URI = os.getenv("NEO4J_URI", "neo4j+s://1f589f65.databases.neo4j.io")
 NEO4J_USER = os.getenv("NEO4J_USER", "neo4j")
 NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD", "YOUR_PASSWORD_HERE")
 
-print(f"🔗 Łączę z: {NEO4J_URI}")
-print(f"👤 Użytkownik: {NEO4J_USER}")
+# Podnieś, gdy zmienia się sposób budowania węzłów/relacji - pliki zostaną załadowane ponownie
+LOADER_VERSION = 2
+
+# Wiersze wysyłane w jednej transakcji (UNWIND)
+BATCH_SIZE = 2000
+
+# Wspólna etykieta wszystkich węzłów z `id` (BASE_LABEL) - jeden indeks unikalności dla wyszukiwania po id
+NODE_ID_CONSTRAINT = f"CREATE CONSTRAINT node_id IF NOT EXISTS FOR (n:{BASE_LABEL}) REQUIRE n.id IS UNIQUE"
+
+# Mapowanie typów na etykiety Neo4j
+LABEL_MAP = {
+    'organization': 'Organization',
+    'person': 'Person',
+    'profile': 'Profile',
+    'event': 'Event',
+    'post': 'Post',
+    'page': 'Site',     # Map page to Site as requested
+    'group': 'Group',
+    'channel': 'Channel',
+    'site': 'Site',
+    'video': 'Video'
+}
+
+# Dodatkowe pola węzłów kopiowane, jeśli występują
+OPTIONAL_ENTITY_FIELDS = [
+    'url', 'platform', 'category', 'date_start', 'date_end',
+    'location', 'date_posted', 'handle', 'parent_org_id'
+]
+
+
+def check_credentials():
+    """Wypisuje dane połączenia i kończy, jeśli nie ustawiono hasła."""
+    print(f"🔗 Łączę z: {NEO4J_URI}")
+    print(f"👤 Użytkownik: {NEO4J_USER}")
+
+    if NEO4J_PASSWORD == "YOUR_PASSWORD_HERE":
+        print("⚠️  UWAGA: Nie ustawiono hasła!")
+        print("   Możesz:")
+        print("   1. Ustawić zmienną środowiskową: $env:NEO4J_PASSWORD='twoje_haslo'")
+        print("   2. Lub edytować NEO4J_PASSWORD w tym pliku")
+        exit(1)
+
+
+def quote_name(name):
+    """Etykieta / typ relacji w backtickach (bezpieczne wstawienie do Cypher)."""
+    return '`' + str(name).replace('`', '``') + '`'
+
+
+def primary_label(labels, default='Entity'):
+    """Etykieta typu węzła (pomija wspólną etykietę BASE_LABEL)."""
+    for label in labels:
+        if label != BASE_LABEL:
+            return label
+    return default
+
+
+def sanitize_props(props):
+    """Zamienia zagnieżdżone dict/listy na JSON (Neo4j przyjmuje tylko prymitywy i ich listy)."""
+    props = dict(props)
+    for k, v in list(props.items()):
+        if isinstance(v, dict):
+            try:
+                props[k] = json.dumps(v, ensure_ascii=False)
+            except Exception:
+                props.pop(k, None)
+        elif isinstance(v, list):
+            if not all(isinstance(i, (str, int, float, bool, type(None))) for i in v):
+                try:
+                    props[k] = json.dumps(v, ensure_ascii=False)
+                except Exception:
+                    props.pop(k, None)
+    return props
+
+
+def fingerprint(value):
+    """Stabilny hash (sha1) wartości JSON - niezależny od kolejności kluczy."""
+    data = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+
+def increment_items(data):
+    """(nodes, edges) z pliku przyrostowego: dict z 'nodes'/'edges' albo sama lista węzłów/relacji."""
+    if isinstance(data, dict):
+        return data.get('nodes') or [], data.get('edges') or []
+    if isinstance(data, list) and data:
+        if 'entity_type' in data[0]:
+            return data, []
+        if 'source_id' in data[0]:
+            return [], data
+    return [], []
+
+
+def edge_key(row):
+    """Klucz relacji: (source_id, type, target_id) - MERGE tworzy jedną taką relację."""
+    return json.dumps([row['source_id'], row['type'], row['target_id']], ensure_ascii=False)
+
+
+def collect_graph(entities_file=ENTITIES_FILE, relationships_file=RELATIONSHIPS_FILE,
+                  increments_dir=INCREMENTS_DIR):
+    """
+    Docelowy stan grafu z plików: seed + wszystkie pliki przyrostowe (wg nazwy).
+    Późniejsze wpisy nadpisują właściwości wcześniejszych, jak kolejne MERGE ... SET +=.
+    Zwraca (nodes {id: row}, edges {edge_key: row}).
+    """
+    node_lists = []
+    edge_lists = []
+    for path in (entities_file, relationships_file):
+        if path.exists():
+            with open(path, 'r', encoding='utf-8') as f:
+                file_nodes, file_edges = increment_items(json.load(f))
+            node_lists.append(file_nodes)
+            edge_lists.append(file_edges)
+    if increments_dir.exists():
+        for json_file in sorted(increments_dir.glob('**/*.json')):
+            try:
+                with open(json_file, 'r', encoding='utf-8') as f:
+                    file_nodes, file_edges = increment_items(json.load(f))
+            except Exception as e:
+                print(f"❌ Pomijam {json_file.name}: {e}")
+                continue
+            node_lists.append(file_nodes)
+            edge_lists.append(file_edges)
+
+    nodes = {}
+    for entity in (e for file_nodes in node_lists for e in file_nodes):
+        row = entity_row(entity)
+        if row['id'] is None:
+            continue
+        if row['id'] in nodes:
+            nodes[row['id']]['props'].update(row['props'])
+            nodes[row['id']]['label'] = row['label']
+        else:
+            nodes[row['id']] = row
+
+    edges = {}
+    for relationship in (r for file_edges in edge_lists for r in file_edges):
+        row = relationship_row(relationship)
+        if not row['source_id'] or not row['target_id']:
+            continue
+        key = edge_key(row)
+        if key in edges:
+            edges[key]['props'].update(row['props'])
+        else:
+            edges[key] = row
+    return nodes, edges
+
+
+def load_sync_state(state_file=SYNC_STATE_FILE):
+    """Stan ostatniej synchronizacji: {'nodes': {id: [label, hash]}, 'edges': {edge_key: hash}}."""
+    if not state_file.exists():
+        return {'nodes': {}, 'edges': {}}
+    with open(state_file, 'r', encoding='utf-8') as f:
+        state = json.load(f)
+    return {'nodes': state.get('nodes', {}), 'edges': state.get('edges', {})}
+
+
+def save_sync_state(state, state_file=SYNC_STATE_FILE):
+    """Zapis stanu (plik tymczasowy + podmiana, żeby przerwany zapis nie zostawił połowy pliku)."""
+    state_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = state_file.with_suffix('.tmp')
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump({'synced_at': datetime.now().isoformat(), **state}, f, ensure_ascii=False)
+    os.replace(tmp_file, state_file)
+
+
+def diff_graph(state, nodes, edges):
+    """
+    Różnica między stanem z ostatniej synchronizacji a docelowym grafem.
+    Relacje do węzłów spoza plików nie trafiają do stanu - są ponawiane przy każdej synchronizacji.
+    Zwraca (diff, new_state).
+    """
+    node_state = {}
+    upsert_nodes, relabel = [], []
+    for node_id, row in nodes.items():
+        node_hash = fingerprint([row['label'], row['props']])
+        node_state[node_id] = [row['label'], node_hash]
+        previous = state['nodes'].get(node_id)
+        if previous == node_state[node_id]:
+            continue
+        upsert_nodes.append(row)
+        if previous and previous[0] != row['label']:
+            relabel.append({'id': node_id, 'label': previous[0]})
+    delete_nodes = [node_id for node_id in state['nodes'] if node_id not in nodes]
+
+    edge_state = {}
+    upsert_edges = []
+    for key, row in edges.items():
+        if row['source_id'] not in nodes or row['target_id'] not in nodes:
+            upsert_edges.append(row)
+            continue
+        edge_state[key] = fingerprint(row['props'])
+        if state['edges'].get(key) != edge_state[key]:
+            upsert_edges.append(row)
+    delete_edges = []
+    for key in state['edges']:
+        if key not in edge_state:
+            source_id, rel_type, target_id = json.loads(key)
+            delete_edges.append({'type': rel_type, 'source_id': source_id, 'target_id': target_id})
+
+    diff = {
+        'upsert_nodes': upsert_nodes,
+        'relabel': relabel,
+        'delete_nodes': delete_nodes,
+        'upsert_edges': upsert_edges,
+        'delete_edges': delete_edges
+    }
+    return diff, {'nodes': node_state, 'edges': edge_state}
 
-if NEO4J_PASSWORD == "YOUR_PASSWORD_HERE":
-    print("⚠️  UWAGA: Nie ustawiono hasła!")
-    print("   Możesz:")
-    print("   1. Ustawić zmienną środowiskową: $env:NEO4J_PASSWORD='twoje_haslo'")
-    print("   2. Lub edytować NEO4J_PASSWORD w tym pliku")
-    exit(1)
+
+def entity_row(e):
+    """Wiersz węzła {label, id, props} dla merge_nodes."""
+    entity_type = e.get('entity_type', 'unknown')
+    props = {
+        'id': e.get('id'),
+        'name': e.get('name'),
+        'entity_type': entity_type,
+        'description': e.get('description', ''),
+        'country': e.get('country', ''),
+        'first_seen': e.get('first_seen', ''),
+        'notes': e.get('notes', '')
+    }
+    for field in OPTIONAL_ENTITY_FIELDS:
+        if field in e:
+            props[field] = e[field]
+    return {'label': LABEL_MAP.get(entity_type, 'Entity'), 'id': props['id'], 'props': props}
+
+
+def relationship_row(r):
+    """Wiersz relacji {type, source_id, target_id, props} dla merge_relationships."""
+    props = {
+        'date': r.get('date', ''),
+        'confidence': r.get('confidence', 1.0),
+        'evidence': r.get('evidence', ''),
+        'source_name': r.get('source_name', ''),
+        'target_name': r.get('target_name', '')
+    }
+    if 'event_id' in r:
+        props['event_id'] = r['event_id']
+    if 'event_name' in r:
+        props['event_name'] = r['event_name']
+    return {
+        'type': r.get('relationship_type', 'RELATED_TO'),
+        'source_id': r.get('source_id'),
+        'target_id': r.get('target_id'),
+        'props': props
+    }
 
 
 class Neo4jLoader:
-    def __init__(self, uri, user, password):
+    def __init__(self, uri, user, password, batch_size=BATCH_SIZE):
         self.driver = GraphDatabase.driver(uri, auth=(user, password))
+        self.batch_size = batch_size
     
     def close(self):
         self.driver.close()
     
+    def _run_batches(self, query, rows):
+        """
+        Wysyła wiersze paczkami (UNWIND $rows) w jawnych transakcjach zapisu.
+        execute_write ponawia transakcję przy błędach przejściowych.
+        Zwraca sumę wartości `count` zwróconych przez zapytanie.
+        """
+        total = 0
+        with self.driver.session() as session:
+            for start in range(0, len(rows), self.batch_size):
+                chunk = rows[start:start + self.batch_size]
+                total += session.execute_write(
+                    lambda tx: tx.run(query, rows=chunk).single()['count']
+                )
+        return total
+    
+    def merge_nodes(self, rows):
+        """
+        MERGE węzłów paczkami. rows: [{'label', 'id', 'props'}], grupowane po etykiecie.
+        Zwraca liczbę zapisanych węzłów.
+        """
+        by_label = {}
+        for row in rows:
+            if row.get('id') is None:
+                continue
+            by_label.setdefault(row['label'], []).append({'id': row['id'], 'props': row['props']})
+        
+        count = 0
+        for label, label_rows in by_label.items():
+            query = f"""
+            UNWIND $rows AS row
+            MERGE (n:{BASE_LABEL} {{id: row.id}})
+            SET n:{quote_name(label)}, n += row.props
+            RETURN count(*) AS count
+            """
+            count += self._run_batches(query, label_rows)
+        return count
+    
+    def merge_relationships(self, rows):
+        """
+        MERGE relacji paczkami. rows: [{'type', 'source_id', 'target_id', 'props'}],
+        grupowane po typie. Zwraca liczbę zapisanych relacji (oba węzły istnieją).
+        """
+        by_type = {}
+        for row in rows:
+            if row.get('source_id') is None or row.get('target_id') is None:
+                continue
+            by_type.setdefault(row['type'], []).append({
+                'source_id': row['source_id'],
+                'target_id': row['target_id'],
+                'props': row['props']
+            })
+        
+        count = 0
+        for rel_type, type_rows in by_type.items():
+            # Wyszukiwanie po id przez indeks unikalności na BASE_LABEL
+            query = f"""
+            UNWIND $rows AS row
+            MATCH (source:{BASE_LABEL} {{id: row.source_id}})
+            MATCH (target:{BASE_LABEL} {{id: row.target_id}})
+            MERGE (source)-[r:{quote_name(rel_type)}]->(target)
+            SET r += row.props
+            RETURN count(*) AS count
+            """
+            count += self._run_batches(query, type_rows)
+        return count
+    
+    def delete_nodes(self, ids):
+        """DETACH DELETE węzłów o podanych id (paczkami). Zwraca liczbę usuniętych."""
+        query = f"""
+        UNWIND $rows AS node_id
+        MATCH (n:{BASE_LABEL} {{id: node_id}})
+        DETACH DELETE n
+        RETURN count(*) AS count
+        """
+        return self._run_batches(query, list(ids))
+    
+    def remove_labels(self, rows):
+        """Usuwa poprzednie etykiety typu (rows: [{'id', 'label'}]) po zmianie typu węzła."""
+        by_label = {}
+        for row in rows:
+            if row['label'] != BASE_LABEL:
+                by_label.setdefault(row['label'], []).append(row['id'])
+        
+        count = 0
+        for label, ids in by_label.items():
+            query = f"""
+            UNWIND $rows AS node_id
+            MATCH (n:{BASE_LABEL} {{id: node_id}})
+            REMOVE n:{quote_name(label)}
+            RETURN count(*) AS count
+            """
+            count += self._run_batches(query, ids)
+        return count
+    
+    def delete_relationships(self, rows):
+        """Usuwa relacje (rows: [{'type', 'source_id', 'target_id'}]). Zwraca liczbę usuniętych."""
+        by_type = {}
+        for row in rows:
+            by_type.setdefault(row['type'], []).append(
+                {'source_id': row['source_id'], 'target_id': row['target_id']}
+            )
+        
+        count = 0
+        for rel_type, type_rows in by_type.items():
+            query = f"""
+            UNWIND $rows AS row
+            MATCH (:{BASE_LABEL} {{id: row.source_id}})-[r:{quote_name(rel_type)}]->(:{BASE_LABEL} {{id: row.target_id}})
+            DELETE r
+            RETURN count(*) AS count
+            """
+            count += self._run_batches(query, type_rows)
+        return count
+    
+    def sync(self, nodes, edges, state_file=SYNC_STATE_FILE, dry_run=False):
+        """
+        Synchronizacja różnicowa: porównuje odciski węzłów/relacji z ostatnią synchronizacją
+        i zapisuje do Neo4j tylko dodane, zmienione i usunięte elementy.
+        Zwraca statystyki (liczby elementów w różnicy).
+        """
+        diff, new_state = diff_graph(load_sync_state(state_file), nodes, edges)
+        stats = {name: len(items) for name, items in diff.items()}
+        if dry_run:
+            return stats
+        
+        if diff['delete_edges']:
+            self.delete_relationships(diff['delete_edges'])
+        if diff['delete_nodes']:
+            self.delete_nodes(diff['delete_nodes'])
+        if diff['upsert_nodes']:
+            self.merge_nodes(diff['upsert_nodes'])
+        if diff['relabel']:
+            self.remove_labels(diff['relabel'])
+        if diff['upsert_edges']:
+            stats['merged_edges'] = self.merge_relationships(diff['upsert_edges'])
+        
+        save_sync_state(new_state, state_file)
+        return stats
+    
     def clear_database(self):
-        """Czyści całą bazę (OSTROŻNIE!)"""
+        """
+        Czyści całą bazę (OSTROŻNIE!). Usuwa paczkami po batch_size węzłów -
+        jedna transakcja DETACH DELETE na dużym grafie wyczerpuje pamięć serwera.
+        """
+        query = "MATCH (n) WITH n LIMIT $limit DETACH DELETE n RETURN count(*) AS count"
+        deleted = 0
+        with self.driver.session() as session:
+            while True:
+                count = session.execute_write(
+                    lambda tx: tx.run(query, limit=self.batch_size).single()['count']
+                )
+                deleted += count
+                if count < self.batch_size:
+                    break
+        print(f"🗑️ Wyczyszczono bazę Neo4j ({deleted} węzłów)")
+    
+    def find_duplicate_ids(self, limit=50):
+        """Id występujące na więcej niż jednym węźle (blokują ograniczenie na BASE_LABEL)."""
+        with self.driver.session() as session:
+            result = session.run("""
+                MATCH (n) WHERE n.id IS NOT NULL
+                WITH n.id AS id, collect(labels(n)) AS labels, count(*) AS count
+                WHERE count > 1
+                RETURN id, labels, count
+                ORDER BY count DESC
+                LIMIT $limit
+            """, limit=limit)
+            return [record.data() for record in result]
+    
+    def add_base_label(self):
+        """
+        Nadaje BASE_LABEL węzłom z `id`, które jeszcze jej nie mają (paczkami).
+        Po migracji zapytanie nic nie znajduje. Zwraca liczbę oznaczonych węzłów.
+        """
+        query = f"""
+        MATCH (n) WHERE n.id IS NOT NULL AND NOT n:{BASE_LABEL}
+        WITH n LIMIT $limit
+        SET n:{BASE_LABEL}
+        RETURN count(*) AS count
+        """
+        total = 0
         with self.driver.session() as session:
-            session.run("MATCH (n) DETACH DELETE n")
-            print("🗑️ Wyczyszczono bazę Neo4j")
+            while True:
+                count = session.execute_write(
+                    lambda tx: tx.run(query, limit=self.batch_size).single()['count']
+                )
+                total += count
+                if count < self.batch_size:
+                    break
+        return total
     
     def create_constraints(self):
         """Tworzy ograniczenia unikalności"""
+        labeled = self.add_base_label()
+        if labeled:
+            print(f"🏷️ Dodano etykietę {BASE_LABEL} do {labeled} węzłów")
         with self.driver.session() as session:
             constraints = [
+                NODE_ID_CONSTRAINT,
                 "CREATE CONSTRAINT entity_id IF NOT EXISTS FOR (e:Entity) REQUIRE e.id IS UNIQUE",
                 "CREATE CONSTRAINT organization_id IF NOT EXISTS FOR (o:Organization) REQUIRE o.id IS UNIQUE",
                 "CREATE CONSTRAINT person_id IF NOT EXISTS FOR (p:Person) REQUIRE p.id IS UNIQUE",
@@ -73,70 +510,15 @@ class Neo4jLoader:
                 try:
                     session.run(constraint)
                 except Exception as e:
+                    if constraint == NODE_ID_CONSTRAINT:
+                        print(f"⚠️ Nie udało się utworzyć {BASE_LABEL}.id (duplikaty id?): {e}")
                     # Constraint może już istnieć
                     pass
             print("✅ Utworzono ograniczenia")
     
     def load_entities_from_list(self, entities):
         """Ładuje węzły (entities) z listy słowników"""
-        count = 0
-        with self.driver.session() as session:
-            for e in entities:
-                entity_type = e.get('entity_type', 'unknown')
-                # Mapowanie typów na etykiety Neo4j
-                label_map = {
-                    'organization': 'Organization',
-                    'person': 'Person',
-                    'profile': 'Profile',
-                    'event': 'Event',
-                    'post': 'Post',
-                    'page': 'Site',     # Map page to Site as requested
-                    'group': 'Group',
-                    'channel': 'Channel',
-                    'site': 'Site',
-                    'video': 'Video'
-                }
-                label = label_map.get(entity_type, 'Entity')
-                
-                # Przygotuj właściwości
-                props = {
-                    'id': e.get('id'),
-                    'name': e.get('name'),
-                    'entity_type': entity_type,
-                    'description': e.get('description', ''),
-                    'country': e.get('country', ''),
-                    'first_seen': e.get('first_seen', ''),
-                    'notes': e.get('notes', '')
-                }
-                
-                # Dodatkowe pola zależne od typu
-                if 'url' in e:
-                    props['url'] = e['url']
-                if 'platform' in e:
-                    props['platform'] = e['platform']
-                if 'category' in e:
-                    props['category'] = e['category']
-                if 'date_start' in e:
-                    props['date_start'] = e['date_start']
-                if 'date_end' in e:
-                    props['date_end'] = e['date_end']
-                if 'location' in e:
-                    props['location'] = e['location']
-                if 'date_posted' in e:
-                    props['date_posted'] = e['date_posted']
-                if 'handle' in e:
-                    props['handle'] = e['handle']
-                if 'parent_org_id' in e:
-                    props['parent_org_id'] = e['parent_org_id']
-                
-                # Twórz węzeł tylko z jedną specyficzną etykietą
-                query = f"""
-                MERGE (n:{label} {{id: $id}})
-                SET n += $props
-                """
-                session.run(query, id=props['id'], props=props)
-                count += 1
-        return count
+        return self.merge_nodes([entity_row(e) for e in entities])
 
     def load_entities(self, entities_file):
         """Ładuje węzły (entities) z JSON"""
@@ -153,40 +535,7 @@ class Neo4jLoader:
     
     def load_relationships_from_list(self, relationships):
         """Ładuje relacje z listy słowników"""
-        count = 0
-        with self.driver.session() as session:
-            for r in relationships:
-                rel_type = r.get('relationship_type', 'RELATED_TO')
-                
-                props = {
-                    'date': r.get('date', ''),
-                    'confidence': r.get('confidence', 1.0),
-                    'evidence': r.get('evidence', ''),
-                    'source_name': r.get('source_name', ''),
-                    'target_name': r.get('target_name', '')
-                }
-                
-                if 'event_id' in r:
-                    props['event_id'] = r['event_id']
-                if 'event_name' in r:
-                    props['event_name'] = r['event_name']
-                
-                # Twórz relację - szukaj węzłów po ID bez względu na etykietę
-                query = f"""
-                MATCH (source {{id: $source_id}})
-                MATCH (target {{id: $target_id}})
-                MERGE (source)-[r:{rel_type}]->(target)
-                SET r += $props
-                """
-                
-                session.run(
-                    query,
-                    source_id=r.get('source_id'),
-                    target_id=r.get('target_id'),
-                    props=props
-                )
-                count += 1
-        return count
+        return self.merge_relationships([relationship_row(r) for r in relationships])
 
     def load_relationships(self, relationships_file):
         """Ładuje relacje z JSON"""
@@ -201,82 +550,74 @@ class Neo4jLoader:
         print(f"✅ Załadowano {count} relacji z {relationships_file.name}")
         return count
 
-    def load_incremental(self):
-        """Ładuje nowe pliki analizy z folderu INCREMENTS_DIR"""
+    def load_incremental(self, ledger_file=LEDGER_FILE):
+        """
+        Ładuje nowe i zmienione pliki analizy z folderu INCREMENTS_DIR.
+        Stan plików (hash treści, wersja loadera, faza) jest w rejestrze IncrementLedger,
+        więc po przerwaniu między fazami wznowienie dokończy tylko brakującą fazę.
+        """
         if not INCREMENTS_DIR.exists():
             print(f"⚠️ Folder {INCREMENTS_DIR} nie istnieje. Pomijam incremental load.")
             return
 
-        # Wczytaj listę już załadowanych plików
-        loaded_files = set()
-        if TRACKING_FILE.exists():
-            with open(TRACKING_FILE, 'r', encoding='utf-8') as f:
-                loaded_files = set(line.strip() for line in f)
-
-        # Znajdź nowe pliki
-        new_files = []
-        for json_file in INCREMENTS_DIR.glob('**/*.json'):
-            # Używamy ścieżki względnej jako identyfikatora
-            rel_path = str(json_file.relative_to(INCREMENTS_DIR))
-            if rel_path not in loaded_files:
-                new_files.append(json_file)
+        ledger = IncrementLedger(ledger_file, INCREMENTS_DIR, LOADER_VERSION)
+
+        # Pliki nowe/zmienione (faza pending) i przerwane po fazie węzłów (faza nodes)
+        pending = {}
+        for json_file in sorted(INCREMENTS_DIR.glob('**/*.json')):
+            phase = ledger.check(json_file)
+            if phase != PHASE_DONE:
+                pending[json_file] = phase
         
-        if not new_files:
+        if not pending:
             print("ℹ️ Brak nowych plików do załadowania.")
+            ledger.compact()
             return
 
-        print(f"📥 Znaleziono {len(new_files)} nowych plików do załadowania.")
+        resumed = sum(1 for phase in pending.values() if phase == PHASE_NODES)
+        print(f"📥 Znaleziono {len(pending)} nowych/zmienionych plików do załadowania (wznowione: {resumed}).")
         
         total_nodes = 0
         total_edges = 0
         file_data_cache = {}
 
+        for json_file in pending:
+            try:
+                with open(json_file, 'rb') as f:
+                    content = f.read()
+                file_data_cache[json_file] = increment_items(json.loads(content.decode('utf-8')))
+                if pending[json_file] == PHASE_PENDING:
+                    ledger.start(json_file, hashlib.sha1(content).hexdigest())
+            except Exception as e:
+                print(f"❌ Błąd odczytu {json_file.name}: {e}")
+
         # Faza 1: Ładowanie węzłów ze wszystkich plików
         print("🔄 Faza 1: Ładowanie węzłów...")
-        for json_file in new_files:
+        for json_file, (nodes, _) in file_data_cache.items():
+            if pending[json_file] != PHASE_PENDING:
+                continue
             try:
-                with open(json_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    file_data_cache[json_file] = data
-                
-                nodes = data.get('nodes', [])
-                # Jeśli format jest inny (np. lista węzłów), spróbuj zgadnąć
-                if isinstance(data, list):
-                    if data and 'entity_type' in data[0]:
-                        nodes = data
-                
                 n_count = self.load_entities_from_list(nodes)
                 total_nodes += n_count
-                
+                ledger.record(json_file, PHASE_NODES, nodes=n_count)
             except Exception as e:
                 print(f"❌ Błąd przy ładowaniu węzłów z {json_file.name}: {e}")
 
-        # Faza 2: Ładowanie relacji ze wszystkich plików
+        # Faza 2: Ładowanie relacji (tylko pliki z zakończoną fazą 1)
         print("🔄 Faza 2: Ładowanie relacji...")
-        for json_file in new_files:
+        for json_file, (nodes, edges) in file_data_cache.items():
+            if ledger.check(json_file) != PHASE_NODES:
+                continue
             try:
-                data = file_data_cache.get(json_file)
-                if not data: continue
-
-                edges = data.get('edges', [])
-                # Jeśli format jest inny (np. lista węzłów), spróbuj zgadnąć
-                if isinstance(data, list):
-                    if data and 'source_id' in data[0]:
-                        edges = data
-                
                 e_count = self.load_relationships_from_list(edges)
                 total_edges += e_count
-                
-                # Zapisz jako załadowany
-                with open(TRACKING_FILE, 'a', encoding='utf-8') as f:
-                    f.write(str(json_file.relative_to(INCREMENTS_DIR)) + '\n')
-                    
-                n_count_display = len(data.get('nodes', [])) if isinstance(data, dict) else (len(data) if isinstance(data, list) and data and 'entity_type' in data[0] else 0)
-                print(f"  - Załadowano {json_file.name}: {n_count_display} węzłów, {e_count} relacji")
+                ledger.record(json_file, PHASE_DONE, edges=e_count)
+                print(f"  - Załadowano {json_file.name}: {len(nodes)} węzłów, {e_count} relacji")
                 
             except Exception as e:
                 print(f"❌ Błąd przy ładowaniu relacji z {json_file.name}: {e}")
 
+        ledger.compact()
         print(f"✅ Incremental load zakończony. Dodano łącznie: {total_nodes} węzłów, {total_edges} relacji.")
     
     def show_stats(self):
@@ -291,9 +632,9 @@ class Neo4jLoader:
             print(f"🔵 Węzły (nodes): {result.single()['count']}")
             
             # Węzły wg typu
-            result = session.run("""
+            result = session.run(f"""
                 MATCH (n)
-                RETURN COALESCE(n.entity_type, labels(n)[0]) as type, count(*) as count
+                RETURN COALESCE(n.entity_type, [l IN labels(n) WHERE l <> '{BASE_LABEL}'][0]) as type, count(*) as count
                 ORDER BY count DESC
             """)
             print("\n📊 Węzły wg typu:")
@@ -329,29 +670,53 @@ class Neo4jLoader:
 
 
 def main():
+    parser = argparse.ArgumentParser(description="RUSSINT - synchronizacja grafu z plików JSON do Neo4j")
+    parser.add_argument('--full', action='store_true',
+                        help='Wyczyść bazę i załaduj wszystko od nowa (zamiast synchronizacji różnicowej)')
+    parser.add_argument('--dry-run', action='store_true', help='Tylko pokaż różnicę, nic nie zapisuj')
+    parser.add_argument('--increments-only', action='store_true',
+                        help='Załaduj tylko nowe/zmienione pliki z graph_increments (rejestr IncrementLedger)')
+    args = parser.parse_args()
+    if args.increments_only and (args.full or args.dry_run):
+        parser.error('--increments-only nie łączy się z --full ani --dry-run')
+
     print("="*50)
     print("📊 RUSSINT - Neo4j Loader")
     print("="*50)
     print(f"📁 URI: {NEO4J_URI}")
     print()
     
+    check_credentials()
     loader = Neo4jLoader(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD)
     
     try:
-        # Czyść bazę (opcjonalnie - zakomentuj jeśli nie chcesz)
-        loader.clear_database()  # <--- ZAKOMENTOWANE: Nie czyść bazy przy każdym uruchomieniu
+        if args.full and not args.dry_run:
+            loader.clear_database()
+            for state_file in (SYNC_STATE_FILE, LEDGER_FILE):
+                if state_file.exists():
+                    state_file.unlink()
         
         # Utwórz ograniczenia
-        loader.create_constraints()
+        if not args.dry_run:
+            loader.create_constraints()
         
-        # Ładuj dane (Seed) - ZAKOMENTOWANE PO MIGRACJI
-        print("\n📥 Ładowanie danych startowych (Seed)...")
-        loader.load_entities(ENTITIES_FILE)
-        loader.load_relationships(RELATIONSHIPS_FILE)
+        if args.increments_only:
+            print("\n📥 Ładowanie danych przyrostowych (Incremental)...")
+            loader.load_incremental()
+            return
         
-        # Ładuj dane przyrostowe
-        print("\n📥 Ładowanie danych przyrostowych (Incremental)...")
-        loader.load_incremental()
+        # Seed + pliki przyrostowe -> tylko różnica względem ostatniej synchronizacji
+        print("\n📥 Synchronizacja (Seed + Incremental)...")
+        nodes, edges = collect_graph()
+        print(f"   Pliki: {len(nodes)} węzłów, {len(edges)} relacji")
+        stats = loader.sync(nodes, edges, dry_run=args.dry_run)
+        print(f"   ➕ Węzły do zapisu: {stats['upsert_nodes']} (zmiana typu: {stats['relabel']})")
+        print(f"   🗑️ Węzły do usunięcia: {stats['delete_nodes']}")
+        print(f"   ➕ Relacje do zapisu: {stats['upsert_edges']}")
+        print(f"   🗑️ Relacje do usunięcia: {stats['delete_edges']}")
+        if args.dry_run:
+            print("\nℹ️ Tryb --dry-run: nic nie zapisano.")
+            return
         
         # Pokaż statystyki
         loader.show_stats()
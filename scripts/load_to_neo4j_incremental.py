@@ -3,11 +3,12 @@ RUSSINT - Neo4j Incremental Loader
 Dodaje/aktualizuje węzły i relacje z JSON bez czyszczenia bazy.
 """
 
-from neo4j import GraphDatabase
 import json
 from pathlib import Path
 import os
 
+from load_to_neo4j import Neo4jLoader, NODE_ID_CONSTRAINT, sanitize_props
+
 # Załaduj .env, jeśli dostępne
 try:
     from dotenv import load_dotenv
@@ -30,16 +31,27 @@ if NEO4J_PASSWORD == "YOUR_PASSWORD_HERE":
     raise SystemExit(1)
 
 
-class IncrementalLoader:
-    def __init__(self, uri, user, password):
-        self.driver = GraphDatabase.driver(uri, auth=(user, password))
+# Mapowanie typów na etykiety (Page zamiast Site, jak dotychczas w tym loaderze)
+LABEL_MAP = {
+    'organization': 'Organization',
+    'person': 'Person',
+    'profile': 'Profile',
+    'event': 'Event',
+    'post': 'Post',
+    'page': 'Page',
+    'group': 'Group',
+    'channel': 'Channel'
+}
+
 
-    def close(self):
-        self.driver.close()
+class IncrementalLoader(Neo4jLoader):
+    """Loader kopiujący wszystkie pola encji/relacji (paczki UNWIND z Neo4jLoader)."""
 
     def create_constraints(self):
+        self.add_base_label()
         with self.driver.session() as session:
             constraints = [
+                NODE_ID_CONSTRAINT,
                 "CREATE CONSTRAINT entity_id IF NOT EXISTS FOR (e:Entity) REQUIRE e.id IS UNIQUE",
                 "CREATE CONSTRAINT organization_id IF NOT EXISTS FOR (o:Organization) REQUIRE o.id IS UNIQUE",
                 "CREATE CONSTRAINT person_id IF NOT EXISTS FOR (p:Person) REQUIRE p.id IS UNIQUE",
@@ -62,49 +74,19 @@ class IncrementalLoader:
         with open(entities_file, 'r', encoding='utf-8') as f:
             entities = json.load(f)
 
-        count = 0
-        with self.driver.session() as session:
-            for e in entities:
-                entity_type = e.get('entity_type', 'unknown')
-                label_map = {
-                    'organization': 'Organization',
-                    'person': 'Person',
-                    'profile': 'Profile',
-                    'event': 'Event',
-                    'post': 'Post',
-                    'page': 'Page',
-                    'group': 'Group',
-                    'channel': 'Channel'
-                }
-                label = label_map.get(entity_type, 'Entity')
-
-                props = dict(e)  # copy all fields
-                # sanitize props: convert nested dicts to JSON strings (Neo4j properties must be primitives or arrays)
-                for k, v in list(props.items()):
-                    if isinstance(v, dict):
-                        try:
-                            props[k] = json.dumps(v, ensure_ascii=False)
-                        except Exception:
-                            props.pop(k, None)
-                    elif isinstance(v, list):
-                        # keep lists of primitives only; otherwise stringify
-                        if not all(isinstance(i, (str, int, float, bool, type(None))) for i in v):
-                            try:
-                                props[k] = json.dumps(v, ensure_ascii=False)
-                            except Exception:
-                                props.pop(k, None)
-                # ensure id and name exist
-                if 'id' not in props or props.get('id') is None:
-                    print(f"⚠️ Pomijam encję bez id: {props.get('name')}")
-                    continue
-
-                # MERGE by id and set properties (merge will update existing)
-                query = f"""
-                MERGE (n:{label} {{id: $id}})
-                SET n += $props
-                """
-                session.run(query, id=props['id'], props=props)
-                count += 1
+        rows = []
+        for e in entities:
+            # sanitize props: nested dicts/lists -> JSON strings (Neo4j properties must be primitives or arrays)
+            props = sanitize_props(e)
+            # ensure id exists
+            if props.get('id') is None:
+                print(f"⚠️ Pomijam encję bez id: {props.get('name')}")
+                continue
+            label = LABEL_MAP.get(e.get('entity_type', 'unknown'), 'Entity')
+            rows.append({'label': label, 'id': props['id'], 'props': props})
+
+        # MERGE by id and set properties (merge will update existing)
+        count = self.merge_nodes(rows)
 
         print(f"✅ Załadowano/aktualizowano {count} węzłów")
         return count
@@ -117,39 +99,22 @@ class IncrementalLoader:
         with open(relationships_file, 'r', encoding='utf-8') as f:
             relationships = json.load(f)
 
-        count = 0
-        with self.driver.session() as session:
-            for r in relationships:
-                rel_type = r.get('relationship_type', 'RELATED_TO')
-                props = dict(r)
-                # sanitize relationship props similarly
-                for k, v in list(props.items()):
-                    if isinstance(v, dict):
-                        try:
-                            props[k] = json.dumps(v, ensure_ascii=False)
-                        except Exception:
-                            props.pop(k, None)
-                    elif isinstance(v, list):
-                        if not all(isinstance(i, (str, int, float, bool, type(None))) for i in v):
-                            try:
-                                props[k] = json.dumps(v, ensure_ascii=False)
-                            except Exception:
-                                props.pop(k, None)
-                # require source and target ids
-                src = r.get('source_id') or r.get('source')
-                tgt = r.get('target_id') or r.get('target')
-                if not src or not tgt:
-                    print(f"⚠️ Pomijam relację bez source/target: {r.get('id')}")
-                    continue
-
-                query = f"""
-                MATCH (source {{id: $source_id}})
-                MATCH (target {{id: $target_id}})
-                MERGE (source)-[rel:{rel_type}]->(target)
-                SET rel += $props
-                """
-                session.run(query, source_id=src, target_id=tgt, props=props)
-                count += 1
+        rows = []
+        for r in relationships:
+            # require source and target ids
+            src = r.get('source_id') or r.get('source')
+            tgt = r.get('target_id') or r.get('target')
+            if not src or not tgt:
+                print(f"⚠️ Pomijam relację bez source/target: {r.get('id')}")
+                continue
+            rows.append({
+                'type': r.get('relationship_type', 'RELATED_TO'),
+                'source_id': src,
+                'target_id': tgt,
+                'props': sanitize_props(r)
+            })
+
+        count = self.merge_relationships(rows)
 
         print(f"✅ Załadowano/aktualizowano {count} relacji")
         return count
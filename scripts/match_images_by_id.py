@@ -6,11 +6,16 @@ so the loader can assign `image`/`screenshot` properties to nodes.
 """
 import json
 import os
+import sys
 from pathlib import Path
 from datetime import datetime
 
 ROOT = Path(__file__).resolve().parent.parent
 
+sys.path.insert(0, str(ROOT / 'src'))
+
+from db.evidence_catalog import get_evidence_catalog
+
 # Candidate locations for node seed file
 NODE_FILES = [
     ROOT / 'src' / 'ui' / 'static' / 'data' / 'raw' / 'graph_nodes.json',
@@ -51,12 +56,14 @@ def load_node_ids():
 
 
 def find_evidence_files():
+    # Sync the DuckDB evidence catalog (re-hashes only changed files), then read paths from it
+    catalog = get_evidence_catalog()
     files = []
     for d in EVIDENCE_DIRS:
         if d.exists():
-            for p in d.rglob('*'):
-                if p.is_file():
-                    files.append(p)
+            catalog.scan(d)
+            files.extend(ROOT / p for p in catalog.list_paths(under=d))
+    catalog.close()
     return files
 
 
@@ -13,11 +13,16 @@ Konwencja nazewnictwa plików:
 
 import os
 import re
+import sys
 from pathlib import Path
 from neo4j import GraphDatabase
 from dotenv import load_dotenv
 from difflib import SequenceMatcher
 
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from graph.graph_export import BASE_LABEL
+
 load_dotenv()
 
 SYMBOLS_DIR = Path("data/evidence/symbols")
@@ -106,8 +111,8 @@ def match_file_to_node(file_path: Path, nodes: list) -> tuple:
 def update_node_image(driver, node_id: str, image_path: str):
     """Update the image field of a node in Neo4j"""
     with driver.session() as session:
-        session.run("""
-            MATCH (n {id: $id})
+        session.run(f"""
+            MATCH (n:{BASE_LABEL} {{id: $id}})
             SET n.image = $image
         """, id=node_id, image=image_path)
 
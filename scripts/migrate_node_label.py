@@ -0,0 +1,49 @@
+"""
+RUSSINT - migracja etykiety :Node
+Jednorazowo nadaje wspólną etykietę BASE_LABEL (:Node) wszystkim węzłom z `id`
+i tworzy na niej ograniczenie unikalności, z którego korzystają wyszukiwania po id
+(loadery, edytory, skrypty). Bezpieczne do ponownego uruchomienia.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from graph.graph_export import BASE_LABEL
+from load_to_neo4j import (
+    Neo4jLoader, NODE_ID_CONSTRAINT,
+    NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD, check_credentials
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=f"Nadaje etykietę :{BASE_LABEL} węzłom z id")
+    parser.add_argument('--batch-size', type=int, default=10000, help='Węzły oznaczane w jednej transakcji')
+    args = parser.parse_args()
+
+    check_credentials()
+    loader = Neo4jLoader(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD, batch_size=args.batch_size)
+
+    try:
+        duplicates = loader.find_duplicate_ids()
+        if duplicates:
+            print(f"❌ {len(duplicates)} id występuje na wielu węzłach - ograniczenie nie powstanie:")
+            for dup in duplicates:
+                print(f"   - {dup['id']}: {dup['count']}x {dup['labels']}")
+            print("   Scal duplikaty (np. scripts/merge_duplicates.py) i uruchom ponownie.")
+            raise SystemExit(1)
+
+        labeled = loader.add_base_label()
+        print(f"🏷️ Dodano etykietę {BASE_LABEL} do {labeled} węzłów")
+
+        with loader.driver.session() as session:
+            session.run(NODE_ID_CONSTRAINT).consume()
+        print(f"✅ Ograniczenie unikalności {BASE_LABEL}.id gotowe")
+    finally:
+        loader.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -12,133 +12,41 @@ import sys
 import json
 import argparse
 from pathlib import Path
-from datetime import datetime
 
 sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
 
-from db.posts_db import get_posts_db
+from db.posts_db import get_posts_db, post_from_raw
 
 ROOT = Path(__file__).parent.parent
 RAW_DIR = ROOT / 'data' / 'raw'
 
 
-def parse_date(date_str):
-    """Parse date string to datetime."""
-    if not date_str:
-        return None
+def _collect_platform(platform, platform_dir):
+    """Collect posts for one platform from data/raw/<platform>/<handle>/*.json."""
+    posts = []
+    if not platform_dir.exists():
+        return posts
     
-    # Try common formats
-    for fmt in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d', '%d.%m.%Y', '%Y-%m-%dT%H:%M:%S'):
-        try:
-            return datetime.strptime(date_str, fmt)
-        except ValueError:
+    for handle_dir in platform_dir.iterdir():
+        if not handle_dir.is_dir():
             continue
-    return None
+        handle = handle_dir.name
+        
+        for json_file in handle_dir.glob('*.json'):
+            try:
+                data = json.loads(json_file.read_text(encoding='utf-8'))
+                posts.append(post_from_raw(platform, handle, json_file.stem, data))
+            except Exception as e:
+                print(f"Error reading {json_file}: {e}")
+    
+    return posts
 
 
 def collect_posts_from_json():
     """Collect all posts from raw JSON files."""
     posts = []
-    
-    # Facebook posts
-    fb_dir = RAW_DIR / 'facebook'
-    if fb_dir.exists():
-        for handle_dir in fb_dir.iterdir():
-            if not handle_dir.is_dir():
-                continue
-            handle = handle_dir.name
-            
-            for json_file in handle_dir.glob('*.json'):
-                try:
-                    data = json.loads(json_file.read_text(encoding='utf-8'))
-                    post_id = json_file.stem
-                    
-                    post = {
-                        'id': post_id,
-                        'platform': 'facebook',
-                        'handle': handle,
-                        'post_url': data.get('post_url'),
-                        'text': data.get('text'),
-                        'raw_text_preview': data.get('raw_text_preview'),
-                        'date_posted': parse_date(data.get('date_posted')),
-                        'screenshot': data.get('screenshot'),
-                        'metadata': {
-                            'reactions': data.get('reactions'),
-                            'comments': data.get('comments'),
-                            'shares': data.get('shares'),
-                            'image': data.get('image'),
-                            'video': data.get('video')
-                        }
-                    }
-                    posts.append(post)
-                except Exception as e:
-                    print(f"Error reading {json_file}: {e}")
-    
-    # Instagram posts
-    ig_dir = RAW_DIR / 'instagram'
-    if ig_dir.exists():
-        for handle_dir in ig_dir.iterdir():
-            if not handle_dir.is_dir():
-                continue
-            handle = handle_dir.name
-            
-            for json_file in handle_dir.glob('*.json'):
-                try:
-                    data = json.loads(json_file.read_text(encoding='utf-8'))
-                    post_id = json_file.stem
-                    
-                    post = {
-                        'id': post_id,
-                        'platform': 'instagram',
-                        'handle': handle,
-                        'post_url': data.get('post_url'),
-                        'text': data.get('caption'),
-                        'raw_text_preview': data.get('caption'),
-                        'date_posted': parse_date(data.get('date_posted')),
-                        'screenshot': data.get('screenshot'),
-                        'metadata': {
-                            'likes': data.get('likes'),
-                            'comments_count': data.get('comments_count'),
-                            'media_type': data.get('media_type'),
-                            'media_url': data.get('media_url')
-                        }
-                    }
-                    posts.append(post)
-                except Exception as e:
-                    print(f"Error reading {json_file}: {e}")
-    
-    # Telegram posts
-    tg_dir = RAW_DIR / 'telegram'
-    if tg_dir.exists():
-        for channel_dir in tg_dir.iterdir():
-            if not channel_dir.is_dir():
-                continue
-            channel = channel_dir.name
-            
-            for json_file in channel_dir.glob('*.json'):
-                try:
-                    data = json.loads(json_file.read_text(encoding='utf-8'))
-                    post_id = json_file.stem
-                    
-                    post = {
-                        'id': post_id,
-                        'platform': 'telegram',
-                        'handle': channel,
-                        'post_url': data.get('message_url'),
-                        'text': data.get('text'),
-                        'raw_text_preview': data.get('text'),
-                        'date_posted': parse_date(data.get('date')),
-                        'screenshot': data.get('screenshot'),
-                        'metadata': {
-                            'views': data.get('views'),
-                            'forwards': data.get('forwards'),
-                            'media': data.get('media')
-                        }
-                    }
-                    posts.append(post)
-                except Exception as e:
-                    print(f"Error reading {json_file}: {e}")
-    
+    for platform in ('facebook', 'instagram', 'telegram'):
+        posts.extend(_collect_platform(platform, RAW_DIR / platform))
     return posts
 
 
@@ -171,14 +79,12 @@ def migrate_posts(dry_run: bool = True):
     print("\n🚀 Migrating posts to DuckDB...")
     db = get_posts_db()
     
-    success_count = 0
-    for post in posts:
-        if db.insert_post(post):
-            success_count += 1
-    
+    stats = db.bulk_upsert(posts)
     db.close()
     
+    success_count = stats['inserted'] + stats['updated']
     print(f"\n✅ Migrated {success_count}/{len(posts)} posts to DuckDB.")
+    print(f"   Inserted: {stats['inserted']}, updated: {stats['updated']}, failed: {stats['failed']}")
     print(f"   Database: {db.db_path}")
 
 
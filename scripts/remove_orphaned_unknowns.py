@@ -19,56 +19,49 @@ from graph.neo4j_client import get_client
 def remove_orphaned_unknowns(dry_run: bool = True):
     client = get_client()
     
-    with client.driver.session() as session:
-        # Count orphaned unknowns
-        result = session.run("""
-            MATCH (n)
-            WHERE (coalesce(toLower(n.entity_type),'unknown') = 'unknown' 
-               OR coalesce(n.name,'Unknown') = 'Unknown')
-            AND NOT (n)-[]-()
-            RETURN count(n) as orphaned_count
-        """)
-        
-        count = result.single()['orphaned_count']
-        
-        if count == 0:
-            print("✅ No orphaned unknown nodes found.")
-            return
-        
-        print(f"\n🗑️  Found {count} orphaned unknown nodes.")
-        
-        # Sample before deletion
-        result = session.run("""
-            MATCH (n)
-            WHERE (coalesce(toLower(n.entity_type),'unknown') = 'unknown' 
-               OR coalesce(n.name,'Unknown') = 'Unknown')
-            AND NOT (n)-[]-()
-            RETURN n.id as id, n.name as name
-            LIMIT 10
-        """)
-        
-        samples = list(result)
-        print("\n📝 Sample nodes to be deleted:")
-        for rec in samples:
-            print(f"   {rec['id']} | {rec['name']}")
-        
-        if dry_run:
-            print(f"\n⚠️  DRY RUN: Would delete {count} orphaned unknown nodes.")
-            print("   Run with --apply to actually delete them.")
-            return
-        
-        # Delete orphaned unknowns
-        result = session.run("""
-            MATCH (n)
-            WHERE (coalesce(toLower(n.entity_type),'unknown') = 'unknown' 
-               OR coalesce(n.name,'Unknown') = 'Unknown')
-            AND NOT (n)-[]-()
-            DELETE n
-            RETURN count(n) as deleted_count
-        """)
-        
-        deleted = result.single()['deleted_count']
-        print(f"\n✅ Deleted {deleted} orphaned unknown nodes.")
+    # Count orphaned unknowns
+    count = client.read_one("""
+        MATCH (n)
+        WHERE (coalesce(toLower(n.entity_type),'unknown') = 'unknown' 
+           OR coalesce(n.name,'Unknown') = 'Unknown')
+        AND NOT (n)-[]-()
+        RETURN count(n) as orphaned_count
+    """)['orphaned_count']
+    
+    if count == 0:
+        print("✅ No orphaned unknown nodes found.")
+        return
+    
+    print(f"\n🗑️  Found {count} orphaned unknown nodes.")
+    
+    # Sample before deletion
+    samples = client.read("""
+        MATCH (n)
+        WHERE (coalesce(toLower(n.entity_type),'unknown') = 'unknown' 
+           OR coalesce(n.name,'Unknown') = 'Unknown')
+        AND NOT (n)-[]-()
+        RETURN n.id as id, n.name as name
+        LIMIT 10
+    """)
+    print("\n📝 Sample nodes to be deleted:")
+    for rec in samples:
+        print(f"   {rec['id']} | {rec['name']}")
+    
+    if dry_run:
+        print(f"\n⚠️  DRY RUN: Would delete {count} orphaned unknown nodes.")
+        print("   Run with --apply to actually delete them.")
+        return
+    
+    # Delete orphaned unknowns
+    deleted = client.write("""
+        MATCH (n)
+        WHERE (coalesce(toLower(n.entity_type),'unknown') = 'unknown' 
+           OR coalesce(n.name,'Unknown') = 'Unknown')
+        AND NOT (n)-[]-()
+        DELETE n
+        RETURN count(n) as deleted_count
+    """)[0]['deleted_count']
+    print(f"\n✅ Deleted {deleted} orphaned unknown nodes.")
 
 def main():
     parser = argparse.ArgumentParser(description='Remove orphaned unknown nodes from Neo4j.')
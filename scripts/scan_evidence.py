@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Sync the evidence catalog (table `evidence` in data/posts.duckdb) with data/evidence.
+Only new or changed files (size/mtime) are re-hashed.
+
+Usage:
+  python scripts/scan_evidence.py
+  python scripts/scan_evidence.py --root data/evidence/facebook/BraterstwaLudziWolnych
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from db.evidence_catalog import get_evidence_catalog, EVIDENCE_ROOT
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sync evidence catalog with files on disk.')
+    parser.add_argument('--root', type=Path, default=EVIDENCE_ROOT, help='Directory to scan (default: data/evidence)')
+    args = parser.parse_args()
+
+    catalog = get_evidence_catalog()
+    stats = catalog.scan(args.root.resolve())
+    catalog.close()
+
+    print(f"✅ Evidence catalog synced: {args.root}")
+    print(f"   Added: {stats['added']}, updated: {stats['updated']}, "
+          f"removed: {stats['removed']}, unchanged: {stats['unchanged']}")
+
+
+if __name__ == '__main__':
+    main()
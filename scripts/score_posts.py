@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Score posts in data/posts.duckdb with the suspicious keyword dictionary
+(table `post_risk`). Only posts whose text or dictionary changed are rescored.
+
+Usage:
+  python scripts/score_posts.py
+  python scripts/score_posts.py --full --top 20
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from db.posts_db import get_posts_db
+from db.risk_scores import get_risk_scores
+from analysis.keyword_scorer import get_scorer, RISK_THRESHOLD
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Score posts with the keyword dictionary.')
+    parser.add_argument('--full', action='store_true', help='Rescore all posts')
+    parser.add_argument('--batch-size', type=int, default=10000, help='Posts per batch (default: 10000)')
+    parser.add_argument('--top', type=int, default=10, help='Show N highest-risk posts (default: 10)')
+    args = parser.parse_args()
+
+    # Make sure the posts table exists
+    get_posts_db().close()
+
+    scorer = get_scorer()
+    risk = get_risk_scores()
+    stats = risk.score_posts(scorer, batch_size=args.batch_size, full=args.full)
+
+    print(f"✅ Risk scores updated (dictionary {scorer.version})")
+    print(f"   Scored: {stats['scored']}, flagged (>= {RISK_THRESHOLD}): {stats['flagged']}, "
+          f"unchanged: {stats['unchanged']}, removed: {stats['removed']}")
+
+    if args.top:
+        print(f"\n🔝 Top {args.top} posts:")
+        for post in risk.get_top_posts(limit=args.top):
+            print(f"   [{post['risk_score']:>4}] {post['platform']}/{post['handle']} {post['id']}: "
+                  f"{', '.join(post['matched_terms'])}")
+
+    risk.close()
+
+
+if __name__ == '__main__':
+    main()
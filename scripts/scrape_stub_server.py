@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Local stub of the pages the collectors scrape, for testing batch_scheduler.py
+without Facebook / Telegram.
+
+Pages:
+  /fb/<handle>?posts=N           profile feed: N div[aria-posinset] posts with pfbid links
+  /fb/<handle>/posts/<pfbid>     single post (div[role=main])
+  /s/<channel>?before=<id>       t.me/s/<channel> preview (20 messages per page)
+Fault injection (prefix any page):
+  /flaky/<n>/...                 first n requests for the page answer 503
+  /slow/<seconds>/...            answer after a delay (job timeouts)
+
+Usage:
+  python scripts/scrape_stub_server.py --port 8765
+  # targets.txt:
+  #   fb_profile http://127.0.0.1:8765/fb/stub_profile
+  #   fb_post    http://127.0.0.1:8765/fb/stub_profile/posts/pfbid0stub000000000000000000000001
+  #   telegram   http://127.0.0.1:8765/flaky/2/s/stub_channel
+  python src/collectors/batch_scheduler.py --targets targets.txt --backoff 1
+"""
+
+import argparse
+import html
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TELEGRAM_PAGE_SIZE = 20
+TELEGRAM_MESSAGES = 60
+
+_failures = {}
+_failures_lock = threading.Lock()
+
+
+def _pfbid(i):
+    return f"pfbid0stub{i:026d}"
+
+
+def fb_feed(handle, count):
+    posts = []
+    for i in range(1, count + 1):
+        posts.append(f"""
+<div aria-posinset="{i}" style="min-height: 400px; border: 1px solid #ccc; margin: 8px">
+  <a href="/fb/{handle}/posts/{_pfbid(i)}?__cft__=x">{i} godz.</a>
+  <div dir="auto">Stub post {i} of {html.escape(handle)}: testowa treść posta numer {i}.</div>
+  <a href="https://l.facebook.com/l.php?u=https%3A%2F%2Fexample.com%2Farticle{i}">article</a>
+</div>""")
+    return f"<html><head><title>{html.escape(handle)}</title></head><body>{''.join(posts)}</body></html>"
+
+
+def fb_post(handle, pfbid):
+    return f"""<html><head><title>{html.escape(handle)}</title></head><body>
+<div role="main"><div role="article">
+  <div dir="auto">Stub single post {html.escape(pfbid)} of {html.escape(handle)}.</div>
+  <a href="https://www.youtube.com/watch?v=stub">video</a>
+</div></div></body></html>"""
+
+
+def telegram_preview(base, channel, before):
+    last = min(before - 1, TELEGRAM_MESSAGES) if before else TELEGRAM_MESSAGES
+    first = max(1, last - TELEGRAM_PAGE_SIZE + 1)
+    messages = []
+    for i in range(first, last + 1):
+        messages.append(f"""
+<div class="tgme_widget_message" data-post="{channel}/{i}">
+  <div class="tgme_widget_message_text">Stub message {i}<br>kanał {html.escape(channel)}</div>
+  <a class="tgme_widget_message_date" href="{base}/{channel}/{i}"><time datetime="2025-11-{1 + i % 28:02d}T12:00:00+00:00">12:00</time></a>
+</div>""")
+    prev = f'<link rel="prev" href="/s/{channel}?before={first}">' if first > 1 else ''
+    return f"""<html><head><meta charset="utf-8">{prev}</head><body>
+<div class="tgme_channel_info_header_title">Stub {html.escape(channel)}</div>
+{''.join(messages)}</body></html>"""
+
+
+class StubHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        parsed = urllib.parse.urlsplit(self.path)
+        params = urllib.parse.parse_qs(parsed.query)
+        parts = [p for p in parsed.path.split('/') if p]
+
+        while len(parts) >= 2 and parts[0] in ('flaky', 'slow'):
+            mode, value, parts = parts[0], parts[1], parts[2:]
+            if mode == 'slow':
+                time.sleep(float(value))
+            else:
+                with _failures_lock:
+                    _failures[self.path] = _failures.get(self.path, 0) + 1
+                    attempt = _failures[self.path]
+                if attempt <= int(value):
+                    return self.send_page(503, f"flaky: attempt {attempt}/{value}")
+
+        base = f"http://{self.headers.get('Host', 'localhost')}"
+        if len(parts) == 2 and parts[0] == 'fb':
+            return self.send_page(200, fb_feed(parts[1], int(params.get('posts', ['30'])[0])))
+        if len(parts) == 4 and parts[0] == 'fb' and parts[2] == 'posts':
+            return self.send_page(200, fb_post(parts[1], parts[3]))
+        if len(parts) == 2 and parts[0] == 's':
+            before = int(params['before'][0]) if 'before' in params else None
+            return self.send_page(200, telegram_preview(base, parts[1], before))
+        self.send_page(404, "not found")
+
+    def send_page(self, status, body):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        print(f"[stub] {self.address_string()} {format % args}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local stub of scraped pages for batch_scheduler tests')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--host', default='127.0.0.1')
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), StubHandler)
+    print(f"Stub server on http://{args.host}:{args.port}/ (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -4,6 +4,13 @@ This will rename nodes in-place (useful to normalize IDs without recreating node
 """
 from neo4j import GraphDatabase
 import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from graph.graph_export import BASE_LABEL
+
 try:
     from dotenv import load_dotenv
     load_dotenv()
@@ -34,7 +41,7 @@ def run_mapping(uri, user, password, mappings):
         with driver.session() as session:
             for old_id, new_id, new_name in mappings:
                 # Check if new_id already exists
-                res = session.run("MATCH (n {id: $new_id}) RETURN count(n) AS cnt", new_id=new_id)
+                res = session.run(f"MATCH (n:{BASE_LABEL} {{id: $new_id}}) RETURN count(n) AS cnt", new_id=new_id)
                 if res.single()["cnt"] > 0:
                     print(f"⚠️ New id {new_id} already exists — skipping mapping for {old_id} -> {new_id}")
                     continue
@@ -42,7 +49,7 @@ def run_mapping(uri, user, password, mappings):
                 # Update node id and name
                 print(f"Renaming {old_id} -> {new_id} and setting name to '{new_name}'")
                 session.run(
-                    "MATCH (n {id: $old_id}) SET n.id = $new_id, n.name = $new_name RETURN n",
+                    f"MATCH (n:{BASE_LABEL} {{id: $old_id}}) SET n.id = $new_id, n.name = $new_name RETURN n",
                     old_id=old_id, new_id=new_id, new_name=new_name
                 )
     finally:
@@ -3,8 +3,14 @@ Update symbol nodes with image paths
 """
 from neo4j import GraphDatabase
 import os
+import sys
+from pathlib import Path
 from dotenv import load_dotenv
 
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from graph.graph_export import BASE_LABEL
+
 load_dotenv()
 
 driver = GraphDatabase.driver(
@@ -20,8 +26,8 @@ SYMBOL_MAPPINGS = {
 
 with driver.session() as session:
     for node_id, image_path in SYMBOL_MAPPINGS.items():
-        result = session.run("""
-            MATCH (n {id: $id})
+        result = session.run(f"""
+            MATCH (n:{BASE_LABEL} {{id: $id}})
             SET n.image = $image
             RETURN n.id, n.name, n.image
         """, id=node_id, image=image_path)
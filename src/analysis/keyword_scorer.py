@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Keyword scorer - suspicious keyword dictionary compiled into one regex.
+
+The dictionary (data/dictionaries/suspicious_keywords.json) is compiled once;
+each text is then scanned in a single pass that reports every matched term
+(including overlapping and nested terms) with offsets and tags.
+Terms shorter than SHORT_TERM_LEN only match as whole words.
+"""
+
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+DICTIONARY_PATH = PROJECT_ROOT / "data" / "dictionaries" / "suspicious_keywords.json"
+
+# Scoring configuration
+TAG_SCORES = {
+    "DIRECT": 50,
+    "SABOTAGE_EUPHEMISMS": 50,
+    "RECRUITMENT_PAYMENT": 40,
+    "INFRASTRUCTURE_TARGETS": 30,
+    "SECURITY_OPSEC": 20,
+    "RUSSIAN_UKRAINIAN_RECRUITMENT": 30,
+    "RECRUITMENT_SELECTION": 10,
+    "RADICAL_ORGANIZATION": 10,
+    "NATIONALIST_IDEOLOGY": 5,
+    "HISTORICAL_MARKERS": 5,
+    "SYMBOLS_CODES": 10,
+    "VERIFICATION_CONTROL": 20
+}
+
+# Bonus for tag combinations: (tag_a, tag_b, bonus)
+COMBINATION_BONUSES = [
+    ("RECRUITMENT_PAYMENT", "INFRASTRUCTURE_TARGETS", 30),
+    ("RECRUITMENT_PAYMENT", "SABOTAGE_EUPHEMISMS", 40),
+    ("SECURITY_OPSEC", "RECRUITMENT_PAYMENT", 20),
+]
+
+RISK_THRESHOLD = 60
+
+SHORT_TERM_LEN = 4
+
+
+class Match(NamedTuple):
+    """Single keyword occurrence in a text."""
+    term: str
+    start: int
+    end: int
+    tags: List[str]
+
+
+class ScoreResult(NamedTuple):
+    """Risk score of a text with matched keywords, tags and occurrences."""
+    score: int
+    keywords: List[str]
+    tags: List[str]
+    matches: List[Match]
+
+
+def load_dictionary(path: Path = DICTIONARY_PATH) -> List[Dict]:
+    """Load dictionary entries ({'term', 'tags'}); empty list if file is missing."""
+    path = Path(path)
+    if not path.exists():
+        print(f"Warning: Dictionary file not found at {path}.")
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class KeywordScorer:
+    """Dictionary compiled once, reused for any number of texts."""
+
+    def __init__(self, entries: Iterable[Dict],
+                 tag_scores: Optional[Dict[str, int]] = None,
+                 combination_bonuses: Optional[List[tuple]] = None):
+        self.entries = [e for e in entries if e.get('term')]
+        self.tag_scores = TAG_SCORES if tag_scores is None else tag_scores
+        self.combination_bonuses = COMBINATION_BONUSES if combination_bonuses is None else combination_bonuses
+
+        # Entries grouped by lowercase term (the same term may carry several entries)
+        grouped: Dict[str, List[Dict]] = {}
+        for entry in self.entries:
+            grouped.setdefault(entry['term'].lower(), []).append(entry)
+
+        # Longest first, so prefix terms of a matched term can be listed after it
+        self._terms = sorted(grouped, key=len, reverse=True)
+        self._entries = [grouped[t] for t in self._terms]
+        self._term_scores = [
+            [max((self.tag_scores.get(tag, 0) for tag in e['tags']), default=0) for e in grouped[t]]
+            for t in self._terms
+        ]
+        self._tags = [sorted({tag for e in grouped[t] for tag in e['tags']}) for t in self._terms]
+        self._patterns = [self._term_pattern(t) for t in self._terms]
+
+        # Shorter terms that are prefixes of a longer one also match at its position
+        self._nested = [
+            [j for j in range(i + 1, len(self._terms)) if term.startswith(self._terms[j])]
+            for i, term in enumerate(self._terms)
+        ]
+
+        # Terms merged into a prefix trie; an empty group marks where each term ends
+        self._group_terms = []
+        trie = {}
+        for index, term in enumerate(self._terms):
+            node = trie
+            for ch in term:
+                node = node.setdefault(ch, {})
+            node[''] = index
+        # Texts are lowercased before matching (much faster than re.IGNORECASE)
+        self._regex = re.compile(f'(?={self._trie_pattern(trie)})') if self._terms else None
+        self._verify = [re.compile(p) for p in self._patterns]
+
+        digest = hashlib.sha1()
+        for entry in sorted(self.entries, key=lambda e: (e['term'], sorted(e['tags']))):
+            digest.update(json.dumps([entry['term'], sorted(entry['tags'])], ensure_ascii=False).encode('utf-8'))
+        digest.update(json.dumps([self.tag_scores, self.combination_bonuses], sort_keys=True).encode('utf-8'))
+        self.version = digest.hexdigest()[:12]
+
+    @classmethod
+    def from_file(cls, path: Path = DICTIONARY_PATH, **kwargs) -> 'KeywordScorer':
+        """Build scorer from a dictionary JSON file."""
+        return cls(load_dictionary(path), **kwargs)
+
+    @staticmethod
+    def _term_pattern(term: str) -> str:
+        escaped = re.escape(term)
+        if len(term) < SHORT_TERM_LEN:
+            return rf'\b{escaped}\b'
+        return escaped
+
+    def _trie_pattern(self, node: Dict) -> str:
+        """Regex for a trie node; longer continuations are tried before a term end."""
+        branches = [re.escape(ch) + self._trie_pattern(child)
+                    for ch, child in sorted(node.items()) if ch]
+        if '' in node:
+            index = node['']
+            self._group_terms.append(index)
+            end = '()'
+            if len(self._terms[index]) < SHORT_TERM_LEN:
+                end = r'\b()'
+            branches.append(end)
+        if len(branches) == 1:
+            return branches[0]
+        return '(?:' + '|'.join(branches) + ')'
+
+    def _matched_indexes(self, text: str) -> Iterator[tuple]:
+        """Yield (term_index, start) for every term occurrence."""
+        for m in self._regex.finditer(text):
+            index = self._group_terms[m.lastindex - 1]
+            start = m.start()
+            # Word boundary before short terms is checked here (same for all terms at start)
+            if len(self._terms[index]) >= SHORT_TERM_LEN or self._verify[index].match(text, start):
+                yield index, start
+            for nested in self._nested[index]:
+                if self._verify[nested].match(text, start):
+                    yield nested, start
+
+    def _occurrences(self, text: Optional[str]) -> List[tuple]:
+        if not text or self._regex is None:
+            return []
+        return list(self._matched_indexes(text.lower()))
+
+    def _to_matches(self, occurrences: List[tuple]) -> List[Match]:
+        matches = [
+            Match(self._terms[i], start, start + len(self._terms[i]), self._tags[i])
+            for i, start in occurrences
+        ]
+        matches.sort(key=lambda m: (m.start, -m.end))
+        return matches
+
+    def find(self, text: str) -> List[Match]:
+        """
+        All keyword occurrences in text, ordered by position.
+        Offsets index text.lower() (same as text except for rare characters like 'İ').
+        """
+        return self._to_matches(self._occurrences(text))
+
+    def score(self, text: str) -> ScoreResult:
+        """
+        Risk score of text: each matched dictionary entry adds the highest score
+        of its tags (once per entry), plus bonuses for tag combinations.
+        """
+        occurrences = self._occurrences(text)
+        if not occurrences:
+            return ScoreResult(0, [], [], [])
+
+        score = 0
+        keywords = set()
+        tags = set()
+        for index in {i for i, _ in occurrences}:
+            score += sum(self._term_scores[index])
+            for entry in self._entries[index]:
+                keywords.add(entry['term'])
+            tags.update(self._tags[index])
+
+        for tag_a, tag_b, bonus in self.combination_bonuses:
+            if tag_a in tags and tag_b in tags:
+                score += bonus
+
+        return ScoreResult(score, sorted(keywords), sorted(tags), self._to_matches(occurrences))
+
+    def score_many(self, texts: Iterable[Optional[str]]) -> Iterator[ScoreResult]:
+        """Score texts lazily (batch API for re-scoring archives)."""
+        for text in texts:
+            yield self.score(text)
+
+
+_default_scorer = None
+
+
+def get_scorer() -> KeywordScorer:
+    """Get KeywordScorer built from the default dictionary (compiled once)."""
+    global _default_scorer
+    if _default_scorer is None:
+        _default_scorer = KeywordScorer.from_file()
+    return _default_scorer
@@ -0,0 +1,481 @@
+"""
+Batch scheduler - runs the collectors headless over a list of targets.
+
+Targets (Facebook profiles, Facebook post URLs, t.me channels) come from a file
+or a DuckDB table and are put into the persistent job queue (db/scrape_jobs.py),
+so an interrupted run continues where it stopped. Workers share one browser:
+each job gets a page in one of a pool of browser contexts (a context is replaced
+after a failure or timeout). Every job has a timeout; failed jobs are retried
+with exponential backoff until max attempts are used up.
+
+Jobs:
+  fb_profile - collectors/fb_scraper_v2.collect_posts (optionally since last run)
+  fb_post    - collectors/fb_scraper_single.collect_single_post
+  telegram   - collectors/telegram_preview over HTTP, browser preview as fallback;
+               messages go to data/raw/telegram/<channel>/ and posts.duckdb
+
+Usage:
+    python src/collectors/batch_scheduler.py --targets data/targets.txt --since-last-run
+    python src/collectors/batch_scheduler.py --targets-table monitored_targets --requeue
+    python src/collectors/batch_scheduler.py --status
+
+Targets file: one target per line (URL or Facebook handle), '#' starts a comment.
+The job kind is detected from the URL or given first on the line, e.g.
+    fb_profile http://127.0.0.1:8765/fb/test_profile
+(see scripts/scrape_stub_server.py for a local stub of the scraped pages).
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import sys
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from playwright.async_api import async_playwright
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from db.posts_db import get_posts_db, post_from_raw
+from db.post_index import DEFAULT_KNOWN_STREAK
+from db.scrape_jobs import get_scrape_job_queue, DEFAULT_MAX_ATTEMPTS
+from collectors.fb_scraper_v2 import collect_posts
+from collectors.fb_scraper_single import collect_single_post
+from collectors.telegram_preview import TelegramPreviewClient
+from collectors.telegram_scraper import DomainRateLimiter, scrape_channel_preview
+
+BASE_DIR = Path(__file__).parent.parent.parent
+TELEGRAM_RAW_DIR = BASE_DIR / "data" / "raw" / "telegram"
+COOKIES_FILE = Path(__file__).parent / "fb_cookies.json"
+
+TARGET_KINDS = ('fb_profile', 'fb_post', 'telegram')
+
+DEFAULT_CONTEXTS = 3
+DEFAULT_TIMEOUT = 600       # seconds per job
+DEFAULT_BACKOFF = 60        # seconds before the first retry, doubled per attempt
+MAX_BACKOFF = 3600
+PAGE_SETTLE = 3             # seconds after navigation before collecting
+IDLE_POLL = 30              # max seconds a worker sleeps while waiting for retries
+BUSY_POLL = 1               # seconds an idle worker waits while other jobs are still running
+REQUEST_INTERVAL = 2.0      # seconds between navigations to one domain
+HEARTBEAT_INTERVAL = 30     # seconds between heartbeats of the running jobs (see STALE_AFTER)
+
+FB_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+_FB_POST_URL = re.compile(r'/posts/|/permalink|story_fbid=|pfbid|/videos/|/photos/|/watch/')
+_TELEGRAM_URL = re.compile(r'^(?:https?://)?(?:www\.)?t\.me/(?:s/)?')
+
+
+class PermanentJobError(Exception):
+    """Job that cannot succeed on retry (unknown kind, browser job without a browser)."""
+
+
+def classify_target(target, kind=None):
+    """(kind, url) of a target: URL or bare Facebook handle, kind detected unless given."""
+    target = target.strip()
+    is_handle = re.fullmatch(r'[\w.\-]+', target) is not None
+    if kind is None:
+        if _TELEGRAM_URL.match(target):
+            kind = 'telegram'
+        elif 'facebook.com' in target or 'fb.com' in target:
+            kind = 'fb_post' if _FB_POST_URL.search(target) else 'fb_profile'
+        elif is_handle:
+            kind = 'fb_profile'
+        else:
+            raise ValueError(f"Unknown target: {target}")
+    elif kind not in TARGET_KINDS:
+        raise ValueError(f"Unknown target kind: {kind}")
+    if kind == 'fb_profile' and is_handle:
+        target = f"https://www.facebook.com/{target}"
+    elif re.match(r'(?:www\.|m\.)?(?:facebook\.com|fb\.com)/', target):
+        target = f"https://{target}"
+    elif not re.match(r'https?://', target) and not _TELEGRAM_URL.match(target):
+        raise ValueError(f"{kind} target must be a URL: {target}")
+    if kind == 'telegram' and _TELEGRAM_URL.match(target):
+        # Public preview page (t.me/s/<channel>)
+        target = _TELEGRAM_URL.sub('https://t.me/s/', target)
+    return kind, target
+
+
+def read_targets_file(path):
+    """(kind, url) targets from a file: '[kind] target' per line, '#' comments."""
+    targets = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            parts = line.split('#', 1)[0].split()
+            if not parts:
+                continue
+            kind = parts[0] if len(parts) > 1 and parts[0] in TARGET_KINDS else None
+            targets.append(classify_target(parts[-1], kind))
+    return targets
+
+
+def profile_handle(url):
+    """Facebook handle of a profile URL (last path segment for other hosts, e.g. the stub server)."""
+    match = re.search(r'facebook\.com/([^/?#]+)', url)
+    if match:
+        return match.group(1)
+    segments = [s for s in url.split('?', 1)[0].split('/')[3:] if s]
+    return segments[-1] if segments else 'unknown'
+
+
+def telegram_channel(url):
+    match = re.search(r'/s/([^/?#]+)', url) or re.search(r't\.me/([^/?#]+)', url)
+    return match.group(1) if match else profile_handle(url)
+
+
+def _telegram_date(value):
+    """t.me datetime attribute (ISO 8601 with offset) as naive UTC 'YYYY-MM-DD HH:MM:SS'."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return value
+    if parsed.tzinfo:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def store_telegram_messages(channel_url, data):
+    """Save channel messages as data/raw/telegram/<channel>/tg_<channel>_<id>.json + posts rows."""
+    channel = telegram_channel(channel_url)
+    out_dir = TELEGRAM_RAW_DIR / channel
+    out_dir.mkdir(parents=True, exist_ok=True)
+    collected_at = datetime.now().isoformat()
+
+    rows = []
+    for msg in data['messages']:
+        msg_id = (msg.get('url') or '').rstrip('/').rsplit('/', 1)[-1]
+        if not msg_id.isdigit():
+            continue
+        post_id = f"tg_{channel}_{msg_id}"
+        raw = {
+            'id': post_id,
+            'channel': channel,
+            'channel_title': data['title'],
+            'message_url': msg['url'],
+            'text': msg['text'],
+            'date': _telegram_date(msg['date']),
+            'collected_at': collected_at
+        }
+        with open(out_dir / f"{post_id}.json", 'w', encoding='utf-8') as f:
+            json.dump(raw, f, ensure_ascii=False, indent=2)
+        rows.append(post_from_raw('telegram', channel, post_id, raw))
+
+    stats = {'inserted': 0, 'updated': 0, 'failed': 0}
+    if rows:
+        db = get_posts_db()
+        stats = db.bulk_upsert(rows)
+        db.close()
+    return {'channel': channel, 'title': data['title'], 'messages': len(rows), **stats}
+
+
+class ContextPool:
+    """Browser contexts sharing one browser; a context that failed is replaced by a fresh one."""
+
+    def __init__(self, browser, size=DEFAULT_CONTEXTS, cookies=None, storage_state=None):
+        self.browser = browser
+        self.size = max(1, size)
+        self.cookies = cookies or []
+        self.storage_state = storage_state
+        self._idle = asyncio.Queue()
+        self._contexts = set()
+
+    async def _new_context(self):
+        options = dict(viewport={'width': 1920, 'height': 1080}, user_agent=FB_USER_AGENT, locale='pl-PL')
+        if self.storage_state:
+            options['storage_state'] = str(self.storage_state)
+        context = await self.browser.new_context(**options)
+        if self.cookies:
+            await context.add_cookies(self.cookies)
+        self._contexts.add(context)
+        return context
+
+    async def start(self):
+        for _ in range(self.size):
+            self._idle.put_nowait(await self._new_context())
+
+    async def acquire(self):
+        return await self._idle.get()
+
+    async def release(self, context, healthy=True):
+        if not healthy:
+            self._contexts.discard(context)
+            try:
+                await context.close()
+            except Exception:
+                pass
+            context = await self._new_context()
+        self._idle.put_nowait(context)
+
+    async def close(self):
+        for context in list(self._contexts):
+            try:
+                await context.close()
+            except Exception:
+                pass
+        self._contexts.clear()
+
+
+async def run_fb_profile(scheduler, url):
+    async with scheduler.page(url) as page:
+        stats = await collect_posts(page, profile_handle(url), scheduler.since_last_run, scheduler.known_streak)
+    return {key: str(value) if isinstance(value, Path) else value for key, value in stats.items()}
+
+
+async def run_fb_post(scheduler, url):
+    async with scheduler.page(url) as page:
+        return await collect_single_post(page, url)
+
+
+async def run_telegram(scheduler, url):
+    data = None
+    if scheduler.telegram_client:
+        data = await scheduler.telegram_client.fetch_channel(url, scheduler.telegram_pages)
+        if data is not None and not data['complete']:
+            # Not done: the retry fetches every page again (messages are stored idempotently)
+            raise RuntimeError(f"Partial channel preview {url}: "
+                               f"{len(data['messages'])} messages before a page failed")
+    if data is None and scheduler.pool:
+        async with scheduler.page(url, settle=False) as page:
+            data = await scrape_channel_preview(page, url)
+    if data is None:
+        raise RuntimeError(f"Could not fetch channel preview {url}")
+    return store_telegram_messages(url, data)
+
+
+RUNNERS = {
+    'fb_profile': run_fb_profile,
+    'fb_post': run_fb_post,
+    'telegram': run_telegram,
+}
+
+
+class BatchScheduler:
+    """Workers taking jobs from the queue, one browser context per running job."""
+
+    def __init__(self, queue, pool=None, workers=DEFAULT_CONTEXTS, timeout=DEFAULT_TIMEOUT,
+                 backoff=DEFAULT_BACKOFF, wait_for_retries=True, telegram_client=None,
+                 telegram_pages=1, since_last_run=False, known_streak=DEFAULT_KNOWN_STREAK,
+                 limiter=None):
+        self.queue = queue
+        self.pool = pool
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.backoff = backoff
+        self.wait_for_retries = wait_for_retries
+        self.telegram_client = telegram_client
+        self.telegram_pages = telegram_pages
+        self.since_last_run = since_last_run
+        self.known_streak = known_streak
+        self.limiter = limiter or DomainRateLimiter(REQUEST_INTERVAL)
+        self.stats = {'done': 0, 'retry': 0, 'failed': 0}
+        self._running = 0
+
+    def retry_delay(self, attempts):
+        """Exponential backoff with +-20% jitter (so retries of one host do not line up)."""
+        delay = min(self.backoff * 2 ** max(attempts - 1, 0), MAX_BACKOFF)
+        return delay * random.uniform(0.8, 1.2)
+
+    @asynccontextmanager
+    async def page(self, url, settle=True):
+        """New page in a pooled context, navigated to url; the context is replaced if the job fails."""
+        if self.pool is None:
+            raise PermanentJobError("Job needs a browser (scheduler runs with --no-browser)")
+        context = await self.pool.acquire()
+        healthy = False
+        page = None
+        try:
+            page = await context.new_page()
+            await self.limiter.wait(url)
+            await page.goto(url, wait_until='domcontentloaded', timeout=60000)
+            if settle:
+                await asyncio.sleep(PAGE_SETTLE)
+            yield page
+            healthy = True
+        finally:
+            if page is not None and healthy:
+                try:
+                    await page.close()
+                except Exception:
+                    healthy = False
+            await self.pool.release(context, healthy)
+
+    async def _run_job(self, job):
+        jid = job['id']
+        print(f"[>] {jid} (attempt {job['attempts']}/{job['max_attempts']})")
+        runner = RUNNERS.get(job['kind'])
+        started = asyncio.get_running_loop().time()
+        retry = True
+        try:
+            if runner is None:
+                raise PermanentJobError(f"Unknown job kind: {job['kind']}")
+            result = await asyncio.wait_for(runner(self, job['target']), self.timeout)
+        except asyncio.TimeoutError:
+            error = f"Timeout after {self.timeout}s"
+        except PermanentJobError as e:
+            error = str(e)
+            retry = False
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        else:
+            self.queue.complete(jid, result)
+            self.stats['done'] += 1
+            print(f"[+] {jid} done in {asyncio.get_running_loop().time() - started:.0f}s")
+            return
+
+        delay = self.retry_delay(job['attempts'])
+        status = self.queue.fail(jid, error, delay, retry)
+        if status == 'failed':
+            self.stats['failed'] += 1
+            print(f"[!] {jid} failed ({error}) - no attempts left")
+        else:
+            self.stats['retry'] += 1
+            print(f"[!] {jid} failed ({error}) - retry in {delay:.0f}s")
+
+    async def _worker(self):
+        while True:
+            job = self.queue.claim()
+            if job is None:
+                due = self.queue.next_due()
+                if self._running == 0 and (due is None or not self.wait_for_retries):
+                    return
+                wait = IDLE_POLL if due is None else (due - datetime.now()).total_seconds()
+                if self._running:
+                    wait = min(wait, BUSY_POLL)
+                await asyncio.sleep(min(max(wait, 0.1), IDLE_POLL))
+                continue
+            self._running += 1
+            try:
+                await self._run_job(job)
+            finally:
+                self._running -= 1
+
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+            self.queue.heartbeat()
+
+    async def run(self):
+        """Process the queue until no job is pending (or only later retries, without wait_for_retries)."""
+        recovered = self.queue.recover()
+        if recovered:
+            print(f"[*] {recovered} interrupted jobs back in the queue")
+        heartbeat = asyncio.create_task(self._heartbeat())
+        try:
+            await asyncio.gather(*(self._worker() for _ in range(self.workers)))
+        finally:
+            heartbeat.cancel()
+        return self.stats
+
+
+def print_status(queue):
+    counts = queue.counts()
+    print("Jobs: " + ", ".join(f"{status}: {n}" for status, n in counts.items()))
+    for job in queue.jobs('failed'):
+        print(f"  [failed] {job['id']} ({job['attempts']} attempts): {job['last_error']}")
+    for job in queue.jobs('pending'):
+        print(f"  [pending] {job['id']} next run {job['next_run_at']:%Y-%m-%d %H:%M:%S}")
+
+
+def load_cookies(path):
+    if not path or not Path(path).exists():
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description='Run collectors headless over a queue of targets')
+    parser.add_argument('--targets', help='File with targets (one per line, optional kind first)')
+    parser.add_argument('--targets-table', help='DuckDB table in posts.duckdb with a target (and optional kind) column')
+    parser.add_argument('--requeue', action='store_true',
+                       help='Run again targets that already finished (daily monitoring)')
+    parser.add_argument('--status', action='store_true', help='Print queue status and exit')
+    parser.add_argument('--contexts', type=int, default=DEFAULT_CONTEXTS,
+                       help=f'Browser contexts / parallel jobs (default: {DEFAULT_CONTEXTS})')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                       help=f'Seconds per job (default: {DEFAULT_TIMEOUT})')
+    parser.add_argument('--max-attempts', type=int, default=DEFAULT_MAX_ATTEMPTS,
+                       help=f'Attempts per job (default: {DEFAULT_MAX_ATTEMPTS})')
+    parser.add_argument('--backoff', type=float, default=DEFAULT_BACKOFF,
+                       help=f'Seconds before the first retry, doubled per attempt (default: {DEFAULT_BACKOFF})')
+    parser.add_argument('--no-wait-retries', action='store_true',
+                       help='Exit instead of waiting for backed-off retries (they run next time)')
+    parser.add_argument('--since-last-run', action='store_true',
+                       help='Facebook profiles: only posts newer than those in posts.duckdb')
+    parser.add_argument('--known-streak', type=int, default=DEFAULT_KNOWN_STREAK,
+                       help=f'Known posts in a row that end a --since-last-run profile (default: {DEFAULT_KNOWN_STREAK})')
+    parser.add_argument('--pages', type=int, default=1, help='Telegram preview pages per channel (default: 1)')
+    parser.add_argument('--cookies', default=str(COOKIES_FILE),
+                       help='Facebook cookies JSON (extract_edge_cookies.py) added to every context')
+    parser.add_argument('--storage-state', help='Playwright storage state file for the contexts')
+    parser.add_argument('--cdp', help='Use a running Chrome (e.g. http://localhost:9222) instead of launching one')
+    parser.add_argument('--headful', action='store_true', help='Show the browser window')
+    parser.add_argument('--no-browser', action='store_true',
+                       help='No Playwright: only telegram jobs over HTTP can run')
+    args = parser.parse_args()
+
+    queue = get_scrape_job_queue()
+    try:
+        targets = []
+        if args.targets:
+            targets += read_targets_file(args.targets)
+        if args.targets_table:
+            targets += [classify_target(target, kind) for kind, target in queue.targets_from_table(args.targets_table)]
+        if targets:
+            stats = queue.enqueue(targets, args.max_attempts, args.requeue)
+            print(f"[*] Targets: {len(targets)} (new: {stats['added']}, requeued: {stats['requeued']}, "
+                  f"already queued: {stats['existing']})")
+
+        if args.status:
+            print_status(queue)
+            return
+
+        limiter = DomainRateLimiter(REQUEST_INTERVAL)
+        client = TelegramPreviewClient(max_connections=args.contexts, limiter=limiter)
+        scheduler_args = dict(
+            workers=args.contexts,
+            timeout=args.timeout,
+            backoff=args.backoff,
+            wait_for_retries=not args.no_wait_retries,
+            telegram_client=client,
+            telegram_pages=args.pages,
+            since_last_run=args.since_last_run,
+            known_streak=args.known_streak,
+            limiter=limiter
+        )
+
+        try:
+            if args.no_browser:
+                stats = await BatchScheduler(queue, None, **scheduler_args).run()
+            else:
+                async with async_playwright() as p:
+                    if args.cdp:
+                        browser = await p.chromium.connect_over_cdp(args.cdp)
+                    else:
+                        browser = await p.chromium.launch(
+                            headless=not args.headful,
+                            args=['--disable-blink-features=AutomationControlled']
+                        )
+                    pool = ContextPool(browser, args.contexts, load_cookies(args.cookies), args.storage_state)
+                    try:
+                        await pool.start()
+                        stats = await BatchScheduler(queue, pool, **scheduler_args).run()
+                    finally:
+                        await pool.close()
+                        await browser.close()
+        finally:
+            client.close()
+
+        print(f"\n[*] Done: {stats['done']}, retries scheduled: {stats['retry']}, failed: {stats['failed']}")
+        print_status(queue)
+    finally:
+        queue.close()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -10,10 +10,12 @@ Requirements:
 Usage:
     python fb_scraper.py "https://facebook.com/profile_name" --use-edge
     python fb_scraper.py "https://facebook.com/profile_name" --months 10
+    python fb_scraper.py "https://facebook.com/profile_name" --since-last-run
 """
 
 import json
 import os
+import sys
 from datetime import datetime, timedelta
 from pathlib import Path
 import asyncio
@@ -22,13 +24,22 @@ from playwright.async_api import async_playwright, TimeoutError as PlaywrightTim
 from bs4 import BeautifulSoup
 import re
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from db.post_index import get_post_index, text_fingerprint, DEFAULT_KNOWN_STREAK
+from db.evidence_media import get_evidence_writer
+
 
 class FacebookScraper:
-    def __init__(self, headless=True, save_screenshots=True, use_edge_session=False, months_limit=10):
+    def __init__(self, headless=True, save_screenshots=True, use_edge_session=False, months_limit=10,
+                 since_last_run=False, known_streak=DEFAULT_KNOWN_STREAK):
         self.headless = headless
         self.save_screenshots = save_screenshots
         self.use_edge_session = use_edge_session
         self.months_limit = months_limit
+        # Watermark mode: stop at posts already stored in posts.duckdb (see db.post_index.Watermark)
+        self.since_last_run = since_last_run
+        self.known_streak = known_streak
         self.base_dir = Path(__file__).parent.parent.parent
         self.raw_dir = self.base_dir / "data" / "raw" / "facebook"
         self.evidence_dir = self.base_dir / "data" / "evidence" / "facebook"
@@ -94,9 +105,20 @@ class FacebookScraper:
                 except:
                     pass
                 
-                # Intelligent scrolling - stop when we hit date limit
+                # Posts collected in earlier runs (pfbid / URL / content fingerprint).
+                # Read-only: this scraper stores no per-post JSON, screenshots or posts
+                # rows, so recording its posts would make fb_scraper_v2 skip them as collected.
+                watermark = None
+                if self.since_last_run:
+                    handle = self._extract_handle(url)
+                    post_index = get_post_index()
+                    watermark = post_index.watermark(post_index.load('facebook', handle), self.known_streak)
+                    post_index.close()
+                    print(f"[*] Since last run: {watermark}")
+                
+                # Intelligent scrolling - stop when we hit date limit (or the watermark)
                 print("[*] Scrolling to load posts (limited by date)...")
-                posts_collected = await self._scroll_and_collect_posts(page, max_posts=100)
+                posts_collected = await self._scroll_and_collect_posts(page, max_posts=100, watermark=watermark)
                 
                 # Get page content
                 html_content = await page.content()
@@ -125,13 +147,15 @@ class FacebookScraper:
                     'screenshot_path': None
                 }
                 
-                # Save screenshot
+                # Save screenshot (written in the background with WebP preview + thumbnail)
+                screenshot_writes = []
                 if self.save_screenshots:
                     screenshot_filename = f"fb_{self._sanitize_filename(data['handle'])}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
                     screenshot_path = self.evidence_dir / screenshot_filename
-                    await page.screenshot(path=str(screenshot_path), full_page=True)
+                    png = await page.screenshot(full_page=True)
+                    screenshot_writes.append(get_evidence_writer().submit(png, screenshot_path))
                     data['screenshot_path'] = str(screenshot_path.relative_to(self.base_dir))
-                    print(f"[+] Screenshot saved: {screenshot_path}")
+                    print(f"[+] Screenshot captured: {screenshot_path}")
                 
                 # Save raw HTML
                 html_filename = f"fb_{self._sanitize_filename(data['handle'])}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
@@ -148,6 +172,7 @@ class FacebookScraper:
                     json.dump(data, f, ensure_ascii=False, indent=2)
                 print(f"[+] JSON saved: {json_path}")
                 
+                await get_evidence_writer().wait(screenshot_writes)
                 return data
                 
             except PlaywrightTimeout:
@@ -274,9 +299,11 @@ class FacebookScraper:
         except:
             return None
 
-    async def _scroll_and_collect_posts(self, page, max_posts=100):
+    async def _scroll_and_collect_posts(self, page, max_posts=100, watermark=None):
         """
         Intelligent scrolling that collects posts until date limit or max count.
+        With a watermark (since-last-run mode) posts already stored are skipped and
+        scrolling stops after watermark.known_streak consecutive old posts.
         """
         posts = []
         collected_urls = set()  # Track URLs to avoid duplicates
@@ -285,6 +312,8 @@ class FacebookScraper:
         max_scroll_attempts = 20
         
         print(f"[*] Collecting posts (max: {max_posts}, date limit: {self.cutoff_date.strftime('%Y-%m-%d')})")
+        if watermark:
+            print(f"[*] Watermark: {watermark}")
         
         while len(posts) < max_posts and scroll_attempts < max_scroll_attempts:
             # Scroll down
@@ -303,12 +332,22 @@ class FacebookScraper:
                     post_data = await self._extract_post_data(post_elem)
                     
                     if post_data:
-                        # Use URL or text hash to avoid duplicates
-                        unique_key = post_data.get('post_url') or hash(post_data['text'][:100])
+                        # Use URL or content fingerprint to avoid duplicates
+                        unique_key = post_data.get('post_url') or text_fingerprint('', post_data['text'])
                         
                         if unique_key not in collected_urls:
                             collected_urls.add(unique_key)
                             
+                            # Since last run: skip stored posts, stop once the feed is past them
+                            if watermark:
+                                old = watermark.is_old(post_data.get('post_url'), post_data['text'],
+                                                       date_posted=post_data.get('date_parsed'))
+                                if watermark.see(old):
+                                    print(f"[*] Reached watermark after {watermark.streak} old posts. Stopping.")
+                                    return posts
+                                if old:
+                                    continue
+                            
                             # Check date if available
                             if post_data.get('date_parsed'):
                                 if post_data['date_parsed'] < self.cutoff_date:
@@ -498,6 +537,10 @@ async def main():
                        help='Run browser in headless mode (default: False)')
     parser.add_argument('--no-screenshots', action='store_true', 
                        help='Disable screenshot capture')
+    parser.add_argument('--since-last-run', action='store_true',
+                       help='Only collect posts newer than those already in posts.duckdb')
+    parser.add_argument('--known-streak', type=int, default=DEFAULT_KNOWN_STREAK,
+                       help=f'Stop after N consecutive known posts in --since-last-run mode (default: {DEFAULT_KNOWN_STREAK})')
     
     args = parser.parse_args()
     
@@ -509,7 +552,9 @@ async def main():
         headless=args.headless,
         save_screenshots=not args.no_screenshots,
         use_edge_session=args.use_edge,
-        months_limit=args.months
+        months_limit=args.months,
+        since_last_run=args.since_last_run,
+        known_streak=args.known_streak
     )
     
     result = await scraper.scrape_profile(args.url)
@@ -4,12 +4,18 @@ This connects to Chrome running with --remote-debugging-port=9222
 """
 
 import json
+import sys
 from datetime import datetime, timedelta
 from pathlib import Path
 import asyncio
 from playwright.async_api import async_playwright
 import re
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from db.post_index import get_post_index, facebook_unique_id
+from db.evidence_media import get_evidence_writer
+
 
 async def scrape_current_page():
     """
@@ -117,6 +123,17 @@ async def scrape_current_page():
             collected_texts = set()
             collected_urls = set()
             
+            # Indeks zebranych postów (pfbid / URL / fingerprint) - znane pomijamy przed screenshotem
+            post_index = get_post_index()
+            known = post_index.load('facebook', handle)
+            post_index.close()
+            known_skipped = 0
+            print(f"    Znane posty w indeksie: {len(known)} kluczy")
+            
+            # Screenshoty zapisuje pula wątków w tle (master PNG + podgląd WebP + miniatura)
+            evidence = get_evidence_writer()
+            screenshot_writes = []
+            
             # Facebook używa wirtualizacji - posty są ładowane gdy są widoczne
             # Musimy przewinąć do każdego kontenera aby załadować jego zawartość
             
@@ -192,6 +209,11 @@ async def scrape_current_page():
                             continue
                         collected_texts.add(text_key)
                     
+                    # Pomiń posty zebrane w poprzednich uruchomieniach
+                    if known.match(post_url, full_text) is not None:
+                        known_skipped += 1
+                        continue
+                    
                     # Wyciągnij główny tekst postu
                     post_text = ""
                     
@@ -340,6 +362,7 @@ async def scrape_current_page():
                     
                     # Screenshot pojedynczego posta
                     post_screenshot_path = None
+                    post_screenshot_write = None
                     try:
                         # Przewiń do posta aby był widoczny
                         await container.scroll_into_view_if_needed()
@@ -350,10 +373,12 @@ async def scrape_current_page():
                         post_screenshot_filename = f"fb_{handle}_{timestamp}_post{post_num:03d}.png"
                         post_screenshot_path = evidence_dir / post_screenshot_filename
                         
-                        await container.screenshot(path=str(post_screenshot_path))
+                        png = await container.screenshot()
+                        post_screenshot_write = evidence.submit(png, post_screenshot_path)
                         print(f"    Screenshot posta #{post_num}: {post_screenshot_filename}")
                     except Exception as e:
                         print(f"    [!] Nie udało się zrobić screenshota posta: {e}")
+                        post_screenshot_path = None
                     
                     post_data = {
                         'text': post_text[:2000] if post_text else full_text[:500],
@@ -363,17 +388,23 @@ async def scrape_current_page():
                         'author': name,
                         'images': images,
                         'external_url': external_url if external_url else None,
-                        'screenshot': str(post_screenshot_path.relative_to(base_dir)) if post_screenshot_path and post_screenshot_path.exists() else None
+                        'screenshot': str(post_screenshot_path.relative_to(base_dir)) if post_screenshot_path else None
                     }
                     
                     posts.append(post_data)
+                    if post_screenshot_write:
+                        screenshot_writes.append((post_screenshot_write, post_data))
+                    post_id = f"fb_{handle}_{facebook_unique_id(handle, post_url, full_text)}"
+                    known.add(post_id, post_url, full_text)
                     print(f"    Zebrano post #{len(posts)}: {date_str if date_str else 'brak daty'}")
                     
                 except Exception as e:
                     print(f"    Błąd przy article #{i}: {e}")
                     continue
             
-            print(f"[+] Zebrano {len(posts)} postów z DOM")
+            print(f"[+] Zebrano {len(posts)} postów z DOM (pominięto {known_skipped} znanych)")
+            post_index.record(known)
+            post_index.close()
             
             # Save full page screenshot (opcjonalnie - jako backup)
             screenshot_filename = f"fb_{handle}_{timestamp}_full.png"
@@ -381,12 +412,24 @@ async def scrape_current_page():
             
             print("[*] Zapisywanie screenshota całej strony (opcjonalnie)...")
             try:
-                await page.screenshot(path=str(screenshot_path), full_page=True)
+                png = await page.screenshot(full_page=True)
+                screenshot_writes.append((evidence.submit(png, screenshot_path), None))
                 print(f"[+] Screenshot całej strony: {screenshot_path}")
             except Exception as e:
+                screenshot_path = None
                 print(f"[!] Nie udało się zapisać screenshota całej strony: {e}")
                 print("    (To nie problem - screenshoty postów zostały zapisane)")
             
+            written = await evidence.wait(future for future, _ in screenshot_writes)
+            print(f"[+] Screenshoty zapisane: {sum(1 for w in written if w)}/{len(written)}")
+            # Nieudany zapis w tle - JSON nie może wskazywać pliku, którego nie ma
+            for path, (_, post_data) in zip(written, screenshot_writes):
+                if path is None:
+                    if post_data is None:
+                        screenshot_path = None
+                    else:
+                        post_data['screenshot'] = None
+            
             # Save HTML
             html_filename = f"fb_{handle}_{timestamp}.html"
             html_path = raw_dir / html_filename
@@ -406,7 +449,7 @@ async def scrape_current_page():
                 'posts': posts,
                 'posts_count': len(posts),
                 'raw_html_path': str(html_path.relative_to(base_dir)),
-                'screenshot_path': str(screenshot_path.relative_to(base_dir))
+                'screenshot_path': str(screenshot_path.relative_to(base_dir)) if screenshot_path else None
             }
             
             json_filename = f"fb_{handle}_{timestamp}.json"
@@ -425,7 +468,8 @@ async def scrape_current_page():
             print(f"Postów: {len(posts)}")
             print(f"\nPliki zapisane w:")
             print(f"  - {json_path}")
-            print(f"  - {screenshot_path}")
+            if screenshot_path:
+                print(f"  - {screenshot_path}")
             print(f"  - {html_path}")
             print("="*60)
             
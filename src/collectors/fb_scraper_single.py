@@ -15,9 +15,146 @@ from pathlib import Path
 import asyncio
 from playwright.async_api import async_playwright
 
-async def scrape_single_post(target_url):
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from db.posts_db import get_posts_db, post_from_raw
+from db.post_index import get_post_index, facebook_unique_id
+from db.evidence_media import get_evidence_writer
+
+
+async def collect_single_post(page, target_url):
+    """
+    Scrape the post open in `page` (already navigated to target_url): screenshot,
+    JSON and DuckDB row. No prompts - used by scrape_single_post and
+    collectors/batch_scheduler.py. Returns {'post_id', 'skipped'}.
+    """
     base_dir = Path(__file__).parent.parent.parent
     
+    # Extract handle from URL
+    handle_match = re.search(r'facebook\.com/([^/?]+)', target_url)
+    handle = handle_match.group(1) if handle_match else "unknown"
+    if handle == "permalink.php":
+        # Try to find handle in page title or content if it's a permalink.php URL
+        handle = "unknown_profile" 
+    
+    print(f"[*] Handle: {handle}")
+    
+    # Skip posts already in the dedup index (by pfbid / URL) before any DOM work
+    post_index = get_post_index()
+    known = post_index.load('facebook', handle)
+    post_index.close()  # don't hold posts.duckdb open while scraping
+    known_id = known.match(target_url)
+    if known_id is not None:
+        print(f"[*] Already collected: {known_id or target_url} - skipping.")
+        return {'post_id': known_id or None, 'skipped': True}
+    
+    # Directories
+    posts_dir = base_dir / "data" / "raw" / "facebook" / handle
+    screenshots_dir = base_dir / "data" / "evidence" / "facebook" / handle
+    posts_dir.mkdir(parents=True, exist_ok=True)
+    screenshots_dir.mkdir(parents=True, exist_ok=True)
+    
+    # Find the post container
+    # On a single post page, the main post usually has role="article" or aria-posinset
+    # We try to find the most prominent article
+    
+    print("[*] Looking for post container...")
+    
+    # Strategy 1: div[role="main"] - captures post + comments (safer for "whole post" view)
+    container = await page.query_selector('div[role="main"]')
+    
+    if not container:
+        print("[!] Could not find div[role='main'], trying div[role='article']...")
+        container = await page.query_selector('div[role="article"]')
+    
+    if not container:
+        print("[!] Could not find main container. Taking full page screenshot.")
+        container = page # Fallback to page for screenshot
+    
+    # Extract text
+    try:
+        if container != page:
+            full_text = await container.inner_text()
+        else:
+            full_text = await page.inner_text('body')
+    except:
+        full_text = ""
+    
+    clean_text = full_text.replace('Facebook', '').replace('\n', ' ').strip()
+    
+    # Generate ID: pfbid, story_fbid or a stable content fingerprint
+    unique_id = facebook_unique_id(handle, target_url, clean_text)
+    post_id = f"fb_{handle}_{unique_id}"
+    print(f"[*] Post ID: {post_id}")
+    
+    known_id = known.match(target_url, clean_text, post_id)
+    if known_id is not None:
+        print(f"[*] Already collected: {known_id or post_id} - skipping.")
+        return {'post_id': known_id or post_id, 'skipped': True}
+    
+    # Screenshot
+    screenshot_path = screenshots_dir / f"{post_id}.png"
+    print(f"[*] Taking screenshot: {screenshot_path}")
+    
+    # Written (with WebP preview + thumbnail) in the background while the post is parsed
+    evidence = get_evidence_writer()
+    screenshot_writes = []
+    try:
+        if container != page:
+            await container.scroll_into_view_if_needed()
+            await asyncio.sleep(0.5)
+            png = await container.screenshot()
+        else:
+            png = await page.screenshot()
+        screenshot_writes.append(evidence.submit(png, screenshot_path))
+    except Exception as e:
+        print(f"[!] Screenshot failed: {e}")
+        screenshot_path = None
+    
+    # External Links
+    external_urls = []
+    if container != page:
+        links = await container.query_selector_all('a[href]')
+        for link in links:
+            href = await link.get_attribute('href')
+            if href and ('l.facebook.com' in href or 'youtube.com' in href or 'youtu.be' in href):
+                 # Simple extraction, can be improved
+                 external_urls.append({'url': href})
+    
+    # Wait for the screenshot - the JSON must not point to a file whose write failed
+    written = await evidence.wait(screenshot_writes)
+    if written and written[0] is None:
+        screenshot_path = None
+    
+    # Save JSON
+    json_path = posts_dir / f"{post_id}.json"
+    post_data = {
+        'id': post_id,
+        'handle': handle,
+        'profile_url': f"https://www.facebook.com/{handle}",
+        'post_url': target_url,
+        'external_links': external_urls,
+        'screenshot': str(screenshot_path.relative_to(base_dir)) if screenshot_path else None,
+        'collected_at': datetime.now().isoformat(),
+        'raw_text_preview': clean_text[:1000]
+    }
+    
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(post_data, f, ensure_ascii=False, indent=2)
+    
+    print(f"[*] Saved JSON: {json_path}")
+    
+    db = get_posts_db()
+    stats = db.bulk_upsert([post_from_raw('facebook', handle, post_id, post_data)])
+    db.close()
+    print(f"[*] DuckDB: {stats['inserted']} inserted, {stats['updated']} updated")
+    known.add(post_id, target_url, clean_text)
+    post_index.record(known)
+    post_index.close()
+    return {'post_id': post_id, 'skipped': False}
+
+
+async def scrape_single_post(target_url):
     print("="*60)
     print("FACEBOOK SCRAPER - SINGLE POST")
     print("="*60)
@@ -56,108 +193,7 @@ async def scrape_single_post(target_url):
             
             print("[*] Starting scrape...")
             
-            # Extract handle from URL
-            handle_match = re.search(r'facebook\.com/([^/?]+)', target_url)
-            handle = handle_match.group(1) if handle_match else "unknown"
-            if handle == "permalink.php":
-                # Try to find handle in page title or content if it's a permalink.php URL
-                handle = "unknown_profile" 
-            
-            print(f"[*] Handle: {handle}")
-            
-            # Directories
-            posts_dir = base_dir / "data" / "raw" / "facebook" / handle
-            screenshots_dir = base_dir / "data" / "evidence" / "facebook" / handle
-            posts_dir.mkdir(parents=True, exist_ok=True)
-            screenshots_dir.mkdir(parents=True, exist_ok=True)
-            
-            # Find the post container
-            # On a single post page, the main post usually has role="article" or aria-posinset
-            # We try to find the most prominent article
-            
-            print("[*] Looking for post container...")
-            
-            # Strategy 1: div[role="main"] - captures post + comments (safer for "whole post" view)
-            container = await page.query_selector('div[role="main"]')
-            
-            if not container:
-                print("[!] Could not find div[role='main'], trying div[role='article']...")
-                container = await page.query_selector('div[role="article"]')
-            
-            if not container:
-                print("[!] Could not find main container. Taking full page screenshot.")
-                container = page # Fallback to page for screenshot
-            
-            # Extract text
-            try:
-                if container != page:
-                    full_text = await container.inner_text()
-                else:
-                    full_text = await page.inner_text('body')
-            except:
-                full_text = ""
-                
-            clean_text = full_text.replace('Facebook', '').replace('\n', ' ').strip()
-            
-            # Generate ID
-            # Try to extract pfbid from URL
-            pfbid_match = re.search(r'pfbid([0-9a-zA-Z]+)', target_url)
-            if pfbid_match:
-                unique_id = f"pfbid{pfbid_match.group(1)}"
-            else:
-                # Try story_fbid
-                story_match = re.search(r'story_fbid=(\d+)', target_url)
-                if story_match:
-                    unique_id = story_match.group(1)
-                else:
-                    # Hash fallback
-                    unique_id = f"h{hash(clean_text[:200]) & 0xFFFFFFFF:08x}"
-            
-            post_id = f"fb_{handle}_{unique_id}"
-            print(f"[*] Post ID: {post_id}")
-            
-            # Screenshot
-            screenshot_path = screenshots_dir / f"{post_id}.png"
-            print(f"[*] Taking screenshot: {screenshot_path}")
-            
-            try:
-                if container != page:
-                    await container.scroll_into_view_if_needed()
-                    await asyncio.sleep(0.5)
-                    await container.screenshot(path=str(screenshot_path))
-                else:
-                    await page.screenshot(path=str(screenshot_path))
-            except Exception as e:
-                print(f"[!] Screenshot failed: {e}")
-                screenshot_path = None
-
-            # External Links
-            external_urls = []
-            if container != page:
-                links = await container.query_selector_all('a[href]')
-                for link in links:
-                    href = await link.get_attribute('href')
-                    if href and ('l.facebook.com' in href or 'youtube.com' in href or 'youtu.be' in href):
-                         # Simple extraction, can be improved
-                         external_urls.append({'url': href})
-
-            # Save JSON
-            json_path = posts_dir / f"{post_id}.json"
-            post_data = {
-                'id': post_id,
-                'handle': handle,
-                'profile_url': f"https://www.facebook.com/{handle}",
-                'post_url': target_url,
-                'external_links': external_urls,
-                'screenshot': str(screenshot_path.relative_to(base_dir)) if screenshot_path else None,
-                'collected_at': datetime.now().isoformat(),
-                'raw_text_preview': clean_text[:1000]
-            }
-            
-            with open(json_path, 'w', encoding='utf-8') as f:
-                json.dump(post_data, f, ensure_ascii=False, indent=2)
-                
-            print(f"[*] Saved JSON: {json_path}")
+            await collect_single_post(page, target_url)
             print("\nDONE.")
 
     except Exception as e:
@@ -4,9 +4,15 @@ Każdy post = osobny JSON + screenshot z tym samym ID
 
 Wymaga Chrome uruchomionego z:
   chrome.exe --remote-debugging-port=9222 --user-data-dir="%TEMP%\chrome-debug"
+
+Tryb --since-last-run: zbiera tylko posty nowsze niż ostatnio zapisane w posts.duckdb
+(kończy po --known-streak znanych postach z rzędu, patrz db.post_index.Watermark).
 """
 
+import argparse
+
 import json
+import sys
 import uuid
 from datetime import datetime
 from pathlib import Path
@@ -14,19 +20,459 @@ import asyncio
 from playwright.async_api import async_playwright
 import re
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from db.posts_db import get_posts_db, post_from_raw
+from db.post_index import get_post_index, facebook_unique_id, DEFAULT_KNOWN_STREAK
+from db.evidence_media import get_evidence_writer
+
+# Skrypt wykonywany w przeglądarce RAZ na scroll (zamiast dziesiątek wywołań CDP na post).
+# Dla każdego nowego div[aria-posinset] zwraca: posinset, tekst, URL posta, linki zewnętrzne,
+# bounding box i znacznik data-russint-idx (do screenshotu). Kontenery z pfbid znanym z indeksu
+# (window.__russintKnown, KNOWN_POSTS_JS) są pomijane przed hoverem i czytaniem treści - zwracane
+# tylko ich posinset w `known`. Kolejność metod szukania URL
+# jak wcześniej: pfbid w kontenerze, pfbid w obrębie bbox, hover na linku z datą, ścieżki
+# /posts/ itd., regexy na HTML. HTML zwracany tylko dla postów bez URL (debug).
+EXTRACT_POSTS_JS = r'''
+async ({seen, handle}) => {
+    const seenSet = new Set(seen);
+    const FB = 'https://www.facebook.com';
+    const DATE_WORDS = ['godz', 'min', 'dni', 'hour', 'day', 'minute', 'lis', 'paź', 'wrz', 'sie',
+                        'lip', 'cze', 'maj', 'kwi', 'mar', 'lut', 'sty'];
+    const absolute = (href) => href.startsWith('/') ? FB + href : href;
+    const escapeRe = (text) => text.replace(/[.*+?^${}()|[\]\\]/g, '\\$&');
+    const decode = (text) => { try { return decodeURIComponent(text); } catch (e) { return text; } };
+    window.__russintIdx = window.__russintIdx || 0;
+
+    // pfbid link (not a comment) whose top edge lies within the container's box
+    const pfbidInBox = (el) => {
+        const rect = el.getBoundingClientRect();
+        let root = el;
+        for (let i = 0; i < 10 && root.parentElement; i++) root = root.parentElement;
+        for (const link of root.querySelectorAll('a[href*="pfbid"]')) {
+            const href = link.getAttribute('href');
+            if (!href || href.includes('comment_id=')) continue;
+            const top = link.getBoundingClientRect().top;
+            if (top >= rect.top && top <= rect.bottom) return href.split('?')[0];
+        }
+        return null;
+    };
+
+    const firstHref = (el, selector, accept) => {
+        for (const link of el.querySelectorAll(selector)) {
+            const href = link.getAttribute('href');
+            if (href && accept(href, link)) return href;
+        }
+        return null;
+    };
+
+    const fromHtml = (html) => {
+        let m = html.match(/pfbid[0-9a-zA-Z]{20,}/);
+        if (m) return `${FB}/${handle}/posts/${m[0]}`;
+        return null;
+    };
+
+    const fallbacks = (el, html) => {
+        // Standardowe ścieżki
+        for (const selector of ['a[href*="/posts/"]', 'a[href*="/permalink/"]', 'a[href*="/videos/"]', 'a[href*="/photos/"]']) {
+            const href = firstHref(el, selector, h => !h.includes('comment_id='));
+            if (href) return absolute(href.split('?')[0]);
+        }
+        // pfbid w HTML
+        const pfbid = fromHtml(html);
+        if (pfbid) return pfbid;
+        // Link z datą (aria-label)
+        const timeHref = firstHref(el, 'a[role="link"]', (h, link) => {
+            const aria = (link.getAttribute('aria-label') || '').toLowerCase();
+            return aria && DATE_WORDS.some(w => aria.includes(w)) && (h.includes('facebook.com') || h.startsWith('/'));
+        });
+        if (timeHref) return absolute(timeHref.split('?')[0]);
+        // story_fbid
+        const story = html.match(/story_fbid=(\d+)/);
+        const storyOwner = html.match(/id=(\d+)/);
+        if (story && storyOwner) return `${FB}/permalink.php?story_fbid=${story[1]}&id=${storyOwner[1]}`;
+        // Dowolny permalink z handle
+        const handleHref = firstHref(el, 'a[href]', h => h.includes(handle) &&
+            (h.includes('/posts/') || h.includes('/permalink') || h.includes('pfbid') || h.includes('story_fbid')));
+        if (handleHref) return absolute(handleHref.split('?')[0]);
+        // Wzorce URL w HTML
+        const h = escapeRe(handle);
+        const patterns = [
+            new RegExp(`/${h}/posts/[a-zA-Z0-9]+`),
+            new RegExp(`/${h}/videos/[0-9]+`),
+            new RegExp(`/${h}/photos/[a-zA-Z0-9/.]+`),
+            /permalink\.php\?story_fbid=[0-9]+&amp;id=[0-9]+/,
+            /story_fbid%3D([0-9]+).*?id%3D([0-9]+)/,
+        ];
+        for (const pattern of patterns) {
+            const m = html.match(pattern);
+            if (!m) continue;
+            const found = m[0].replace(/&amp;/g, '&');
+            if (found.startsWith('/')) return FB + found;
+            if (found.includes('%3D')) {
+                const sid = found.match(/story_fbid%3D([0-9]+)/);
+                const iid = found.match(/id%3D([0-9]+)/);
+                return sid && iid ? `${FB}/permalink.php?story_fbid=${sid[1]}&id=${iid[1]}` : null;
+            }
+            return `${FB}/${found}`;
+        }
+        return null;
+    };
+
+    const externalLinks = (el) => {
+        const links = [];
+        const seenUrls = new Set();
+        const add = (type, url) => {
+            if (!seenUrls.has(url)) { seenUrls.add(url); links.push({type, url}); }
+        };
+        for (const link of el.querySelectorAll('a[href*="youtube.com/watch"], a[href*="youtu.be/"]')) {
+            let url = (link.getAttribute('href') || '').split('&fbclid=')[0];
+            if (!url) continue;
+            if (url.includes('l.facebook.com')) {
+                const m = url.match(/u=([^&]+)/);
+                if (m) url = decode(m[1]).split('&fbclid=')[0];
+            }
+            add('youtube', url);
+        }
+        for (const link of el.querySelectorAll('a[href*="l.facebook.com/l.php"]')) {
+            const m = (link.getAttribute('href') || '').match(/u=([^&]+)/);
+            if (!m) continue;
+            const url = decode(m[1]).split('&fbclid=')[0];
+            if (!url.includes('youtube.com') && !url.includes('youtu.be')) add('article', url);
+        }
+        return links;
+    };
+
+    const knownPfbids = window.__russintKnown || new Set();
+    const isKnown = (url) => {
+        const m = url && url.match(/pfbid[0-9a-zA-Z]+/);
+        return Boolean(m && knownPfbids.has(m[0]));
+    };
+
+    const containers = Array.from(document.querySelectorAll('div[aria-posinset]'));
+    const posts = [];
+    const known = [];
+    let skipped = 0;
+    for (const el of containers) {
+        const posinset = el.getAttribute('aria-posinset');
+        if (posinset && seenSet.has(posinset)) { skipped++; continue; }
+        const inside = firstHref(el, 'a[href*="pfbid"]', h => !h.includes('comment_id=') && h.split('?')[0].includes('pfbid'));
+        const post_url = inside ? inside.split('?')[0] : pfbidInBox(el);
+        if (isKnown(post_url)) { known.push(posinset); continue; }
+        if (!el.dataset.russintIdx) el.dataset.russintIdx = String(++window.__russintIdx);
+        posts.push({el, posinset, post_url});
+    }
+
+    // Linki z datą (względne "?...") dostają pfbid dopiero po najechaniu - jeden wspólny hover i pauza
+    const needHover = posts.filter(p => !p.post_url);
+    if (needHover.length) {
+        for (const p of needHover) {
+            const cft = Array.from(p.el.querySelectorAll('a[href*="__cft__"]')).slice(1, 5);
+            for (const link of cft) {
+                if ((link.getAttribute('href') || '').startsWith('?')) {
+                    link.dispatchEvent(new MouseEvent('mouseover', {bubbles: true}));
+                    link.dispatchEvent(new FocusEvent('focusin', {bubbles: true}));
+                }
+            }
+        }
+        await new Promise(resolve => setTimeout(resolve, 150));
+        // Hover był wspólny dla wszystkich postów - link z pfbid musi leżeć w kontenerze
+        // (albo w jego ramce), inaczej post przejąłby pfbid następnego
+        for (const p of needHover) {
+            const hovered = firstHref(p.el, 'a[href*="pfbid"]', h => !h.includes('comment_id='));
+            p.post_url = hovered ? hovered.split('?')[0] : pfbidInBox(p.el);
+        }
+    }
+
+    return {
+        total: containers.length,
+        skipped,
+        known: known.concat(posts.filter(p => isKnown(p.post_url)).map(p => p.posinset)),
+        posts: posts.filter(p => !isKnown(p.post_url)).map(p => {
+            const html = p.post_url ? null : p.el.innerHTML;
+            const post_url = p.post_url || fallbacks(p.el, html);
+            const rect = p.el.getBoundingClientRect();
+            return {
+                idx: p.el.dataset.russintIdx,
+                posinset: p.posinset,
+                text: p.el.innerText || '',
+                post_url,
+                external_links: externalLinks(p.el),
+                rect: {x: rect.left + window.scrollX, y: rect.top + window.scrollY, width: rect.width, height: rect.height},
+                html: post_url ? null : html
+            };
+        })
+    };
+}
+'''
+
+# Obrazy w nowych kontenerach partii są załadowane (screenshoty bez pustych miejsc)
+IMAGES_LOADED_JS = """idxs => idxs.every(idx => {
+    const el = document.querySelector(`[data-russint-idx="${idx}"]`);
+    return !el || Array.from(el.querySelectorAll('img')).every(img => img.complete);
+})"""
+IMAGES_WAIT_MS = 2000  # limit czekania na obrazy - raz na partię postów, nie na każdy post
+
+# Znane pfbid profilu (z indeksu w posts.duckdb) - ładowane do strony raz, przed scrollowaniem
+KNOWN_POSTS_JS = 'pfbids => { window.__russintKnown = new Set(pfbids); return window.__russintKnown.size; }'
+
+
+def _feed_order(entry):
+    """Klucz sortowania (posinset, ...) - kolejność postów w feedzie."""
+    posinset = entry[0] or ''
+    return int(posinset) if posinset.isdigit() else 0
 
-async def scrape_posts():
+
+async def collect_posts(page, handle, since_last_run=False, known_streak=DEFAULT_KNOWN_STREAK):
     """
-    Łączy się z Chrome i zbiera posty z aktualnie otwartej strony FB.
-    Każdy post zapisuje jako osobny JSON + screenshot.
-    Automatycznie scrolluje stronę aby załadować posty.
+    Zbiera posty z profilu FB otwartego w `page`: scroll, JSON + screenshot per post, DuckDB.
+    Bez interakcji z użytkownikiem - wywoływane przez scrape_posts i collectors/batch_scheduler.py.
+    Zwraca statystyki: saved, known_skipped, duplicate_urls, unique_urls, posts_dir, screenshots_dir.
     """
     base_dir = Path(__file__).parent.parent.parent
-    posts_dir = base_dir / "data" / "raw" / "facebook" / "posts"
-    screenshots_dir = base_dir / "data" / "evidence" / "facebook" / "screenshots"
+    url = page.url
+    
+    # === KATALOGI DLA KONKRETNEGO PROFILU ===
+    # Struktura: data/raw/facebook/{handle}/...
+    posts_dir = base_dir / "data" / "raw" / "facebook" / handle
+    screenshots_dir = base_dir / "data" / "evidence" / "facebook" / handle
     posts_dir.mkdir(parents=True, exist_ok=True)
     screenshots_dir.mkdir(parents=True, exist_ok=True)
+    print(f"[*] Zapisuję do: {posts_dir}")
+    
+    # Timestamp sesji
+    session_ts = datetime.now().strftime('%Y%m%d_%H%M%S')
+    
+    # === INDEKS ZEBRANYCH POSTÓW (pfbid / URL / fingerprint treści) ===
+    post_index = get_post_index()
+    known = post_index.load('facebook', handle)
+    watermark = post_index.watermark(known, known_streak) if since_last_run else None
+    post_index.close()  # nie trzymaj posts.duckdb otwartego podczas scrapowania
+    await page.evaluate(KNOWN_POSTS_JS, known.pfbids)
+    print(f"[*] Znane posty w indeksie: {len(known)} kluczy")
+    if watermark:
+        print(f"[*] Tryb since-last-run: {watermark}")
+    known_skipped = 0
+    
+    # Screenshoty zapisuje pula wątków w tle (master PNG + podgląd WebP + miniatura)
+    evidence = get_evidence_writer()
+    screenshot_writes = []
+    
+    # === ZBIERANIE PODCZAS SCROLLOWANIA ===
+    print("[*] Scrollowanie i zbieranie postów...")
+    collected_ids = set()  # Zebrane post IDs (deduplikacja)
+    collected_urls = {}  # URL -> post_id (sprawdzanie duplikatów URL)
+    posts_saved = 0
+    no_new_posts_count = 0
+    max_scrolls = 100  # Maksymalnie 100 przewinięć
+    last_scroll_position = 0
+    same_position_count = 0
+    duplicate_url_count = 0  # Licznik duplikatów URL
+    db_rows = []  # Wiersze do DuckDB - zapisywane jednym batchem na końcu
+    
+    try:
+        for scroll_num in range(max_scrolls):
+            # Jeden przebieg w przeglądarce: wszystkie NOWE kontenery naraz (tekst, URL, linki, bbox)
+            extracted = await page.evaluate(EXTRACT_POSTS_JS, {
+                'seen': sorted(collected_ids),
+                'handle': handle
+            })
+        
+            new_posts_this_scroll = 0
+            skipped_duplicates = extracted['skipped']
+        
+            print(f"\n  [Scroll {scroll_num+1}] Znaleziono {extracted['total']} kontenerów...")
+        
+            # Nowe i znane (pfbid w indeksie, bez hovera i screenshotu) w kolejności feedu
+            feed = [(posinset, None) for posinset in extracted['known']]
+            feed += [(item['posinset'], item) for item in extracted['posts']]
+            feed.sort(key=_feed_order)
+
+            # Jedno czekanie na obrazy całej partii zamiast pauzy przed każdym screenshotem
+            if extracted['posts']:
+                try:
+                    await page.wait_for_function(
+                        IMAGES_LOADED_JS, arg=[item['idx'] for item in extracted['posts']],
+                        timeout=IMAGES_WAIT_MS
+                    )
+                except Exception:
+                    pass
+        
+            for posinset, item in feed:
+                if watermark and watermark.reached:
+                    break
+                if item is None:
+                    if posinset:
+                        collected_ids.add(posinset)
+                    known_skipped += 1
+                    if watermark:
+                        watermark.see(True)
+                    continue
+                try:
+                    # Sprawdź czy kontener ma treść
+                    clean_text = item['text'].replace('Facebook', '').replace('\n', '').strip()
+                    if len(clean_text) < 20:
+                        continue
+                
+                    # Dodaj do zebranych
+                    if posinset:
+                        collected_ids.add(posinset)
+                
+                    post_url = item['post_url']
+                    external_urls = item['external_links']
+                
+                    # === ID POSTA (uniwersalne: source_handle_unique) ===
+                    source = "fb"  # Facebook
+                
+                    # pfbid jeśli dostępny, inaczej stabilny fingerprint treści (SHA-1, ten sam w każdym uruchomieniu)
+                    unique_id = facebook_unique_id(handle, post_url, clean_text)
+                    post_id = f"{source}_{handle}_{unique_id}"
+                
+                    # === SPRAWDŹ CZY JUŻ ZEBRANY (indeks) ===
+                    json_path = posts_dir / f"{post_id}.json"
+                    known_id = known.match(post_url, clean_text, post_id)
+                    if known_id is not None or json_path.exists():
+                        print(f"    [SKIP] {known_id or post_id} już zebrany")
+                        known.add(known_id or post_id, post_url, clean_text)
+                        known_skipped += 1
+                        if watermark:
+                            watermark.see(True)
+                        continue
+                    if watermark:
+                        watermark.see(False)
+                    posts_saved += 1
+                
+                    # === SCREENSHOT === (kontener oznaczony przez skrypt atrybutem data-russint-idx)
+                    screenshot_path = screenshots_dir / f"{post_id}.png"
+                    screenshot_write = None
+                    try:
+                        if item['rect']['height'] <= 0:
+                            raise ValueError("kontener niewidoczny")
+                        # screenshot() sam przewija kontener do widoku
+                        png = await page.locator(f'[data-russint-idx="{item["idx"]}"]').screenshot()
+                        screenshot_write = evidence.submit(png, screenshot_path)
+                    except:
+                        screenshot_path = None
+                
+                    # === DEBUG: Zapisz HTML jeśli brak URL ===
+                    if not post_url:
+                        debug_dir = base_dir / "data" / "debug"
+                        debug_dir.mkdir(parents=True, exist_ok=True)
+                        debug_path = debug_dir / f"{post_id}_debug.html"
+                        with open(debug_path, 'w', encoding='utf-8') as f:
+                            f.write(item['html'] or '')
+                
+                    # === ZAPISZ JSON ===
+                    post_data = {
+                        'id': post_id,
+                        'handle': handle,
+                        'profile_url': url,
+                        'post_url': post_url,
+                        'external_links': external_urls if external_urls else None,
+                        'screenshot': str(screenshot_path.relative_to(base_dir)) if screenshot_path else None,
+                        'collected_at': datetime.now().isoformat(),
+                        'raw_text_preview': clean_text[:500] if clean_text else None
+                    }
+                
+                    with open(json_path, 'w', encoding='utf-8') as f:
+                        json.dump(post_data, f, ensure_ascii=False, indent=2)
+                    db_row = post_from_raw('facebook', handle, post_id, post_data)
+                    db_rows.append(db_row)
+                    if screenshot_write:
+                        screenshot_writes.append((screenshot_write, json_path, post_data, db_row))
+                    known.add(post_id, post_url, clean_text)
+                
+                    # === CHECK DUPLIKATY URL ===
+                    is_duplicate = False
+                    if post_url:
+                        if post_url in collected_urls:
+                            duplicate_url_count += 1
+                            is_duplicate = True
+                        else:
+                            collected_urls[post_url] = post_id
+                
+                    new_posts_this_scroll += 1
+                    ext_info = f" + {len(external_urls)} ext" if external_urls else ""
+                    url_short = post_url[-30:] if post_url else "BRAK"
+                    dup_mark = " ⚠️DUP!" if is_duplicate else ""
+                    print(f"    [{posts_saved}] {post_id} -> {url_short}{ext_info}{dup_mark}")
+                
+                except Exception as e:
+                    continue
+        
+            if watermark and watermark.reached:
+                print(f"\n[*] {watermark.streak} znanych postów z rzędu - reszta zebrana wcześniej, koniec")
+                break
+        
+            # Przewiń w dół
+            await page.evaluate('window.scrollBy(0, window.innerHeight * 1.5)')
+            await asyncio.sleep(0.5)
+        
+            # Sprawdź aktualną pozycję scrolla
+            current_scroll = await page.evaluate('window.scrollY')
+        
+            print(f"    -> Nowe: {new_posts_this_scroll}, Pominięte: {skipped_duplicates}, Znane: {len(extracted['known'])}, Scroll: {current_scroll:.0f}px")
+        
+            # Sprawdź czy scroll się zatrzymał (koniec strony)
+            if current_scroll == last_scroll_position:
+                same_position_count += 1
+                if same_position_count >= 3:
+                    print(f"\n[*] Scroll się zatrzymał - koniec strony")
+                    break
+            else:
+                same_position_count = 0
+                last_scroll_position = current_scroll
+        
+            # Sprawdź czy są nowe posty
+            if new_posts_this_scroll == 0:
+                no_new_posts_count += 1
+                if no_new_posts_count >= 8:
+                    print(f"\n[*] Brak nowych postów po 8 scrollach - koniec")
+                    break
+            else:
+                no_new_posts_count = 0
+    finally:
+        # Również po timeoucie / błędzie (anulowanie przez batch_scheduler): zapisane JSON-y muszą
+        # trafić do DuckDB i indeksu, bo kolejna próba pomija posty, których JSON już istnieje
+        
+        # === DOKOŃCZ ZAPIS SCREENSHOTÓW ===
+        if screenshot_writes:
+            written = await evidence.wait(write[0] for write in screenshot_writes)
+            print(f"\n[*] Screenshoty zapisane: {sum(1 for w in written if w)}/{len(written)}")
+            # Nieudany zapis w tle - JSON i wiersz DuckDB nie mogą wskazywać pliku, którego nie ma
+            for path, (_, json_path, post_data, db_row) in zip(written, screenshot_writes):
+                if path is None:
+                    post_data['screenshot'] = db_row['screenshot'] = None
+                    with open(json_path, 'w', encoding='utf-8') as f:
+                        json.dump(post_data, f, ensure_ascii=False, indent=2)
+        
+        # === ZAPIS DO DUCKDB (jeden batch zamiast INSERT per post) ===
+        if db_rows:
+            db = get_posts_db()
+            stats = db.bulk_upsert(db_rows)
+            db.close()
+            print(f"\n[*] DuckDB: {stats['inserted']} nowych, {stats['updated']} zaktualizowanych, {stats['failed']} błędów")
+        post_index.record(known)
+        post_index.close()
     
+    return {
+        'handle': handle,
+        'saved': posts_saved,
+        'known_skipped': known_skipped,
+        'duplicate_urls': duplicate_url_count,
+        'unique_urls': len(collected_urls),
+        'posts_dir': posts_dir,
+        'screenshots_dir': screenshots_dir
+    }
+
+
+async def scrape_posts(since_last_run=False, known_streak=DEFAULT_KNOWN_STREAK):
+    """
+    Łączy się z Chrome i zbiera posty z aktualnie otwartej strony FB.
+    Każdy post zapisuje jako osobny JSON + screenshot.
+    Automatycznie scrolluje stronę aby załadować posty.
+    since_last_run: kończy scrollowanie po known_streak znanych postach z rzędu.
+    """
     print("="*60)
     print("FACEBOOK SCRAPER v2 - AUTO-SCROLL")
     print("="*60)
@@ -69,396 +515,16 @@ async def scrape_posts():
             handle = handle_match.group(1) if handle_match else "unknown"
             print(f"[*] Handle: {handle}")
             
-            # === KATALOGI DLA KONKRETNEGO PROFILU ===
-            # Struktura: data/raw/facebook/{handle}/...
-            posts_dir = base_dir / "data" / "raw" / "facebook" / handle
-            screenshots_dir = base_dir / "data" / "evidence" / "facebook" / handle
-            posts_dir.mkdir(parents=True, exist_ok=True)
-            screenshots_dir.mkdir(parents=True, exist_ok=True)
-            print(f"[*] Zapisuję do: {posts_dir}")
-            
-            # Timestamp sesji
-            session_ts = datetime.now().strftime('%Y%m%d_%H%M%S')
-            
-            # === ZBIERANIE PODCZAS SCROLLOWANIA ===
-            print("[*] Scrollowanie i zbieranie postów...")
-            collected_ids = set()  # Zebrane post IDs (deduplikacja)
-            collected_urls = {}  # URL -> post_id (sprawdzanie duplikatów URL)
-            posts_saved = 0
-            no_new_posts_count = 0
-            max_scrolls = 100  # Maksymalnie 100 przewinięć
-            last_scroll_position = 0
-            same_position_count = 0
-            duplicate_url_count = 0  # Licznik duplikatów URL
-            
-            for scroll_num in range(max_scrolls):
-                # Pobierz wszystkie widoczne kontenery
-                post_containers = await page.query_selector_all('div[aria-posinset]')
-                
-                new_posts_this_scroll = 0
-                skipped_duplicates = 0
-                
-                print(f"\n  [Scroll {scroll_num+1}] Znaleziono {len(post_containers)} kontenerów...")
-                
-                for container in post_containers:
-                    try:
-                        # === DEDUPLIKACJA PO aria-posinset (indeks posta na FB) ===
-                        posinset = await container.get_attribute('aria-posinset')
-                        if posinset and posinset in collected_ids:
-                            skipped_duplicates += 1
-                            continue
-                        
-                        # Sprawdź czy kontener ma treść
-                        full_text = await container.inner_text()
-                        clean_text = full_text.replace('Facebook', '').replace('\n', '').strip()
-                        if len(clean_text) < 20:
-                            continue
-                        
-                        # Dodaj do zebranych
-                        if posinset:
-                            collected_ids.add(posinset)
-                        
-                        # Przewiń dokładnie do tego posta
-                        await container.scroll_into_view_if_needed()
-                        await asyncio.sleep(0.2)  # Szybszy scroll
-                        
-                        # === WYCIĄGNIJ URL POSTA ===
-                        post_url = None
-                        inner_html = await container.inner_html()
-                        
-                        # Metoda 0: JavaScript - znajdź WŁASNY link pfbid dla tego posta (STRICT bounding box)
-                        try:
-                            post_url = await container.evaluate('''(el) => {
-                                // Pobierz bounding box tego kontenera
-                                const myRect = el.getBoundingClientRect();
-                                const myTop = myRect.top;
-                                const myBottom = myRect.bottom;
-                                
-                                // Idź w górę i szukaj wszystkich linków pfbid
-                                let current = el;
-                                for (let i = 0; i < 10; i++) {
-                                    if (!current.parentElement) break;
-                                    current = current.parentElement;
-                                }
-                                
-                                // Znajdź wszystkie linki pfbid
-                                const allLinks = current.querySelectorAll('a[href*="pfbid"]');
-                                
-                                // Znajdź link którego pozycja jest WEWNĄTRZ naszego kontenera (STRICT)
-                                for (const link of allLinks) {
-                                    const href = link.getAttribute('href');
-                                    if (!href || href.includes('comment_id=')) continue;
-                                    
-                                    const linkRect = link.getBoundingClientRect();
-                                    const linkTop = linkRect.top;
-                                    
-                                    // Link musi być DOKŁADNIE wewnątrz kontenera (bez fallback!)
-                                    if (linkTop >= myTop && linkTop <= myBottom) {
-                                        return href.split('?')[0];
-                                    }
-                                }
-                                
-                                // NIE MA FALLBACK - zwróć null jeśli nie znaleziono
-                                return null;
-                            }''')
-                        except Exception as e:
-                            print(f"      [DEBUG] Metoda 0 error: {e}")
-                        
-                        # RETRY: Jeśli nie znaleziono, szukaj linku timestamp (drugi lub trzeci link z __cft__)
-                        if not post_url:
-                            try:
-                                # Znajdź wszystkie linki z __cft__ - timestamp to zwykle 2-4 link
-                                cft_links = await container.query_selector_all('a[href*="__cft__"]')
-                                
-                                # Pomiń pierwszy (to profil), weź następne
-                                for i, link in enumerate(cft_links[1:5] if len(cft_links) > 1 else []):
-                                    href = await link.get_attribute('href')
-                                    # Szukaj linku który jest WZGLĘDNY (zaczyna się od ?) - to timestamp
-                                    if href and href.startswith('?'):
-                                        await link.hover()
-                                        await asyncio.sleep(0.15)
-                                        
-                                        # Sprawdź czy po hover pojawił się pfbid
-                                        post_url = await container.evaluate('''(el) => {
-                                            const myRect = el.getBoundingClientRect();
-                                            const myTop = myRect.top;
-                                            const myBottom = myRect.bottom;
-                                            
-                                            let current = el;
-                                            for (let i = 0; i < 10; i++) {
-                                                if (!current.parentElement) break;
-                                                current = current.parentElement;
-                                            }
-                                            
-                                            const allLinks = current.querySelectorAll('a[href*="pfbid"]');
-                                            
-                                            for (const link of allLinks) {
-                                                const href = link.getAttribute('href');
-                                                if (!href || href.includes('comment_id=')) continue;
-                                                const linkRect = link.getBoundingClientRect();
-                                                if (linkRect.top >= myTop - 50 && linkRect.top <= myBottom + 50) {
-                                                    return href.split('?')[0];
-                                                }
-                                            }
-                                            return null;
-                                        }''')
-                                        
-                                        if post_url:
-                                            break
-                                
-                                # Reset hover
-                                await container.hover()
-                            except:
-                                pass
-                        
-                        # Metoda 1: Szukaj linków z pfbid wewnątrz kontenera
-                        pfbid_links = await container.query_selector_all('a[href*="pfbid"]')
-                        for link in pfbid_links:
-                            href = await link.get_attribute('href')
-                            if href and 'comment_id=' not in href:
-                                clean_href = href.split('?')[0]
-                                if 'pfbid' in clean_href:
-                                    post_url = clean_href
-                                    break
-                        
-                        # Metoda 2: Szukaj po standardowych ścieżkach
-                        if not post_url:
-                            link_selectors = [
-                                'a[href*="/posts/"]',
-                                'a[href*="/permalink/"]', 
-                                'a[href*="/videos/"]',
-                                'a[href*="/photos/"]',
-                            ]
-                            for selector in link_selectors:
-                                links = await container.query_selector_all(selector)
-                                for link in links:
-                                    href = await link.get_attribute('href')
-                                    if href and 'comment_id=' not in href:
-                                        clean_href = href.split('?')[0]
-                                        if clean_href.startswith('/'):
-                                            post_url = f"https://www.facebook.com{clean_href}"
-                                        else:
-                                            post_url = clean_href
-                                        break
-                                if post_url:
-                                    break
-                        
-                        # Metoda 3: Regex na HTML - szukaj pfbid (cyfry LUB litery po pfbid)
-                        if not post_url:
-                            pfbid_match = re.search(r'pfbid[0-9a-zA-Z]{20,}', inner_html)
-                            if pfbid_match:
-                                post_url = f"https://www.facebook.com/{handle}/posts/{pfbid_match.group(0)}"
-                        
-                        # Metoda 4: Szukaj linku w timestamp (aria-label z datą)
-                        if not post_url:
-                            # Szukaj linków które mają aria-label lub są w pobliżu tekstu z datą
-                            time_links = await container.query_selector_all('a[role="link"]')
-                            for link in time_links:
-                                href = await link.get_attribute('href')
-                                aria = await link.get_attribute('aria-label')
-                                if href and aria:
-                                    # Aria-label zawierające datę/czas
-                                    if any(x in aria.lower() for x in ['godz', 'min', 'dni', 'hour', 'day', 'minute', 'lis', 'paź', 'wrz', 'sie', 'lip', 'cze', 'maj', 'kwi', 'mar', 'lut', 'sty']):
-                                        if 'facebook.com' in href or href.startswith('/'):
-                                            clean_href = href.split('?')[0]
-                                            if clean_href.startswith('/'):
-                                                post_url = f"https://www.facebook.com{clean_href}"
-                                            else:
-                                                post_url = clean_href
-                                            break
-                        
-                        # Metoda 5: Szukaj story_fbid w URL
-                        if not post_url:
-                            story_match = re.search(r'story_fbid=(\d+)', inner_html)
-                            if story_match:
-                                id_match = re.search(r'id=(\d+)', inner_html)
-                                if id_match:
-                                    post_url = f"https://www.facebook.com/permalink.php?story_fbid={story_match.group(1)}&id={id_match.group(1)}"
-                        
-                        # Metoda 6: Szukaj KAŻDEGO linku z handle w href
-                        if not post_url:
-                            all_links = await container.query_selector_all('a[href]')
-                            for link in all_links:
-                                href = await link.get_attribute('href')
-                                if href and handle in href:
-                                    # Szukaj linków które wyglądają jak permalink
-                                    if '/posts/' in href or '/permalink' in href or 'pfbid' in href or 'story_fbid' in href:
-                                        clean_href = href.split('?')[0]
-                                        if clean_href.startswith('/'):
-                                            post_url = f"https://www.facebook.com{clean_href}"
-                                        else:
-                                            post_url = clean_href
-                                        break
-                        
-                        # Metoda 7: Regex - szukaj wszystkich wzorców FB URL w HTML
-                        if not post_url:
-                            # story_fbid w dowolnym formacie
-                            patterns = [
-                                rf'/{handle}/posts/[a-zA-Z0-9]+',
-                                rf'/{handle}/videos/[0-9]+',
-                                rf'/{handle}/photos/[a-zA-Z0-9/.]+',
-                                r'permalink\.php\?story_fbid=[0-9]+&amp;id=[0-9]+',
-                                r'story_fbid%3D([0-9]+).*?id%3D([0-9]+)',
-                            ]
-                            for pattern in patterns:
-                                match = re.search(pattern, inner_html)
-                                if match:
-                                    found = match.group(0).replace('&amp;', '&')
-                                    if found.startswith('/'):
-                                        post_url = f"https://www.facebook.com{found}"
-                                    elif 'permalink' in found:
-                                        post_url = f"https://www.facebook.com/{found}"
-                                    elif '%3D' in found:
-                                        # URL-encoded story_fbid
-                                        sid = re.search(r'story_fbid%3D([0-9]+)', found)
-                                        iid = re.search(r'id%3D([0-9]+)', found)
-                                        if sid and iid:
-                                            post_url = f"https://www.facebook.com/permalink.php?story_fbid={sid.group(1)}&id={iid.group(1)}"
-                                    else:
-                                        post_url = f"https://www.facebook.com{found}"
-                                    break
-                        
-                        # === LINKI ZEWNĘTRZNE ===
-                        external_urls = []
-                        seen_urls = set()
-                        
-                        # YouTube
-                        yt_links = await container.query_selector_all('a[href*="youtube.com/watch"], a[href*="youtu.be/"]')
-                        for link in yt_links:
-                            href = await link.get_attribute('href')
-                            if href:
-                                clean_url = href.split('&fbclid=')[0]
-                                if 'l.facebook.com' in clean_url:
-                                    url_match = re.search(r'u=([^&]+)', clean_url)
-                                    if url_match:
-                                        from urllib.parse import unquote
-                                        clean_url = unquote(url_match.group(1)).split('&fbclid=')[0]
-                                if clean_url not in seen_urls:
-                                    seen_urls.add(clean_url)
-                                    external_urls.append({'type': 'youtube', 'url': clean_url})
-                        
-                        # Inne linki zewnętrzne
-                        ext_links = await container.query_selector_all('a[href*="l.facebook.com/l.php"]')
-                        for link in ext_links:
-                            href = await link.get_attribute('href')
-                            if href:
-                                url_match = re.search(r'u=([^&]+)', href)
-                                if url_match:
-                                    from urllib.parse import unquote
-                                    decoded_url = unquote(url_match.group(1)).split('&fbclid=')[0]
-                                    if 'youtube.com' not in decoded_url and 'youtu.be' not in decoded_url:
-                                        if decoded_url not in seen_urls:
-                                            seen_urls.add(decoded_url)
-                                            external_urls.append({'type': 'article', 'url': decoded_url})
-                        
-                        # === ID POSTA (uniwersalne: source_handle_unique) ===
-                        posts_saved += 1
-                        source = "fb"  # Facebook
-                        
-                        # Użyj pfbid jako ID jeśli dostępny, inaczej hash contentu
-                        if post_url and 'pfbid' in post_url:
-                            # Wyciągnij pfbid z URL
-                            pfbid_match = re.search(r'pfbid([0-9a-zA-Z]+)', post_url)
-                            if pfbid_match:
-                                unique_id = f"pfbid{pfbid_match.group(1)}"
-                            else:
-                                unique_id = f"h{hash(clean_text[:200]) & 0xFFFFFFFF:08x}"
-                        else:
-                            # Fallback: hash z treści
-                            unique_id = f"h{hash(clean_text[:200]) & 0xFFFFFFFF:08x}"
-                        
-                        post_id = f"{source}_{handle}_{unique_id}"
-                        
-                        # === SPRAWDŹ CZY JUŻ ISTNIEJE ===
-                        json_path = posts_dir / f"{post_id}.json"
-                        if json_path.exists():
-                            print(f"    [SKIP] {post_id} już istnieje")
-                            continue
-                        
-                        # === SCREENSHOT ===
-                        screenshot_path = screenshots_dir / f"{post_id}.png"
-                        try:
-                            await container.screenshot(path=str(screenshot_path))
-                        except:
-                            screenshot_path = None
-                        
-                        # === DEBUG: Zapisz HTML jeśli brak URL ===
-                        if not post_url:
-                            debug_dir = base_dir / "data" / "debug"
-                            debug_dir.mkdir(parents=True, exist_ok=True)
-                            debug_path = debug_dir / f"{post_id}_debug.html"
-                            with open(debug_path, 'w', encoding='utf-8') as f:
-                                f.write(inner_html)
-                        
-                        # === ZAPISZ JSON ===
-                        post_data = {
-                            'id': post_id,
-                            'handle': handle,
-                            'profile_url': url,
-                            'post_url': post_url,
-                            'external_links': external_urls if external_urls else None,
-                            'screenshot': str(screenshot_path.relative_to(base_dir)) if screenshot_path else None,
-                            'collected_at': datetime.now().isoformat(),
-                            'raw_text_preview': clean_text[:500] if clean_text else None
-                        }
-                        
-                        with open(json_path, 'w', encoding='utf-8') as f:
-                            json.dump(post_data, f, ensure_ascii=False, indent=2)
-                        
-                        # === CHECK DUPLIKATY URL ===
-                        is_duplicate = False
-                        if post_url:
-                            if post_url in collected_urls:
-                                duplicate_url_count += 1
-                                is_duplicate = True
-                            else:
-                                collected_urls[post_url] = post_id
-                        
-                        new_posts_this_scroll += 1
-                        ext_info = f" + {len(external_urls)} ext" if external_urls else ""
-                        url_short = post_url[-30:] if post_url else "BRAK"
-                        dup_mark = " ⚠️DUP!" if is_duplicate else ""
-                        print(f"    [{posts_saved}] {post_id} -> {url_short}{ext_info}{dup_mark}")
-                        
-                    except Exception as e:
-                        continue
-                
-                # Przewiń w dół
-                await page.evaluate('window.scrollBy(0, window.innerHeight * 1.5)')
-                await asyncio.sleep(0.5)
-                
-                # Sprawdź aktualną pozycję scrolla
-                current_scroll = await page.evaluate('window.scrollY')
-                
-                print(f"    -> Nowe: {new_posts_this_scroll}, Pominięte: {skipped_duplicates}, Scroll: {current_scroll:.0f}px")
-                
-                # Sprawdź czy scroll się zatrzymał (koniec strony)
-                if current_scroll == last_scroll_position:
-                    same_position_count += 1
-                    if same_position_count >= 3:
-                        print(f"\n[*] Scroll się zatrzymał - koniec strony")
-                        break
-                else:
-                    same_position_count = 0
-                    last_scroll_position = current_scroll
-                
-                # Sprawdź czy są nowe posty
-                if new_posts_this_scroll == 0:
-                    no_new_posts_count += 1
-                    if no_new_posts_count >= 8:
-                        print(f"\n[*] Brak nowych postów po 8 scrollach - koniec")
-                        break
-                else:
-                    no_new_posts_count = 0
+            stats = await collect_posts(page, handle, since_last_run, known_streak)
             
             print(f"\n{'='*60}")
-            print(f"ZAKOŃCZONO - zapisano {posts_saved} postów")
-            if duplicate_url_count > 0:
-                print(f"⚠️  UWAGA: {duplicate_url_count} duplikatów URL!")
-            print(f"Unikalne URL: {len(collected_urls)}")
+            print(f"ZAKOŃCZONO - zapisano {stats['saved']} postów, pominięto {stats['known_skipped']} znanych")
+            if stats['duplicate_urls'] > 0:
+                print(f"⚠️  UWAGA: {stats['duplicate_urls']} duplikatów URL!")
+            print(f"Unikalne URL: {stats['unique_urls']}")
             print(f"{'='*60}")
-            print(f"Posty JSON: {posts_dir}")
-            print(f"Screenshoty: {screenshots_dir}")
+            print(f"Posty JSON: {stats['posts_dir']}")
+            print(f"Screenshoty: {stats['screenshots_dir']}")
             print(f"{'='*60}")
             
     except Exception as e:
@@ -470,4 +536,10 @@ async def scrape_posts():
 
 
 if __name__ == "__main__":
-    asyncio.run(scrape_posts())
+    parser = argparse.ArgumentParser(description='Facebook Scraper v2 - posty z otwartej strony w Chrome')
+    parser.add_argument('--since-last-run', action='store_true',
+                        help='Zbieraj tylko posty nowsze niż zapisane w posts.duckdb')
+    parser.add_argument('--known-streak', type=int, default=DEFAULT_KNOWN_STREAK,
+                        help=f'Ile znanych postów z rzędu kończy tryb --since-last-run (domyślnie {DEFAULT_KNOWN_STREAK})')
+    args = parser.parse_args()
+    asyncio.run(scrape_posts(since_last_run=args.since_last_run, known_streak=args.known_streak))
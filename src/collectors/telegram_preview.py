@@ -0,0 +1,200 @@
+"""
+Telegram preview collector - fetches public t.me/s/<channel> pages over plain HTTP
+and parses them with lxml (no browser).
+
+Produces the same channel_data structure as telegram_scraper.scrape_channel_preview:
+{'title': str, 'messages': [{'text', 'date', 'url'}, ...]}, plus 'complete'
+(False when a page after the first one failed).
+Older history is fetched page by page with the ?before=<message id> cursor.
+"""
+import asyncio
+import gzip
+import http.client
+import queue
+import re
+import threading
+import urllib.parse
+import zlib
+
+from lxml import html as lxml_html
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+
+DEFAULT_CONNECTIONS = 8
+DEFAULT_TIMEOUT = 20
+
+
+def _class_xpath(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+def _element_text(el):
+    """Text of an element with <br> rendered as newlines (like innerText)."""
+    for br in el.iter('br'):
+        br.tail = '\n' + (br.tail or '')
+    return el.text_content().strip()
+
+
+def parse_channel_html(content):
+    """
+    Parse a t.me/s/<channel> page.
+    Returns {'title', 'messages', 'before'}; 'before' is the cursor for older
+    messages (None when the page has no older history).
+    """
+    if isinstance(content, bytes):
+        # t.me serves UTF-8; lxml would otherwise guess latin-1 without a meta charset
+        content = content.decode('utf-8', errors='replace')
+    doc = lxml_html.fromstring(content)
+
+    title_el = doc.xpath(f"//*[{_class_xpath('tgme_channel_info_header_title')}]")
+    title = _element_text(title_el[0]) if title_el else 'Unknown'
+
+    messages = []
+    message_ids = []
+    for el in doc.xpath(f"//*[{_class_xpath('tgme_widget_message')}]"):
+        post = el.get('data-post') or ''
+        post_id = post.rsplit('/', 1)[-1]
+        if post_id.isdigit():
+            message_ids.append(int(post_id))
+
+        text_el = el.xpath(f".//*[{_class_xpath('tgme_widget_message_text')}]")
+        if not text_el:
+            continue
+        date_el = el.xpath(f".//*[{_class_xpath('tgme_widget_message_date')}]//time")
+        link_el = el.xpath(f".//a[{_class_xpath('tgme_widget_message_date')}]")
+        messages.append({
+            'text': _element_text(text_el[0]),
+            'date': date_el[0].get('datetime') if date_el else None,
+            'url': link_el[0].get('href') if link_el else None
+        })
+
+    before = None
+    prev_link = doc.xpath("//link[@rel='prev']/@href")
+    if prev_link:
+        match = re.search(r'before=(\d+)', prev_link[0])
+        if match:
+            before = int(match.group(1))
+    elif message_ids and min(message_ids) > 1:
+        before = min(message_ids)
+
+    return {'title': title, 'messages': messages, 'before': before}
+
+
+class ConnectionPool:
+    """Keep-alive HTTP(S) connections per host, shared by worker threads."""
+
+    def __init__(self, max_per_host=DEFAULT_CONNECTIONS, timeout=DEFAULT_TIMEOUT):
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def _new_connection(self, scheme, host):
+        if scheme == 'https':
+            return http.client.HTTPSConnection(host, timeout=self.timeout)
+        return http.client.HTTPConnection(host, timeout=self.timeout)
+
+    def request(self, url):
+        """GET url; returns (status, body bytes). Retries once on a stale connection."""
+        parsed = urllib.parse.urlsplit(url)
+        key = (parsed.scheme, parsed.netloc)
+        path = parsed.path or '/'
+        if parsed.query:
+            path += '?' + parsed.query
+        headers = {
+            'User-Agent': USER_AGENT,
+            'Accept': 'text/html',
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive'
+        }
+
+        for attempt in range(2):
+            with self._lock:
+                idle = self._idle.setdefault(key, queue.LifoQueue())
+            try:
+                conn = idle.get_nowait()
+                reused = True
+            except queue.Empty:
+                conn = self._new_connection(*key)
+                reused = False
+
+            try:
+                conn.request('GET', path, headers=headers)
+                response = conn.getresponse()
+                body = response.read()
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                if reused and attempt == 0:
+                    continue
+                raise
+
+            encoding = response.getheader('Content-Encoding', '')
+            if encoding == 'gzip':
+                body = gzip.decompress(body)
+            elif encoding == 'deflate':
+                body = zlib.decompress(body)
+
+            if response.will_close or idle.qsize() >= self.max_per_host:
+                conn.close()
+            else:
+                idle.put(conn)
+            return response.status, body
+
+    def close(self):
+        with self._lock:
+            for idle in self._idle.values():
+                while not idle.empty():
+                    idle.get_nowait().close()
+            self._idle.clear()
+
+
+class TelegramPreviewClient:
+    """Async fetch-and-parse client for t.me/s channel previews."""
+
+    def __init__(self, max_connections=DEFAULT_CONNECTIONS, timeout=DEFAULT_TIMEOUT, limiter=None):
+        self.pool = ConnectionPool(max_connections, timeout)
+        self.limiter = limiter
+        self._semaphore = asyncio.Semaphore(max_connections)
+
+    async def fetch(self, url):
+        """Fetch a page body (bytes); raises on non-200 responses."""
+        if self.limiter:
+            await self.limiter.wait(url)
+        async with self._semaphore:
+            status, body = await asyncio.to_thread(self.pool.request, url)
+        if status != 200:
+            raise RuntimeError(f"HTTP {status} for {url}")
+        return body
+
+    async def fetch_channel(self, channel_url, pages=1):
+        """
+        Fetch up to `pages` preview pages (newest first), following ?before=.
+        Returns channel_data ({'title', 'messages', 'complete'}) or None on failure;
+        complete is False when a later page failed (messages holds the pages before it).
+        """
+        base_url = channel_url.split('?', 1)[0]
+        url = channel_url
+        title = None
+        messages = []
+        complete = True
+
+        try:
+            for _ in range(max(1, pages)):
+                page = await asyncio.to_thread(parse_channel_html, await self.fetch(url))
+                title = title or page['title']
+                messages.extend(page['messages'])
+                if not page['before']:
+                    break
+                url = f"{base_url}?before={page['before']}"
+        except Exception as e:
+            print(f"Error fetching {url}: {e}")
+            if not messages:
+                return None
+            complete = False
+
+        if not messages and title in (None, 'Unknown'):
+            return None
+        return {'title': title, 'messages': messages, 'complete': complete}
+
+    def close(self):
+        self.pool.close()
@@ -3,10 +3,19 @@ import json
 import os
 import re
 import csv
+import sys
+import argparse
 from datetime import datetime
+from pathlib import Path
 from playwright.async_api import async_playwright
 import urllib.parse
 
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from analysis.keyword_scorer import KeywordScorer, TAG_SCORES, RISK_THRESHOLD
+from collectors.telegram_preview import TelegramPreviewClient
+
 # Load keywords from dictionary file
 DICTIONARY_PATH = "data/dictionaries/suspicious_keywords.json"
 
@@ -34,70 +43,66 @@ SEARCH_KEYWORDS = loaded_search if loaded_search else [
     "partyzantka", "legion", "batalion", "ruch oporu"
 ]
 
-# Scoring configuration
-TAG_SCORES = {
-    "DIRECT": 50,
-    "SABOTAGE_EUPHEMISMS": 50,
-    "RECRUITMENT_PAYMENT": 40,
-    "INFRASTRUCTURE_TARGETS": 30,
-    "SECURITY_OPSEC": 20,
-    "RUSSIAN_UKRAINIAN_RECRUITMENT": 30,
-    "RECRUITMENT_SELECTION": 10,
-    "RADICAL_ORGANIZATION": 10,
-    "NATIONALIST_IDEOLOGY": 5,
-    "HISTORICAL_MARKERS": 5,
-    "SYMBOLS_CODES": 10,
-    "VERIFICATION_CONTROL": 20
-}
+# Dictionary compiled once for all messages
+SCORER = KeywordScorer(loaded_danger_objects or [])
 
-RISK_THRESHOLD = 60
-
-def analyze_message(text, danger_objects):
+def analyze_message(text, danger_objects=None):
     """
     Analyze message text and calculate risk score based on keywords and their tags.
     Returns (score, matched_keywords, matched_tags)
     """
-    if not text:
-        return 0, [], []
-        
-    text_lower = text.lower()
-    score = 0
-    matched_keywords = []
-    matched_tags = set()
-    
-    # Check for each keyword in the dictionary
-    for item in danger_objects:
-        term = item['term'].lower()
-        if term in text_lower:
-            # Avoid double counting if one term is substring of another (simple approach: just count all)
-            # or if term is very short and common (e.g. "14") - might need boundary check
-            
-            # Basic word boundary check for short terms
-            if len(term) < 4:
-                if not re.search(r'\b' + re.escape(term) + r'\b', text_lower):
-                    continue
-            
-            matched_keywords.append(item['term'])
-            
-            # Add score for each tag of this term
-            term_score = 0
-            for tag in item['tags']:
-                matched_tags.add(tag)
-                term_score = max(term_score, TAG_SCORES.get(tag, 0)) # Take max score of tags for this term
-            
-            score += term_score
+    scorer = SCORER if danger_objects is None or danger_objects is loaded_danger_objects else KeywordScorer(danger_objects)
+    result = scorer.score(text)
+    return result.score, result.keywords, result.tags
+
+OUTPUT_DIR = "data/raw/telegram"
 
-    # Bonus for combinations
-    if "RECRUITMENT_PAYMENT" in matched_tags and "INFRASTRUCTURE_TARGETS" in matched_tags:
-        score += 30
-    if "RECRUITMENT_PAYMENT" in matched_tags and "SABOTAGE_EUPHEMISMS" in matched_tags:
-        score += 40
-    if "SECURITY_OPSEC" in matched_tags and "RECRUITMENT_PAYMENT" in matched_tags:
-        score += 20
+CSV_FIELDS = ['channel_title', 'channel_url', 'message_url', 'date', 'risk_score', 'found_keywords', 'found_tags', 'text_snippet']
 
-    return score, list(set(matched_keywords)), list(matched_tags)
+# Worker pool defaults
+DEFAULT_WORKERS = 4
+SEARCH_INTERVAL = 2.0   # seconds between requests to the search engine
+CHANNEL_INTERVAL = 1.0  # seconds between requests to t.me
 
-OUTPUT_DIR = "data/raw/telegram"
+
+class DomainRateLimiter:
+    """Minimum interval between requests to the same domain, shared by all workers."""
+
+    def __init__(self, min_interval=CHANNEL_INTERVAL, intervals=None):
+        self.min_interval = min_interval
+        self.intervals = intervals or {}
+        self._next_slot = {}
+        self._lock = asyncio.Lock()
+
+    async def wait(self, url):
+        """Reserve the next free slot for the URL's domain and sleep until it."""
+        domain = urllib.parse.urlparse(url).netloc
+        interval = self.intervals.get(domain, self.min_interval)
+        async with self._lock:
+            now = asyncio.get_running_loop().time()
+            slot = max(now, self._next_slot.get(domain, now))
+            self._next_slot[domain] = slot + interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class ResultWriter:
+    """CSV writer that flushes rows to disk as soon as a channel is done."""
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.rows_written = 0
+        self._file = open(filename, 'w', newline='', encoding='utf-8')
+        self._writer = csv.DictWriter(self._file, fieldnames=CSV_FIELDS)
+        self._writer.writeheader()
+
+    def write(self, rows):
+        self._writer.writerows(rows)
+        self._file.flush()
+        self.rows_written += len(rows)
+
+    def close(self):
+        self._file.close()
 
 async def search_channels(page, keyword):
     """Search for Telegram channels using Google"""
@@ -188,93 +193,186 @@ async def scrape_channel_preview(page, channel_url):
         print(f"Error scraping {channel_url}: {e}")
         return None
 
-async def main():
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
-    
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=False) # Headless=False to see what's happening/avoid some bot detection
-        page = await browser.new_page()
-        
-        all_channels = set()
-        
-        # 1. Search phase
-        for keyword in SEARCH_KEYWORDS:
-            links = await search_channels(page, keyword)
-            print(f"Found {len(links)} links for '{keyword}'")
-            all_channels.update(links)
-            await asyncio.sleep(2) # Be nice
+def channel_rows(channel_url, data):
+    """Build CSV rows for one scraped channel (one row per matching message)."""
+    rows = []
+    if data:
+        for msg in data['messages']:
+            score, keywords, tags = analyze_message(msg['text'])
             
-        print(f"\nTotal unique channels found: {len(all_channels)}")
-        
-        # 2. Scrape phase
-        flat_results = []
-        
-        for channel_url in all_channels:
-            data = await scrape_channel_preview(page, channel_url)
-            
-            if data:
-                channel_has_matches = False
-                for msg in data['messages']:
-                    score, keywords, tags = analyze_message(msg['text'], loaded_danger_objects)
-                    
-                    if score > 0:
-                        print(f"  [+] Match in {data['title']}: '{', '.join(keywords)}' (Score: {score})")
-                        channel_has_matches = True
-                        flat_results.append({
-                            'channel_title': data['title'],
-                            'channel_url': channel_url.replace('/s/', '/'),
-                            'message_url': msg['url'],
-                            'date': msg['date'],
-                            'risk_score': score,
-                            'found_keywords': ", ".join(keywords),
-                            'found_tags': ", ".join(tags),
-                            'text_snippet': msg['text'][:200].replace('\n', ' ') if msg['text'] else ""
-                        })
-                
-                # If no matches found in the whole preview, still save the channel
-                if not channel_has_matches:
-                     print(f"  [i] Scraped {data['title']} - No keywords found")
-                     flat_results.append({
-                        'channel_title': data['title'],
-                        'channel_url': channel_url.replace('/s/', '/'),
-                        'message_url': channel_url,
-                        'date': datetime.now().isoformat(),
-                        'risk_score': 0,
-                        'found_keywords': "",
-                        'found_tags': "",
-                        'text_snippet': "No suspicious keywords found in recent messages"
-                    })
-            else:
-                print(f"  [!] Failed to scrape {channel_url}")
-                # Failed to scrape or empty
-                flat_results.append({
-                    'channel_title': "Unknown/Error",
+            if score > 0:
+                print(f"  [+] Match in {data['title']}: '{', '.join(keywords)}' (Score: {score})")
+                rows.append({
+                    'channel_title': data['title'],
                     'channel_url': channel_url.replace('/s/', '/'),
-                    'message_url': "",
-                    'date': datetime.now().isoformat(),
-                    'risk_score': 0,
-                    'found_keywords': "",
-                    'found_tags': "",
-                    'text_snippet': "Could not scrape channel preview"
+                    'message_url': msg['url'],
+                    'date': msg['date'],
+                    'risk_score': score,
+                    'found_keywords': ", ".join(keywords),
+                    'found_tags': ", ".join(tags),
+                    'text_snippet': msg['text'][:200].replace('\n', ' ') if msg['text'] else ""
                 })
-            
-            await asyncio.sleep(1)
-
-        # 3. Save results
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = os.path.join(OUTPUT_DIR, f"telegram_web_scan_{timestamp}.csv")
         
-        if flat_results:
-            with open(filename, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=['channel_title', 'channel_url', 'message_url', 'date', 'risk_score', 'found_keywords', 'found_tags', 'text_snippet'])
-                writer.writeheader()
-                writer.writerows(flat_results)
-            
-            print(f"\nScan complete. Results saved to {filename}")
+        # If no matches found in the whole preview, still save the channel
+        if not rows:
+            print(f"  [i] Scraped {data['title']} - No keywords found")
+            rows.append({
+                'channel_title': data['title'],
+                'channel_url': channel_url.replace('/s/', '/'),
+                'message_url': channel_url,
+                'date': datetime.now().isoformat(),
+                'risk_score': 0,
+                'found_keywords': "",
+                'found_tags': "",
+                'text_snippet': "No suspicious keywords found in recent messages"
+            })
+    else:
+        print(f"  [!] Failed to scrape {channel_url}")
+        # Failed to scrape or empty
+        rows.append({
+            'channel_title': "Unknown/Error",
+            'channel_url': channel_url.replace('/s/', '/'),
+            'message_url': "",
+            'date': datetime.now().isoformat(),
+            'risk_score': 0,
+            'found_keywords': "",
+            'found_tags': "",
+            'text_snippet': "Could not scrape channel preview"
+        })
+    return rows
+
+async def channel_worker(browser, queue, limiter, writer, client=None, pages=1):
+    """
+    Take channel URLs from the queue until a None sentinel arrives.
+    Uses the HTTP client when given; the browser page is only opened as a fallback.
+    """
+    context = None
+    page = None
+    try:
+        while True:
+            channel_url = await queue.get()
+            try:
+                if channel_url is None:
+                    return
+                data = None
+                if client:
+                    data = await client.fetch_channel(channel_url, pages)
+                if data is None and browser is not None:
+                    if page is None:
+                        context = await browser.new_context()
+                        page = await context.new_page()
+                    await limiter.wait(channel_url)
+                    data = await scrape_channel_preview(page, channel_url)
+                writer.write(channel_rows(channel_url, data))
+            except Exception as e:
+                print(f"  [!] Worker error on {channel_url}: {e}")
+            finally:
+                queue.task_done()
+    finally:
+        if context:
+            await context.close()
+
+async def search_producer(page, keywords, queue, limiter, seen):
+    """Search keywords and feed newly found channels into the queue."""
+    for keyword in keywords:
+        await limiter.wait("https://www.google.com/")
+        links = await search_channels(page, keyword)
+        print(f"Found {len(links)} links for '{keyword}'")
+        for link in links:
+            if link not in seen:
+                seen.add(link)
+                await queue.put(link)
+
+async def run_scan(browser, writer, keywords=None, channel_urls=None,
+                   workers=DEFAULT_WORKERS, limiter=None, client=None, pages=1):
+    """
+    Scrape channel previews with a pool of workers (HTTP client first,
+    browser contexts as fallback). Channels come from channel_urls and/or a
+    keyword search that runs concurrently with the workers.
+    Returns number of channels queued.
+    """
+    limiter = limiter or DomainRateLimiter(intervals={'www.google.com': SEARCH_INTERVAL})
+    queue = asyncio.Queue()
+    seen = set()
+    
+    for url in channel_urls or []:
+        if url not in seen:
+            seen.add(url)
+            queue.put_nowait(url)
+    
+    tasks = [
+        asyncio.create_task(channel_worker(browser, queue, limiter, writer, client, pages))
+        for _ in range(max(1, workers))
+    ]
+    
+    if keywords and browser is not None:
+        search_context = await browser.new_context()
+        try:
+            await search_producer(await search_context.new_page(), keywords, queue, limiter, seen)
+        finally:
+            await search_context.close()
+    
+    # One sentinel per worker once all channels are queued
+    for _ in tasks:
+        await queue.put(None)
+    await asyncio.gather(*tasks)
+    
+    return len(seen)
+
+async def main():
+    parser = argparse.ArgumentParser(description='Search and scan public Telegram channel previews')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                       help=f'Number of parallel workers (default: {DEFAULT_WORKERS})')
+    parser.add_argument('--channels', nargs='+',
+                       help='Channel preview URLs to scan (skips keyword search), e.g. https://t.me/s/name')
+    parser.add_argument('--interval', type=float, default=CHANNEL_INTERVAL,
+                       help=f'Minimum seconds between requests to one domain (default: {CHANNEL_INTERVAL})')
+    parser.add_argument('--pages', type=int, default=1,
+                       help='Preview pages per channel, following ?before= (default: 1)')
+    parser.add_argument('--browser-only', action='store_true',
+                       help='Scrape channels with Playwright only (no HTTP collector)')
+    parser.add_argument('--no-browser', action='store_true',
+                       help='HTTP collector only, no Playwright fallback (requires --channels)')
+    parser.add_argument('--headless', action='store_true', default=False,
+                       help='Run browser in headless mode (default: False)')
+    args = parser.parse_args()
+    
+    if args.no_browser and not args.channels:
+        parser.error('--no-browser requires --channels (keyword search needs the browser)')
+    
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = os.path.join(OUTPUT_DIR, f"telegram_web_scan_{timestamp}.csv")
+    
+    limiter = DomainRateLimiter(args.interval, intervals={'www.google.com': SEARCH_INTERVAL})
+    client = None if args.browser_only else TelegramPreviewClient(max_connections=args.workers, limiter=limiter)
+    writer = ResultWriter(filename)
+    scan_args = dict(
+        keywords=None if args.channels else SEARCH_KEYWORDS,
+        channel_urls=args.channels,
+        workers=args.workers,
+        limiter=limiter,
+        client=client,
+        pages=args.pages
+    )
+    
+    try:
+        if args.no_browser:
+            total = await run_scan(None, writer, **scan_args)
         else:
-            print(f"\nScan complete. No suspicious content found.")
-        
-        await browser.close()
+            async with async_playwright() as p:
+                browser = await p.chromium.launch(headless=args.headless) # Headless=False to see what's happening/avoid some bot detection
+                try:
+                    total = await run_scan(browser, writer, **scan_args)
+                finally:
+                    await browser.close()
+    finally:
+        writer.close()
+        if client:
+            client.close()
+    
+    print(f"\nTotal unique channels scanned: {total}")
+    print(f"Scan complete. {writer.rows_written} rows saved to {filename}")
 
 if __name__ == '__main__':
     asyncio.run(main())
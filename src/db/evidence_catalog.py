@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Evidence catalog - DuckDB index of screenshots and images under data/evidence.
+Lives in posts.duckdb next to the posts table.
+
+Layout: data/evidence/<platform>/<handle>/[posts|images/]<file>
+
+The catalog opens posts.duckdb only for the duration of one scan or lookup,
+so a long-running web UI does not hold the file lock that scrapers and
+scripts need for writing.
+Preview subdirectories (_web, _thumbs - see evidence_media.py) are not cataloged.
+"""
+
+import hashlib
+import os
+import re
+import struct
+import threading
+from contextlib import contextmanager
+import pandas as pd
+from pathlib import Path
+from typing import List, Dict, Optional
+
+from db.posts_db import DB_PATH, connect_db
+from db.evidence_media import PREVIEW_DIRS
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+EVIDENCE_ROOT = PROJECT_ROOT / "data" / "evidence"
+
+EVIDENCE_COLUMNS = [
+    'path', 'directory', 'filename', 'post_id', 'platform', 'handle',
+    'size', 'mtime', 'sha256', 'width', 'height'
+]
+
+# Suffixes added to post ids by collectors / web upload
+_POST_ID_SUFFIX = re.compile(r'_(screenshot|slide_\d+|added_\d{8}T\d{6}Z)$')
+
+
+def relative_path(path) -> str:
+    """Project-relative path with forward slashes (catalog key)."""
+    path = Path(str(path).replace('\\', '/'))
+    if path.is_absolute():
+        try:
+            path = path.resolve().relative_to(PROJECT_ROOT)
+        except ValueError:
+            pass
+    return path.as_posix()
+
+
+def post_id_from_filename(filename: str) -> str:
+    """Derive post id from an evidence file name (fb_x_pfbid..png, <id>_slide_2.png, ...)."""
+    return _POST_ID_SUFFIX.sub('', Path(filename).stem)
+
+
+def _platform_handle(rel_path: str):
+    """Extract (platform, handle) from a path containing an evidence/ segment."""
+    parts = rel_path.split('/')
+    if 'evidence' not in parts:
+        return None, None
+    idx = parts.index('evidence')
+    rest = parts[idx + 1:-1]
+    platform = rest[0] if len(rest) >= 1 else None
+    handle = rest[1] if len(rest) >= 2 else None
+    return platform, handle
+
+
+def file_sha256(path: Path) -> str:
+    """SHA-256 of a file, read in 1 MB chunks."""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def image_size(path: Path):
+    """Read (width, height) from PNG/JPEG/GIF/WebP headers; (None, None) otherwise."""
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(32)
+            if head.startswith(b'\x89PNG\r\n\x1a\n') and head[12:16] == b'IHDR':
+                return struct.unpack('>II', head[16:24])
+            if head[:6] in (b'GIF87a', b'GIF89a'):
+                return struct.unpack('<HH', head[6:10])
+            if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+                chunk = head[12:16]
+                if chunk == b'VP8X':
+                    w = int.from_bytes(head[24:27], 'little') + 1
+                    h = int.from_bytes(f.read(3), 'little') + 1
+                    return w, h
+                if chunk == b'VP8 ':
+                    f.seek(26)
+                    w, h = struct.unpack('<HH', f.read(4))
+                    return w & 0x3FFF, h & 0x3FFF
+                if chunk == b'VP8L':
+                    b = head[21:25]
+                    w = 1 + (((b[1] & 0x3F) << 8) | b[0])
+                    h = 1 + (((b[3] & 0x0F) << 10) | (b[2] << 2) | ((b[1] & 0xC0) >> 6))
+                    return w, h
+            if head[:2] == b'\xff\xd8':
+                f.seek(2)
+                while True:
+                    marker = f.read(2)
+                    if len(marker) < 2 or marker[0] != 0xFF:
+                        break
+                    if marker[1] in (0xD8, 0x01) or 0xD0 <= marker[1] <= 0xD7:
+                        continue
+                    length = struct.unpack('>H', f.read(2))[0]
+                    if marker[1] in (0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7,
+                                     0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF):
+                        h, w = struct.unpack('>xHH', f.read(5))
+                        return w, h
+                    f.seek(length - 2, 1)
+    except (OSError, struct.error):
+        pass
+    return None, None
+
+
+class EvidenceCatalog:
+    """Manager for the evidence table (incremental scanner + lookups)."""
+
+    def __init__(self, db_path: Path = DB_PATH):
+        self.db_path = db_path
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = None
+        # Catalog is shared between web server threads
+        self._lock = threading.RLock()
+        self._init_schema()
+
+    def _init_schema(self):
+        """Initialize evidence table."""
+        with self.connection() as conn:
+            self._create_tables(conn)
+
+    def _create_tables(self, conn):
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS evidence (
+                path VARCHAR PRIMARY KEY,
+                directory VARCHAR NOT NULL,
+                filename VARCHAR NOT NULL,
+                post_id VARCHAR,
+                platform VARCHAR,
+                handle VARCHAR,
+                size BIGINT,
+                mtime DOUBLE,
+                sha256 VARCHAR,
+                width INTEGER,
+                height INTEGER,
+                scanned_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_evidence_post_id ON evidence(post_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_evidence_directory ON evidence(directory)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_evidence_filename ON evidence(filename)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_evidence_handle ON evidence(platform, handle)")
+
+    def get_connection(self):
+        """Get database connection (kept open until close())."""
+        if self.conn is None:
+            self.conn = connect_db(self.db_path)
+        return self.conn
+
+    @contextmanager
+    def connection(self):
+        """Connection for one operation: the open one from get_connection(), else a new one closed afterwards."""
+        with self._lock:
+            if self.conn is not None:
+                yield self.conn
+                return
+            conn = connect_db(self.db_path)
+            try:
+                yield conn
+            finally:
+                conn.close()
+
+    def scan(self, root: Path = EVIDENCE_ROOT, recursive: bool = True) -> Dict[str, int]:
+        """
+        Incrementally sync catalog with files under root.
+
+        Only new files and files whose size or mtime changed are re-hashed;
+        rows for files that disappeared from root are deleted.
+        Returns dict with 'added', 'updated', 'removed', 'unchanged' counts.
+        """
+        root = Path(root)
+        root_rel = relative_path(root)
+        stats = {'added': 0, 'updated': 0, 'removed': 0, 'unchanged': 0}
+
+        if recursive:
+            known_rows = self._rows(
+                "SELECT path, size, mtime FROM evidence WHERE directory = ? OR starts_with(directory, ?)",
+                [root_rel, root_rel + '/']
+            )
+        else:
+            known_rows = self._rows("SELECT path, size, mtime FROM evidence WHERE directory = ?", [root_rel])
+        known = {path: (size, mtime) for path, size, mtime in known_rows}
+
+        # Hashing happens without a connection open
+        changed = []
+        seen = set()
+        for file_path, st in self._walk(root, recursive):
+            rel = relative_path(file_path)
+            seen.add(rel)
+            if known.get(rel) == (st.st_size, st.st_mtime):
+                stats['unchanged'] += 1
+                continue
+            stats['updated' if rel in known else 'added'] += 1
+            changed.append(self._describe(file_path, rel, st))
+
+        removed = [p for p in known if p not in seen]
+        stats['removed'] = len(removed)
+
+        if changed or removed:
+            with self.connection() as conn:
+                if changed:
+                    self._upsert(conn, changed)
+                if removed:
+                    conn.executemany("DELETE FROM evidence WHERE path = ?", [[p] for p in removed])
+
+        return stats
+
+    def _walk(self, root: Path, recursive: bool):
+        """Yield (path, stat) for files under root."""
+        if not root.is_dir():
+            return
+        stack = [root]
+        while stack:
+            current = stack.pop()
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive and entry.name not in PREVIEW_DIRS:
+                            stack.append(Path(entry.path))
+                    elif entry.is_file():
+                        yield Path(entry.path), entry.stat()
+
+    def _describe(self, file_path: Path, rel: str, st) -> tuple:
+        """Build a catalog row for one file (hash + image size)."""
+        platform, handle = _platform_handle(rel)
+        width, height = image_size(file_path)
+        directory, _, filename = rel.rpartition('/')
+        return (
+            rel, directory, filename, post_id_from_filename(filename),
+            platform, handle, st.st_size, st.st_mtime,
+            file_sha256(file_path), width, height
+        )
+
+    def _upsert(self, conn, rows: List[tuple]):
+        """Merge described rows into evidence in one statement."""
+        staging = pd.DataFrame(rows, columns=EVIDENCE_COLUMNS)
+        conn.register('evidence_staging', staging)
+        try:
+            conn.execute("""
+                INSERT OR REPLACE INTO evidence (
+                    path, directory, filename, post_id, platform, handle,
+                    size, mtime, sha256, width, height, scanned_at
+                )
+                SELECT path, directory, filename, post_id, platform, handle,
+                       size, mtime, sha256, width, height, CURRENT_TIMESTAMP
+                FROM evidence_staging
+            """)
+        finally:
+            conn.unregister('evidence_staging')
+
+    def _rows(self, query: str, params: list) -> List[tuple]:
+        with self.connection() as conn:
+            return conn.execute(query, params).fetchall()
+
+    def _query(self, query: str, params: list) -> List[Dict]:
+        with self.connection() as conn:
+            result = conn.execute(query, params).fetchall()
+            columns = [desc[0] for desc in conn.description]
+        return [dict(zip(columns, row)) for row in result]
+
+    def list_directory(self, directory) -> List[str]:
+        """File names cataloged directly in directory, sorted."""
+        rows = self._query(
+            "SELECT filename FROM evidence WHERE directory = ? ORDER BY filename",
+            [relative_path(directory)]
+        )
+        return [r['filename'] for r in rows]
+
+    def list_paths(self, under: Optional[Path] = None) -> List[str]:
+        """All cataloged paths (optionally only under a directory)."""
+        if under is None:
+            rows = self._query("SELECT path FROM evidence ORDER BY path", [])
+        else:
+            prefix = relative_path(under)
+            rows = self._query(
+                "SELECT path FROM evidence WHERE directory = ? OR starts_with(directory, ?) ORDER BY path",
+                [prefix, prefix + '/']
+            )
+        return [r['path'] for r in rows]
+
+    def find_by_post_id(self, post_id: str, platform: Optional[str] = None) -> List[Dict]:
+        """Evidence files for a post id."""
+        query = "SELECT * FROM evidence WHERE post_id = ?"
+        params = [post_id]
+        if platform:
+            query += " AND platform = ?"
+            params.append(platform)
+        return self._query(query + " ORDER BY path", params)
+
+    def close(self):
+        """Close database connection."""
+        if self.conn:
+            self.conn.close()
+            self.conn = None
+
+
+def get_evidence_catalog() -> EvidenceCatalog:
+    """Get EvidenceCatalog instance."""
+    return EvidenceCatalog()
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Evidence media - background writer for screenshots and their previews.
+
+Collectors capture screenshots as bytes (page.screenshot() without path=) and
+hand them to EvidenceWriter, which writes on a thread pool, so the scraping
+loop does not wait for the disk or for image encoding:
+
+  <dir>/<name>.png            lossless master, bytes exactly as captured
+  <dir>/_web/<stem>.webp      compressed preview (lossy WebP, or AVIF)
+  <dir>/_thumbs/<stem>.webp   thumbnail for galleries (top of the screenshot)
+
+Previews live in subdirectories, so evidence listings (post id -> its
+screenshots) and the evidence catalog only see masters. The web UI shows the
+preview and thumbnail and links the master for download. Previews need Pillow
+(optional); without it only masters are written and the web UI falls back to
+serving them.
+"""
+
+import asyncio
+import atexit
+import glob
+import io
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from db.file_store import atomic_write_bytes
+
+try:
+    from PIL import Image, features
+    HAS_PIL = True
+except ImportError:
+    HAS_PIL = False
+
+WEB_DIR = '_web'
+THUMBS_DIR = '_thumbs'
+PREVIEW_DIRS = (WEB_DIR, THUMBS_DIR)
+
+PREVIEW_FORMAT = os.getenv("EVIDENCE_PREVIEW_FORMAT", "webp")    # webp | avif
+PREVIEW_QUALITY = 75
+PREVIEW_MAX_SIDE = 16383        # WebP dimension limit; taller pages are scaled down
+THUMB_FORMAT = 'webp'
+THUMB_QUALITY = 70
+THUMB_WIDTH = 400
+THUMB_MAX_ASPECT = 1.0          # height / width - gallery cards are square
+
+DEFAULT_WORKERS = int(os.getenv("EVIDENCE_WRITER_WORKERS", "2"))
+
+_warned_no_pil = False
+
+
+def _preview_format() -> str:
+    if PREVIEW_FORMAT == 'avif' and HAS_PIL and features.check('avif'):
+        return 'avif'
+    return 'webp'
+
+
+def web_path(master: Path) -> Path:
+    """Compressed preview of a master screenshot."""
+    master = Path(master)
+    return master.parent / WEB_DIR / f"{master.stem}.{_preview_format()}"
+
+
+def thumb_path(master: Path) -> Path:
+    """Thumbnail of a master screenshot."""
+    master = Path(master)
+    return master.parent / THUMBS_DIR / f"{master.stem}.{THUMB_FORMAT}"
+
+
+def web_name(filename: str) -> str:
+    """Compressed preview path relative to the master's directory (as served by the web UI)."""
+    return f"{WEB_DIR}/{Path(filename).stem}.{_preview_format()}"
+
+
+def thumb_name(filename: str) -> str:
+    """Thumbnail path relative to the master's directory (as served by the web UI)."""
+    return f"{THUMBS_DIR}/{Path(filename).stem}.{THUMB_FORMAT}"
+
+
+def remove_previews(master: Path) -> int:
+    """Delete the previews of a master (when it is deleted or moved); returns how many."""
+    master = Path(master)
+    removed = 0
+    for directory in PREVIEW_DIRS:
+        for path in (master.parent / directory).glob(f"{glob.escape(master.stem)}.*"):
+            path.unlink(missing_ok=True)
+            removed += 1
+    return removed
+
+
+def make_previews(master: Path, data: Optional[bytes] = None, overwrite: bool = True) -> List[Path]:
+    """
+    Write the compressed preview and the thumbnail of a master screenshot
+    (decoded from data when given, else read from disk). Returns written paths;
+    [] without Pillow.
+    """
+    global _warned_no_pil
+    if not HAS_PIL:
+        if not _warned_no_pil:
+            _warned_no_pil = True
+            print("[evidence] Pillow not installed - screenshot previews/thumbnails are not generated")
+        return []
+
+    master = Path(master)
+    targets = [web_path(master), thumb_path(master)]
+    if not overwrite and all(p.exists() for p in targets):
+        return []
+
+    with Image.open(io.BytesIO(data) if data is not None else master) as img:
+        img.load()
+        if img.mode not in ('RGB', 'RGBA'):
+            img = img.convert('RGBA' if 'transparency' in img.info else 'RGB')
+        width, height = img.size
+        written = []
+
+        preview = img
+        if max(width, height) > PREVIEW_MAX_SIDE:
+            scale = PREVIEW_MAX_SIDE / max(width, height)
+            preview = img.resize((max(1, int(width * scale)), max(1, int(height * scale))), Image.LANCZOS)
+        fmt = targets[0].suffix[1:]
+        written.append(_save(preview, targets[0], fmt.upper(), quality=PREVIEW_QUALITY, method=4))
+
+        thumb = img.crop((0, 0, width, min(height, int(width * THUMB_MAX_ASPECT))))
+        thumb.thumbnail((THUMB_WIDTH, int(THUMB_WIDTH * THUMB_MAX_ASPECT)), Image.LANCZOS)
+        written.append(_save(thumb, targets[1], THUMB_FORMAT.upper(), quality=THUMB_QUALITY, method=6))
+    return written
+
+
+def _save(img, path: Path, fmt: str, **options) -> Path:
+    buf = io.BytesIO()
+    if fmt == 'AVIF':
+        options.pop('method', None)
+    img.save(buf, fmt, **options)
+    atomic_write_bytes(path, buf.getvalue())
+    return path
+
+
+class EvidenceWriter:
+    """
+    Thread pool writing screenshot masters and their previews.
+
+    submit() returns immediately with a Future of the master path; the master
+    is written first (atomically), then the previews. Preview errors are
+    printed, not raised - the master is the evidence.
+    """
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, previews: bool = True):
+        self.previews = previews
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='evidence')
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def submit(self, data: bytes, path) -> Future:
+        """Queue a screenshot (PNG bytes) to be written to path."""
+        return self._track(self._executor.submit(self._write, bytes(data), Path(path)))
+
+    def add_previews(self, path, overwrite: bool = True) -> Future:
+        """Queue previews for a master already on disk (uploads, backfill)."""
+        return self._track(self._executor.submit(make_previews, Path(path), None, overwrite))
+
+    def _track(self, future: Future) -> Future:
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future: Future):
+        with self._lock:
+            self._pending.discard(future)
+
+    def _write(self, data: bytes, path: Path) -> Path:
+        atomic_write_bytes(path, data)
+        if self.previews:
+            try:
+                make_previews(path, data)
+            except Exception as e:
+                print(f"[evidence] Preview failed for {path.name}: {e}")
+        return path
+
+    def _futures(self, futures: Optional[Iterable[Future]]) -> List[Future]:
+        if futures is not None:
+            return list(futures)
+        with self._lock:
+            return list(self._pending)
+
+    async def wait(self, futures: Optional[Iterable[Future]] = None) -> List[Optional[Path]]:
+        """
+        Await futures (default: everything pending) without blocking the event
+        loop. Returns master paths, None for screenshots that failed to write.
+        """
+        results = await asyncio.gather(
+            *(asyncio.wrap_future(f) for f in self._futures(futures)), return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                print(f"[evidence] Screenshot write failed: {result}")
+        return [None if isinstance(r, Exception) else r for r in results]
+
+    def flush(self, futures: Optional[Iterable[Future]] = None):
+        """Block until futures (default: everything pending) are written."""
+        for future in self._futures(futures):
+            try:
+                future.result()
+            except Exception as e:
+                print(f"[evidence] Screenshot write failed: {e}")
+
+    def close(self):
+        """Finish pending writes and stop the workers."""
+        self._executor.shutdown(wait=True)
+
+
+_writer: Optional[EvidenceWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_evidence_writer() -> EvidenceWriter:
+    """Process-wide EvidenceWriter (pending writes are finished at exit)."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = EvidenceWriter()
+            atexit.register(_writer.close)
+        return _writer
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+File store - crash-safe, concurrency-safe JSON files (post metadata, graph files).
+
+Writes go to a temp file in the same directory, are fsynced and renamed over
+the target, so readers see either the old or the new content, never a partial
+file. Read-modify-write cycles hold a per-file lock, and content ETags let API
+clients do optimistic concurrency (If-Match): a save based on a stale read
+raises VersionConflict instead of overwriting someone else's change.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Callable, Optional, Tuple
+
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+class VersionConflict(Exception):
+    """If-Match precondition failed; `etag` is the current version."""
+
+    def __init__(self, etag: Optional[str]):
+        super().__init__("Resource was modified by another request")
+        self.etag = etag
+
+
+def content_etag(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+
+def json_etag(value: Any) -> str:
+    """ETag of a JSON value (independent of key order)."""
+    return content_etag(json.dumps(value, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8'))
+
+
+def check_etag(current: Optional[str], if_match: Optional[str]):
+    """Raise VersionConflict unless if_match is None, '*' or the current etag."""
+    if if_match is not None and if_match != '*' and if_match != current:
+        raise VersionConflict(current)
+
+
+def file_lock(path) -> threading.Lock:
+    """Process-wide lock for one file path."""
+    key = os.path.abspath(path)
+    with _locks_guard:
+        if key not in _locks:
+            _locks[key] = threading.Lock()
+        return _locks[key]
+
+
+def atomic_write_bytes(path, data: bytes):
+    """Write via temp file + fsync + rename (and fsync the directory where supported)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix='.tmp')
+    try:
+        # mkstemp creates 0600 files - keep the permissions an ordinary open() would give
+        try:
+            mode = path.stat().st_mode & 0o777
+        except OSError:
+            mode = 0o644
+        os.chmod(tmp_name, mode)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+    if hasattr(os, 'O_DIRECTORY'):
+        dir_fd = os.open(path.parent, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def dump_json(value: Any) -> bytes:
+    return json.dumps(value, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+def atomic_write_json(path, value: Any) -> str:
+    """Atomically write JSON (indent=2, as in data/); returns the new etag."""
+    data = dump_json(value)
+    atomic_write_bytes(path, data)
+    return content_etag(data)
+
+
+def read_json(path) -> Tuple[Any, str]:
+    """(value, etag) of a JSON file."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    return json.loads(data.decode('utf-8')), content_etag(data)
+
+
+def write_json(path, value: Any, if_match: Optional[str] = None) -> str:
+    """Replace a JSON file under its lock, checking if_match against the current content."""
+    with file_lock(path):
+        if if_match is not None:
+            current = read_json(path)[1] if Path(path).exists() else None
+            check_etag(current, if_match)
+        return atomic_write_json(path, value)
+
+
+def update_json(path, update: Callable[[Any], Any], if_match: Optional[str] = None) -> Tuple[Any, str]:
+    """
+    Locked read-modify-write: update(value) returns the new value (or mutates it and
+    returns None). Returns (new value, new etag).
+    """
+    with file_lock(path):
+        value, etag = read_json(path)
+        check_etag(etag, if_match)
+        result = update(value)
+        if result is not None:
+            value = result
+        return value, atomic_write_json(path, value)
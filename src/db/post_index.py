@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Post index - persistent dedup index of already collected posts.
+Lives in posts.duckdb next to the posts table.
+
+Every collected post is recorded under up to three keys per (platform, handle):
+its permalink id (pfbid or story_fbid), its URL and a content fingerprint
+(SHA-1 of handle + normalized text).
+Unlike Python's hash(), the fingerprint is the same in every process, so a post
+without a permalink gets the same id on every run. Scrapers load the keys of a
+handle once at start (KnownPosts) and skip known posts before any screenshot
+or DOM work.
+
+Watermark turns the index into a stop condition for "since last run" scraping:
+the feed is read newest first, so once a run of consecutive posts are known or
+older than the newest post already stored, the rest of the history is too.
+"""
+
+import hashlib
+import re
+import threading
+import unicodedata
+import pandas as pd
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from db.posts_db import DB_PATH, connect_db
+
+KEY_COLUMNS = ['platform', 'handle', 'kind', 'key', 'post_id', 'date_posted']
+# Key kinds that identify a post on their own
+PERMALINK_KINDS = {'pfbid', 'story_fbid'}
+
+# Watermark: consecutive old posts that end a "since last run" scrape. More than
+# one, so a pinned (old) post at the top of the feed does not stop the run.
+DEFAULT_KNOWN_STREAK = 5
+# Scraped dates are approximate ("5 godz.", "3 lis") - margin before the watermark date
+WATERMARK_DATE_SLACK = timedelta(days=1)
+
+# Number of normalized characters that go into the fingerprint
+FINGERPRINT_CHARS = 200
+
+# Parts of a post's innerText that change between runs: relative timestamps
+# ("5 godz.", "3 d", "wczoraj"), the dates they turn into ("3 lis o 14:05") and
+# counters (reactions, comments, shares, views). Other digits are post content.
+_MONTHS = r'(?:sty|lut|mar|kwi|maj|cze|lip|sie|wrz|paź|lis|gru|jan|feb|apr|may|jun|jul|aug|sep|oct|nov|dec)\w*\.?'
+_COUNT = r'\d+(?:[.,]\d+)?\s*(?:tys\.?|mln|[km]\b)?'
+_VOLATILE = re.compile(
+    r'\b\d+\s*(?:godz|min|sek|tyg|dni|hours?|hrs?|mins?|minutes?|days?|weeks?|[hdmsw])\b\.?'
+    rf'|\b\d{{1,2}}\s*{_MONTHS}(?:\s*\d{{4}})?|\b{_MONTHS}\s*\d{{1,2}}\b(?:,?\s*\d{{4}})?'
+    r'|(?:\s*(?:o|at)\s*)?\b\d{1,2}:\d{2}\b'
+    rf'|\b{_COUNT}\s*(?:komentarz|udostępnie|reakcj|wyświetle|odtworze|polubie|comment|share|reaction|view|like|play)\w*'
+    rf'|(?:wszystkie reakcje|all reactions|lubię to!?)\s*:?\s*{_COUNT}'
+    r'|wczoraj|yesterday|przed chwilą|just now',
+    re.IGNORECASE
+)
+_PFBID = re.compile(r'pfbid[0-9a-zA-Z]+')
+_STORY_FBID = re.compile(r'story_fbid=(\d+)')
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """Text reduced to its stable letters and digits (NFKC, casefolded, no timestamps/counters/punctuation)."""
+    text = unicodedata.normalize('NFKC', text or '').replace('Facebook', '')
+    text = _VOLATILE.sub(' ', text).casefold()
+    return ''.join(ch for ch in text if ch.isalnum())
+
+
+def text_fingerprint(handle: str, text: Optional[str]) -> Optional[str]:
+    """SHA-1 of handle + normalized text (None when nothing stable is left)."""
+    normalized = normalize_text(text)[:FINGERPRINT_CHARS]
+    if not normalized:
+        return None
+    return hashlib.sha1(f"{handle.casefold()}\n{normalized}".encode('utf-8')).hexdigest()
+
+
+def pfbid_from_url(url: Optional[str]) -> Optional[str]:
+    match = _PFBID.search(url or '')
+    return match.group(0) if match else None
+
+
+def story_fbid_from_url(url: Optional[str]) -> Optional[str]:
+    match = _STORY_FBID.search(url or '')
+    return match.group(1) if match else None
+
+
+def facebook_unique_id(handle: str, post_url: Optional[str], text: Optional[str]) -> str:
+    """Unique part of a Facebook post id: pfbid, story_fbid or h<fingerprint>."""
+    pfbid = pfbid_from_url(post_url)
+    if pfbid:
+        return pfbid
+    story = story_fbid_from_url(post_url)
+    if story:
+        return story
+    fingerprint = text_fingerprint(handle, text) or hashlib.sha1((post_url or '').encode('utf-8')).hexdigest()
+    return f"h{fingerprint[:16]}"
+
+
+def post_keys(handle: str, post_url: Optional[str] = None, text: Optional[str] = None,
+              post_id: Optional[str] = None) -> List[Tuple[str, str]]:
+    """(kind, key) pairs identifying a post: permalink id (pfbid/story_fbid), url and fingerprint."""
+    keys = []
+    pfbid = pfbid_from_url(post_url) or pfbid_from_url(post_id)
+    if pfbid:
+        keys.append(('pfbid', pfbid))
+    story = story_fbid_from_url(post_url)
+    if story:
+        # permalink.php?story_fbid=...: the id is in the query, the path is shared
+        keys.append(('story_fbid', story))
+    elif post_url:
+        keys.append(('url', post_url.split('?')[0]))
+    fingerprint = text_fingerprint(handle, text)
+    if fingerprint:
+        keys.append(('fingerprint', fingerprint))
+    return keys
+
+
+class KnownPosts:
+    """In-memory keys of one handle's collected posts (loaded once per scraper run)."""
+
+    def __init__(self, platform: str, handle: str):
+        self.platform = platform
+        self.handle = handle
+        self._keys: Dict[Tuple[str, str], Optional[str]] = {}
+        self._new: List[Tuple[str, str, Optional[str], Optional[datetime]]] = []
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    @property
+    def pfbids(self) -> List[str]:
+        return [key for kind, key in self._keys if kind == 'pfbid']
+
+    def load(self, rows: Iterable[Tuple[str, str, Optional[str]]]):
+        for kind, key, post_id in rows:
+            self._keys.setdefault((kind, key), post_id)
+
+    def match(self, post_url: Optional[str] = None, text: Optional[str] = None,
+              post_id: Optional[str] = None) -> Optional[str]:
+        """
+        Post id (or '' if unknown) of an already collected post, None if it is new.
+        A permalink (pfbid/story_fbid) is authoritative: posts that have one are
+        not matched by text, so a repeated text under a new permalink still
+        counts as a new post. Other URLs (photo/video links, the profile URL
+        used as a fallback) repeat across posts and only identify a post
+        without text; otherwise the fingerprint decides.
+        """
+        keys = post_keys(self.handle, post_url, text, post_id)
+        kinds = {kind for kind, _ in keys}
+        if kinds & PERMALINK_KINDS:
+            keys = [key for key in keys if key[0] != 'fingerprint']
+        elif 'fingerprint' in kinds:
+            keys = [key for key in keys if key[0] != 'url']
+        for key in keys:
+            if key in self._keys:
+                return self._keys[key] or ''
+        return None
+
+    def add(self, post_id: Optional[str], post_url: Optional[str] = None, text: Optional[str] = None,
+            date_posted: Optional[datetime] = None):
+        """Mark a post as collected (persisted by PostIndex.record)."""
+        for key in post_keys(self.handle, post_url, text, post_id):
+            if key not in self._keys:
+                self._keys[key] = post_id
+                self._new.append((key[0], key[1], post_id, date_posted))
+
+    def take_pending(self) -> List[Tuple[str, str, Optional[str], Optional[datetime]]]:
+        """Keys added since load (or the last call) - to be recorded."""
+        rows, self._new = self._new, []
+        return rows
+
+
+class Watermark:
+    """
+    Stop condition for scraping only posts newer than the last run.
+
+    Feed posts are passed to see() in page order. A post is old when it is in
+    `known` or dated before the newest stored post (minus WATERMARK_DATE_SLACK);
+    `reached` turns True after known_streak consecutive old posts.
+    """
+
+    def __init__(self, known: KnownPosts, newest_id: Optional[str] = None,
+                 newest_date: Optional[datetime] = None, known_streak: int = DEFAULT_KNOWN_STREAK):
+        self.known = known
+        self.newest_id = newest_id
+        self.newest_date = newest_date
+        self.known_streak = max(1, known_streak)
+        self.cutoff = newest_date - WATERMARK_DATE_SLACK if newest_date else None
+        self.streak = 0
+
+    def __str__(self) -> str:
+        newest = self.newest_date.strftime('%Y-%m-%d %H:%M') if self.newest_date else '-'
+        return f"newest {newest} ({self.newest_id or '-'}), stop after {self.known_streak} old posts in a row"
+
+    def is_old(self, post_url: Optional[str] = None, text: Optional[str] = None,
+               post_id: Optional[str] = None, date_posted: Optional[datetime] = None) -> bool:
+        if self.known.match(post_url, text, post_id) is not None:
+            return True
+        return bool(self.cutoff and date_posted and date_posted < self.cutoff)
+
+    def see(self, old: bool) -> bool:
+        """Register the next post of the feed; returns `reached`."""
+        self.streak = self.streak + 1 if old else 0
+        return self.reached
+
+    @property
+    def reached(self) -> bool:
+        return self.streak >= self.known_streak
+
+
+class PostIndex:
+    """Manager for the post_keys table."""
+
+    def __init__(self, db_path: Path = DB_PATH):
+        self.db_path = db_path
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = None
+        self._lock = threading.RLock()
+        self._init_schema()
+
+    def _init_schema(self):
+        """Initialize post_keys table."""
+        with self.connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS post_keys (
+                    platform VARCHAR NOT NULL,
+                    handle VARCHAR NOT NULL,
+                    kind VARCHAR NOT NULL,
+                    key VARCHAR NOT NULL,
+                    post_id VARCHAR,
+                    date_posted TIMESTAMP,
+                    first_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (platform, handle, kind, key)
+                )
+            """)
+            conn.execute("ALTER TABLE post_keys ADD COLUMN IF NOT EXISTS date_posted TIMESTAMP")
+
+    def get_connection(self):
+        """Get database connection (kept open until close())."""
+        if self.conn is None:
+            self.conn = connect_db(self.db_path)
+        return self.conn
+
+    @contextmanager
+    def connection(self):
+        """Connection for one operation: the open one from get_connection(), else a new one closed afterwards."""
+        with self._lock:
+            if self.conn is not None:
+                yield self.conn
+                return
+            conn = connect_db(self.db_path)
+            try:
+                yield conn
+            finally:
+                conn.close()
+
+    def load(self, platform: str, handle: str) -> KnownPosts:
+        """
+        Keys of all collected posts of a handle: recorded keys plus keys derived
+        from the posts table (covers posts stored before the index existed).
+        """
+        known = KnownPosts(platform, handle)
+        rows = []
+        with self.connection() as conn:
+            known.load(conn.execute(
+                "SELECT kind, key, post_id FROM post_keys WHERE platform = ? AND handle = ?",
+                [platform, handle]
+            ).fetchall())
+            if self._has_posts(conn):
+                rows = conn.execute(
+                    "SELECT id, post_url, raw_text_preview FROM posts WHERE platform = ? AND handle = ?",
+                    [platform, handle]
+                ).fetchall()
+        for post_id, post_url, text in rows:
+            known.load((kind, key, post_id) for kind, key in post_keys(handle, post_url, text, post_id))
+        return known
+
+    @staticmethod
+    def _has_posts(conn) -> bool:
+        return conn.execute(
+            "SELECT COUNT(*) FROM duckdb_tables() WHERE table_name = 'posts'"
+        ).fetchone()[0] > 0
+
+    def newest_post(self, platform: str, handle: str) -> Tuple[Optional[str], Optional[datetime]]:
+        """(post id, date_posted) of the newest dated post of a handle, (None, None) if none."""
+        query = """
+            SELECT post_id, date_posted FROM post_keys
+            WHERE platform = ? AND handle = ? AND date_posted IS NOT NULL
+        """
+        params = [platform, handle]
+        with self.connection() as conn:
+            if self._has_posts(conn):
+                query += """
+                    UNION ALL
+                    SELECT id, date_posted FROM posts
+                    WHERE platform = ? AND handle = ? AND date_posted IS NOT NULL
+                """
+                params += [platform, handle]
+            row = conn.execute(
+                f"SELECT * FROM ({query}) ORDER BY date_posted DESC LIMIT 1", params
+            ).fetchone()
+        return (row[0], row[1]) if row else (None, None)
+
+    def watermark(self, known: KnownPosts, known_streak: int = DEFAULT_KNOWN_STREAK) -> Watermark:
+        """Watermark of known's handle (newest stored post + its known keys)."""
+        newest_id, newest_date = self.newest_post(known.platform, known.handle)
+        return Watermark(known, newest_id, newest_date, known_streak)
+
+    def record(self, known: KnownPosts) -> int:
+        """Persist keys added to known since it was loaded; returns the number of keys written."""
+        rows = known.take_pending()
+        if not rows:
+            return 0
+        staging = pd.DataFrame(
+            [(known.platform, known.handle, *row) for row in rows],
+            columns=KEY_COLUMNS
+        )
+        with self.connection() as conn:
+            conn.register('post_keys_staging', staging)
+            try:
+                conn.execute("""
+                    INSERT OR IGNORE INTO post_keys (platform, handle, kind, key, post_id, date_posted)
+                    SELECT DISTINCT ON (platform, handle, kind, key) platform, handle, kind, key, post_id, date_posted
+                    FROM post_keys_staging
+                """)
+            finally:
+                conn.unregister('post_keys_staging')
+        return len(rows)
+
+    def close(self):
+        """Close database connection."""
+        if self.conn:
+            self.conn.close()
+            self.conn = None
+
+def get_post_index() -> PostIndex:
+    """Get PostIndex instance."""
+    return PostIndex()
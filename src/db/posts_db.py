@@ -5,12 +5,162 @@ Single source of truth for raw post data.
 """
 
 import duckdb
+import base64
+import os
+import time
+import pandas as pd
+from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Iterable
+from collections import Counter
 import json
 
+from db.text_search import tokenize, parse_query, contains_phrase, TOKENIZER_VERSION
+
 DB_PATH = Path(__file__).parent.parent.parent / "data" / "posts.duckdb"
 
+# DuckDB locks the database file per process. Long-running processes (web UI,
+# scrapers, batch scheduler) open posts.duckdb only for one operation at a time,
+# and connect_db waits up to this many seconds for another process to let go.
+LOCK_TIMEOUT = float(os.getenv("DUCKDB_LOCK_TIMEOUT", "30"))
+
+
+def connect_db(db_path: Path = DB_PATH, read_only: bool = False):
+    """duckdb.connect, retried while another process holds the file lock."""
+    deadline = time.monotonic() + LOCK_TIMEOUT
+    delay = 0.05
+    while True:
+        try:
+            return duckdb.connect(str(db_path), read_only=read_only)
+        except duckdb.IOException as e:
+            if 'lock' not in str(e).lower() or time.monotonic() >= deadline:
+                raise
+            time.sleep(delay)
+            delay = min(delay * 2, 1.0)
+
+# Columns written by insert_post / bulk_upsert (in staging order)
+POST_COLUMNS = [
+    'id', 'platform', 'handle', 'post_url', 'text', 'raw_text_preview',
+    'date_posted', 'screenshot_path', 'metadata'
+]
+
+
+# Sort key used by keyset pagination (created_at fills in posts without a date)
+POST_SORT_KEY = "COALESCE(date_posted, created_at)"
+
+
+# Re-indexed posts: up to this many are removed from post_terms by an id list
+# (idx_post_terms_post_id lookups), larger batches by one join over post_terms
+INDEX_DELETE_MAX_IDS = 100
+
+POST_TERMS_INDEX_SQL = "CREATE INDEX IF NOT EXISTS idx_post_terms_post_id ON post_terms(post_id)"
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Ids of posts containing all of the given terms (params: term list, term count)
+SEARCH_MATCH_SQL = """
+    SELECT post_id FROM post_terms SEMI JOIN (SELECT unnest(?::VARCHAR[]) AS term) USING (term)
+    GROUP BY post_id HAVING COUNT(*) = ?
+"""
+
+
+def indexed_tokens(text: Optional[str], raw_text_preview: Optional[str]) -> List[str]:
+    """Tokens indexed for a post (raw_text_preview is skipped when it repeats text)."""
+    text = text or ''
+    if raw_text_preview and raw_text_preview not in text:
+        text = f"{text}\n{raw_text_preview}"
+    return tokenize(text)
+
+
+def encode_cursor(sort_key: datetime, post_id: str) -> str:
+    """Encode (sort key, id) of the last row on a page as an opaque cursor."""
+    raw = json.dumps([sort_key.isoformat(), post_id], ensure_ascii=False)
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: str):
+    """Decode cursor produced by encode_cursor into (datetime, id)."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        sort_key, post_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return datetime.fromisoformat(sort_key), post_id
+    except Exception:
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+
+def parse_date(date_str):
+    """Parse date string to datetime."""
+    if not date_str:
+        return None
+    if isinstance(date_str, datetime):
+        return date_str
+    
+    # Try common formats
+    for fmt in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d', '%d.%m.%Y', '%Y-%m-%dT%H:%M:%S'):
+        try:
+            return datetime.strptime(date_str, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def post_from_raw(platform: str, handle: str, post_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a raw scraped JSON (data/raw/<platform>/<handle>/<id>.json) to a posts row."""
+    if platform == 'instagram':
+        return {
+            'id': post_id,
+            'platform': 'instagram',
+            'handle': handle,
+            'post_url': data.get('post_url'),
+            'text': data.get('caption'),
+            'raw_text_preview': data.get('caption'),
+            'date_posted': parse_date(data.get('date_posted')),
+            'screenshot': data.get('screenshot'),
+            'metadata': {
+                'likes': data.get('likes'),
+                'comments_count': data.get('comments_count'),
+                'media_type': data.get('media_type'),
+                'media_url': data.get('media_url')
+            }
+        }
+    
+    if platform == 'telegram':
+        return {
+            'id': post_id,
+            'platform': 'telegram',
+            'handle': handle,
+            'post_url': data.get('message_url'),
+            'text': data.get('text'),
+            'raw_text_preview': data.get('text'),
+            'date_posted': parse_date(data.get('date')),
+            'screenshot': data.get('screenshot'),
+            'metadata': {
+                'views': data.get('views'),
+                'forwards': data.get('forwards'),
+                'media': data.get('media')
+            }
+        }
+    
+    return {
+        'id': post_id,
+        'platform': platform,
+        'handle': handle,
+        'post_url': data.get('post_url'),
+        'text': data.get('text'),
+        'raw_text_preview': data.get('raw_text_preview'),
+        'date_posted': parse_date(data.get('date_posted')),
+        'screenshot': data.get('screenshot'),
+        'metadata': {
+            'reactions': data.get('reactions'),
+            'comments': data.get('comments'),
+            'shares': data.get('shares'),
+            'image': data.get('image'),
+            'video': data.get('video')
+        }
+    }
+
 
 class PostsDB:
     """Manager for posts database."""
@@ -23,7 +173,7 @@ class PostsDB:
     
     def _init_schema(self):
         """Initialize database schema."""
-        conn = duckdb.connect(str(self.db_path))
+        conn = connect_db(self.db_path)
         
         conn.execute("""
             CREATE TABLE IF NOT EXISTS posts (
@@ -46,12 +196,42 @@ class PostsDB:
         conn.execute("CREATE INDEX IF NOT EXISTS idx_posts_handle ON posts(handle)")
         conn.execute("CREATE INDEX IF NOT EXISTS idx_posts_date ON posts(date_posted)")
         
+        # Full-text index: one row per (post, normalized term) + document lengths for BM25
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS post_terms (
+                post_id VARCHAR NOT NULL,
+                term VARCHAR NOT NULL,
+                tf INTEGER NOT NULL
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS post_doc_len (
+                post_id VARCHAR PRIMARY KEY,
+                doc_len INTEGER NOT NULL
+            )
+        """)
+        conn.execute(POST_TERMS_INDEX_SQL)
+        conn.execute("CREATE TABLE IF NOT EXISTS search_index_version (version INTEGER NOT NULL)")
+        
+        # Databases created before the search index, or indexed by another
+        # tokenizer version (text_search.TOKENIZER_VERSION), get it rebuilt once
+        has_posts, indexed, version = conn.execute("""
+            SELECT EXISTS(SELECT 1 FROM posts), EXISTS(SELECT 1 FROM post_doc_len),
+                   (SELECT MAX(version) FROM search_index_version)
+        """).fetchone()
+        if not has_posts:
+            self._set_tokenizer_version(conn)
+        needs_index = has_posts and (not indexed or version != TOKENIZER_VERSION)
         conn.close()
+        
+        if needs_index:
+            print("🔎 Budowanie indeksu wyszukiwania postów...")
+            self.rebuild_search_index()
     
     def get_connection(self):
         """Get database connection."""
         if self.conn is None:
-            self.conn = duckdb.connect(str(self.db_path))
+            self.conn = connect_db(self.db_path)
         return self.conn
     
     def insert_post(self, post_data: Dict[str, Any]) -> bool:
@@ -59,6 +239,8 @@ class PostsDB:
         conn = self.get_connection()
         
         try:
+            # Post row and its search index entries change together or not at all
+            conn.execute("BEGIN TRANSACTION")
             conn.execute("""
                 INSERT OR REPLACE INTO posts (
                     id, platform, handle, post_url, text, raw_text_preview,
@@ -75,11 +257,193 @@ class PostsDB:
                 post_data.get('screenshot'),
                 json.dumps(post_data.get('metadata', {}))
             ])
+            self._index_posts([(
+                post_data.get('id'), post_data.get('text'), post_data.get('raw_text_preview')
+            )])
+            conn.execute("COMMIT")
             return True
         except Exception as e:
+            conn.execute("ROLLBACK")
             print(f"Error inserting post {post_data.get('id')}: {e}")
             return False
     
+    def bulk_upsert(self, posts: Iterable[Dict[str, Any]], batch_size: int = 50000) -> Dict[str, int]:
+        """
+        Insert or update many posts at once.
+        
+        Each batch is staged as a DataFrame view and merged into `posts` with a
+        single INSERT ... ON CONFLICT statement. Rows without id/platform/handle
+        are counted as failed; duplicate ids within a batch keep the last row.
+        
+        Returns dict with 'inserted', 'updated' and 'failed' counts.
+        """
+        stats = {'inserted': 0, 'updated': 0, 'failed': 0}
+        batch = []
+        
+        for post_data in posts:
+            if not (post_data.get('id') and post_data.get('platform') and post_data.get('handle')):
+                stats['failed'] += 1
+                continue
+            batch.append(post_data)
+            if len(batch) >= batch_size:
+                self._upsert_batch(batch, stats)
+                batch = []
+        
+        if batch:
+            self._upsert_batch(batch, stats)
+        
+        return stats
+    
+    def _upsert_batch(self, batch: List[Dict[str, Any]], stats: Dict[str, int]):
+        """Stage one batch and merge it into posts (helper for bulk_upsert)."""
+        conn = self.get_connection()
+        
+        rows = []
+        for post_data in batch:
+            date_posted = parse_date(post_data.get('date_posted'))
+            rows.append((
+                str(post_data.get('id')),
+                post_data.get('platform'),
+                post_data.get('handle'),
+                post_data.get('post_url'),
+                post_data.get('text'),
+                post_data.get('raw_text_preview'),
+                date_posted.isoformat() if date_posted else None,
+                post_data.get('screenshot'),
+                json.dumps(post_data.get('metadata', {}), ensure_ascii=False, default=str)
+            ))
+        
+        staging = pd.DataFrame(rows, columns=POST_COLUMNS, dtype=object)
+        staging['_ord'] = range(len(staging))
+        conn.register('posts_staging', staging)
+        
+        try:
+            conn.execute("BEGIN TRANSACTION")
+            conn.execute("""
+                CREATE OR REPLACE TEMP TABLE posts_batch AS
+                SELECT id, platform, handle, post_url, text, raw_text_preview,
+                       TRY_CAST(date_posted AS TIMESTAMP) AS date_posted,
+                       screenshot_path, metadata
+                FROM posts_staging
+                QUALIFY row_number() OVER (PARTITION BY id ORDER BY _ord DESC) = 1
+            """)
+            
+            staged, existing = conn.execute("""
+                SELECT COUNT(*), COUNT(p.id)
+                FROM posts_batch b LEFT JOIN posts p ON p.id = b.id
+            """).fetchone()
+            
+            conn.execute("""
+                INSERT INTO posts (
+                    id, platform, handle, post_url, text, raw_text_preview,
+                    date_posted, screenshot_path, metadata, updated_at
+                )
+                SELECT id, platform, handle, post_url, text, raw_text_preview,
+                       date_posted, screenshot_path, metadata, CURRENT_TIMESTAMP
+                FROM posts_batch
+                ON CONFLICT (id) DO UPDATE SET
+                    platform = EXCLUDED.platform,
+                    handle = EXCLUDED.handle,
+                    post_url = EXCLUDED.post_url,
+                    text = EXCLUDED.text,
+                    raw_text_preview = EXCLUDED.raw_text_preview,
+                    date_posted = EXCLUDED.date_posted,
+                    screenshot_path = EXCLUDED.screenshot_path,
+                    metadata = EXCLUDED.metadata,
+                    updated_at = EXCLUDED.updated_at
+            """)
+            self._index_posts(
+                conn.execute("SELECT id, text, raw_text_preview FROM posts_batch").fetchall()
+            )
+            conn.execute("COMMIT")
+            
+            stats['inserted'] += staged - existing
+            stats['updated'] += existing
+            # Duplicate ids inside the batch collapse into one row
+            stats['updated'] += len(batch) - staged
+        except Exception as e:
+            conn.execute("ROLLBACK")
+            print(f"Error upserting batch of {len(batch)} posts: {e}")
+            stats['failed'] += len(batch)
+        finally:
+            conn.execute("DROP TABLE IF EXISTS posts_batch")
+            conn.unregister('posts_staging')
+    
+    def _index_posts(self, rows: List[tuple]):
+        """
+        Replace full-text index entries for (id, text, raw_text_preview) rows.
+        Runs inside the caller's transaction (insert_post / bulk_upsert / rebuild).
+        """
+        conn = self.get_connection()
+        
+        term_rows = []
+        len_rows = []
+        for post_id, text, raw_text_preview in rows:
+            tokens = indexed_tokens(text, raw_text_preview)
+            term_rows.extend((post_id, term, tf) for term, tf in Counter(tokens).items())
+            len_rows.append((post_id, len(tokens)))
+        
+        terms = pd.DataFrame(term_rows, columns=['post_id', 'term', 'tf'])
+        lengths = pd.DataFrame(len_rows, columns=['post_id', 'doc_len'])
+        conn.register('terms_staging', terms)
+        conn.register('doc_len_staging', lengths)
+        try:
+            # Only posts indexed before have terms to delete (new posts skip the delete)
+            reindexed = [r[0] for r in conn.execute(
+                "SELECT post_id FROM post_doc_len SEMI JOIN doc_len_staging USING (post_id)"
+            ).fetchall()]
+            if len(reindexed) > INDEX_DELETE_MAX_IDS:
+                conn.execute(
+                    "DELETE FROM post_terms WHERE post_id IN (SELECT post_id FROM doc_len_staging)"
+                )
+            elif reindexed:
+                conn.execute(
+                    f"DELETE FROM post_terms WHERE post_id IN ({', '.join('?' * len(reindexed))})",
+                    reindexed
+                )
+            # Sorted inserts keep row groups clustered by term, so lookups prune via zonemaps
+            conn.execute("INSERT INTO post_terms SELECT post_id, term, tf FROM terms_staging ORDER BY term")
+            conn.execute("INSERT OR REPLACE INTO post_doc_len SELECT post_id, doc_len FROM doc_len_staging")
+        finally:
+            conn.unregister('terms_staging')
+            conn.unregister('doc_len_staging')
+    
+    @staticmethod
+    def _set_tokenizer_version(conn):
+        conn.execute("DELETE FROM search_index_version")
+        conn.execute("INSERT INTO search_index_version VALUES (?)", [TOKENIZER_VERSION])
+    
+    def rebuild_search_index(self, batch_size: int = 50000) -> int:
+        """
+        Rebuild the full-text index from scratch (also re-clusters it after
+        many small upserts). Returns number of indexed posts.
+        """
+        conn = self.get_connection()
+        conn.execute("BEGIN TRANSACTION")
+        try:
+            # Without the post_id index while refilling; it is recreated after re-clustering
+            conn.execute("DROP INDEX IF EXISTS idx_post_terms_post_id")
+            conn.execute("DELETE FROM post_terms")
+            conn.execute("DELETE FROM post_doc_len")
+            
+            total = conn.execute("SELECT COUNT(*) FROM posts").fetchone()[0]
+            for offset in range(0, total, batch_size):
+                rows = conn.execute(
+                    "SELECT id, text, raw_text_preview FROM posts ORDER BY id LIMIT ? OFFSET ?",
+                    [batch_size, offset]
+                ).fetchall()
+                self._index_posts(rows)
+            
+            # Re-cluster the whole table by term
+            conn.execute("CREATE OR REPLACE TABLE post_terms AS SELECT * FROM post_terms ORDER BY term")
+            conn.execute(POST_TERMS_INDEX_SQL)
+            self._set_tokenizer_version(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return total
+    
     def get_posts(self, platform: Optional[str] = None, 
                   handle: Optional[str] = None,
                   limit: int = 100, offset: int = 0) -> List[Dict]:
@@ -105,6 +469,81 @@ class PostsDB:
         
         return [dict(zip(columns, row)) for row in result]
     
+    def get_posts_page(self, platform: Optional[str] = None,
+                       handle: Optional[str] = None,
+                       cursor: Optional[str] = None,
+                       limit: int = 100,
+                       search: Optional[str] = None,
+                       content_type: Optional[str] = None,
+                       order: str = 'desc') -> Dict[str, Any]:
+        """
+        Get one page of post summaries using keyset pagination on
+        (COALESCE(date_posted, created_at), id).
+        
+        Snippet, content type (post/story) and carousel image count are
+        computed in SQL. Returns {'posts': [...], 'next_cursor': str | None}.
+        """
+        conn = self.get_connection()
+        descending = order != 'asc'
+        
+        query = f"""
+            SELECT * FROM (
+                SELECT id, platform, handle, post_url, date_posted, created_at,
+                       screenshot_path,
+                       {POST_SORT_KEY} AS sort_key,
+                       left(COALESCE(NULLIF(text, ''), NULLIF(raw_text_preview, ''), ''), 100) AS snippet,
+                       CASE WHEN post_url LIKE '%/stories/%' OR post_url LIKE '%/story/%'
+                            THEN 'story' ELSE 'post' END AS content_type,
+                       COALESCE(json_array_length(json_extract(metadata, '$.images')), 0) AS image_count
+                FROM posts WHERE 1=1
+        """
+        params = []
+        
+        if platform:
+            query += " AND platform = ?"
+            params.append(platform)
+        
+        if handle:
+            query += " AND handle = ?"
+            params.append(handle)
+        
+        if search:
+            terms, _ = parse_query(search)
+            if terms:
+                query += f" AND (id IN ({SEARCH_MATCH_SQL}) OR id ILIKE ?)"
+                params.extend([terms, len(terms)])
+            else:
+                query += " AND id ILIKE ?"
+            params.append(f"%{search}%")
+        
+        query += ") WHERE 1=1"
+        
+        if content_type:
+            query += " AND content_type = ?"
+            params.append(content_type)
+        
+        if cursor:
+            cursor_key, cursor_id = decode_cursor(cursor)
+            op = '<' if descending else '>'
+            query += f" AND (sort_key {op} ? OR (sort_key = ? AND id {op} ?))"
+            params.extend([cursor_key, cursor_key, cursor_id])
+        
+        direction = 'DESC' if descending else 'ASC'
+        query += f" ORDER BY sort_key {direction}, id {direction} LIMIT ?"
+        # Fetch one extra row to know whether another page exists
+        params.append(limit + 1)
+        
+        result = conn.execute(query, params).fetchall()
+        columns = [desc[0] for desc in conn.description]
+        rows = [dict(zip(columns, row)) for row in result]
+        
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]['sort_key'], rows[-1]['id'])
+        
+        return {'posts': rows, 'next_cursor': next_cursor}
+    
     def get_post_by_id(self, post_id: str) -> Optional[Dict]:
         """Get single post by ID."""
         conn = self.get_connection()
@@ -149,22 +588,114 @@ class PostsDB:
         result = conn.execute(query, params).fetchall()
         return [row[0] for row in result]
     
-    def search_posts(self, search_text: str, limit: int = 50) -> List[Dict]:
-        """Full-text search in posts."""
+    def get_profile_summaries(self, platform: Optional[str] = None) -> List[Dict]:
+        """
+        Get one summary row per (platform, handle) in a single query:
+        post_count, newest/oldest date_posted and last scrape time.
+        """
         conn = self.get_connection()
         
         query = """
-            SELECT * FROM posts 
-            WHERE text LIKE ? OR raw_text_preview LIKE ?
-            ORDER BY date_posted DESC
-            LIMIT ?
+            SELECT platform, handle,
+                   COUNT(*) AS post_count,
+                   MAX(date_posted) AS newest_post,
+                   MIN(date_posted) AS oldest_post,
+                   MAX(updated_at) AS last_scraped_at
+            FROM posts WHERE 1=1
         """
-        search_pattern = f"%{search_text}%"
-        result = conn.execute(query, [search_pattern, search_pattern, limit]).fetchall()
+        params = []
+        
+        if platform:
+            query += " AND platform = ?"
+            params.append(platform)
+        
+        query += " GROUP BY platform, handle ORDER BY platform, handle"
+        
+        result = conn.execute(query, params).fetchall()
         columns = [desc[0] for desc in conn.description]
         
         return [dict(zip(columns, row)) for row in result]
     
+    def search_posts(self, search_text: str, limit: int = 50,
+                     platform: Optional[str] = None,
+                     handle: Optional[str] = None) -> List[Dict]:
+        """
+        Full-text search in posts, ranked by BM25.
+        
+        Matching is diacritic-insensitive and stemmed; every query term must
+        occur in the post. "Quoted text" additionally requires the exact phrase.
+        Each result carries a 'score' column.
+        """
+        terms, phrases = parse_query(search_text)
+        if not terms:
+            return []
+        
+        conn = self.get_connection()
+        query = f"""
+            WITH q AS (SELECT unnest(?::VARCHAR[]) AS term),
+            hits AS (
+                SELECT t.post_id, t.term, t.tf FROM post_terms t SEMI JOIN q USING (term)
+            ),
+            df AS (SELECT term, COUNT(*) AS df FROM hits GROUP BY term),
+            stats AS (SELECT COUNT(*) AS n, AVG(doc_len) AS avgdl FROM post_doc_len)
+            SELECT h.post_id,
+                   SUM(ln(1 + (s.n - df.df + 0.5) / (df.df + 0.5))
+                       * h.tf * ({BM25_K1} + 1)
+                       / (h.tf + {BM25_K1} * (1 - {BM25_B} + {BM25_B} * d.doc_len / s.avgdl))) AS score
+            FROM hits h
+            JOIN df USING (term)
+            JOIN post_doc_len d USING (post_id)
+            CROSS JOIN stats s
+            GROUP BY h.post_id
+            HAVING COUNT(*) = ?
+        """
+        params = [terms, len(terms)]
+        
+        if platform or handle:
+            query = f"SELECT sc.* FROM ({query}) sc JOIN posts p ON p.id = sc.post_id WHERE 1=1"
+            if platform:
+                query += " AND p.platform = ?"
+                params.append(platform)
+            if handle:
+                query += " AND p.handle = ?"
+                params.append(handle)
+        
+        query += " ORDER BY score DESC, post_id"
+        # Phrase checks need the candidates' text, so they are filtered after ranking
+        if not phrases:
+            query += " LIMIT ?"
+            params.append(limit)
+        
+        ranked = conn.execute(query, params).fetchall()
+        
+        results = []
+        chunk = max(limit, 100)
+        for start in range(0, len(ranked), chunk):
+            part = ranked[start:start + chunk]
+            rows = conn.execute(
+                "SELECT * FROM posts WHERE id IN (SELECT unnest(?::VARCHAR[]))",
+                [[post_id for post_id, _ in part]]
+            ).fetchall()
+            columns = [desc[0] for desc in conn.description]
+            by_id = {row[0]: dict(zip(columns, row)) for row in rows}
+            
+            for post_id, score in part:
+                post = by_id.get(post_id)
+                if post is None:
+                    continue
+                if phrases and not all(
+                    contains_phrase(indexed_tokens(post['text'], post['raw_text_preview']), p)
+                    for p in phrases
+                ):
+                    continue
+                post['score'] = score
+                results.append(post)
+            
+            if len(results) >= limit:
+                break
+        
+        return results[:limit]
+    
     def close(self):
         """Close database connection."""
         if self.conn:
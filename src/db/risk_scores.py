@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Risk scores - keyword-dictionary risk scoring persisted for every post.
+Lives in posts.duckdb as the post_risk side table (one row per post).
+
+Rows are rescored only when the post text or the dictionary version changed.
+"""
+
+import threading
+import pandas as pd
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from db.posts_db import DB_PATH, connect_db
+from analysis.keyword_scorer import KeywordScorer, RISK_THRESHOLD, get_scorer
+
+RISK_COLUMNS = [
+    'post_id', 'risk_score', 'matched_terms', 'matched_tags',
+    'text_hash', 'dictionary_version'
+]
+
+# Hash of the scored text, computed in SQL so unchanged rows never leave DuckDB
+TEXT_HASH_SQL = "md5(COALESCE(p.text, '') || chr(0) || COALESCE(p.raw_text_preview, ''))"
+
+
+def scored_text(text: Optional[str], raw_text_preview: Optional[str]) -> str:
+    """Text passed to the scorer (raw_text_preview is skipped when it repeats text)."""
+    text = text or ''
+    if raw_text_preview and raw_text_preview not in text:
+        text = f"{text}\n{raw_text_preview}"
+    return text
+
+
+class RiskScores:
+    """Manager for the post_risk table (incremental scoring + ranking)."""
+
+    def __init__(self, db_path: Path = DB_PATH):
+        self.db_path = db_path
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = None
+        self._lock = threading.RLock()
+        self._init_schema()
+
+    def _init_schema(self):
+        """Initialize post_risk table."""
+        with self.connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS post_risk (
+                    post_id VARCHAR PRIMARY KEY,
+                    risk_score INTEGER NOT NULL,
+                    matched_terms VARCHAR[],
+                    matched_tags VARCHAR[],
+                    text_hash VARCHAR NOT NULL,
+                    dictionary_version VARCHAR NOT NULL,
+                    scored_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+
+    def get_connection(self):
+        """Get database connection (kept open until close())."""
+        if self.conn is None:
+            self.conn = connect_db(self.db_path)
+        return self.conn
+
+    @contextmanager
+    def connection(self):
+        """Connection for one operation: the open one from get_connection(), else a new one closed afterwards."""
+        with self._lock:
+            if self.conn is not None:
+                yield self.conn
+                return
+            conn = connect_db(self.db_path)
+            try:
+                yield conn
+            finally:
+                conn.close()
+
+    def score_posts(self, scorer: Optional[KeywordScorer] = None,
+                    batch_size: int = 10000, full: bool = False) -> Dict[str, int]:
+        """
+        Score posts whose text or dictionary version changed since the last run
+        (all posts with full=True). Posts are streamed in batches of batch_size.
+
+        Returns dict with 'scored', 'flagged' (score >= RISK_THRESHOLD),
+        'unchanged' and 'removed' counts.
+        """
+        scorer = scorer or get_scorer()
+        stats = {'scored': 0, 'flagged': 0, 'unchanged': 0, 'removed': 0}
+
+        with self.connection() as conn:
+            query = f"""
+                SELECT p.id, p.text, p.raw_text_preview, {TEXT_HASH_SQL} AS text_hash
+                FROM posts p LEFT JOIN post_risk r ON r.post_id = p.id
+            """
+            params = []
+            if not full:
+                query += f"""
+                    WHERE r.post_id IS NULL
+                       OR r.dictionary_version <> ?
+                       OR r.text_hash <> {TEXT_HASH_SQL}
+                """
+                params.append(scorer.version)
+
+            total = conn.execute("SELECT COUNT(*) FROM posts").fetchone()[0]
+
+            # Separate cursor: the read stream stays open while batches are written
+            reader = conn.cursor()
+            reader.execute(query, params)
+            try:
+                while True:
+                    batch = reader.fetchmany(batch_size)
+                    if not batch:
+                        break
+                    rows = []
+                    for post_id, text, raw_text_preview, text_hash in batch:
+                        result = scorer.score(scored_text(text, raw_text_preview))
+                        rows.append((post_id, result.score, result.keywords, result.tags,
+                                     text_hash, scorer.version))
+                        if result.score >= RISK_THRESHOLD:
+                            stats['flagged'] += 1
+                    self._upsert(conn, rows)
+                    stats['scored'] += len(rows)
+            finally:
+                reader.close()
+
+            stats['unchanged'] = total - stats['scored']
+            removed = conn.execute("""
+                DELETE FROM post_risk WHERE post_id NOT IN (SELECT id FROM posts)
+                RETURNING post_id
+            """).fetchall()
+            stats['removed'] = len(removed)
+
+        return stats
+
+    def _upsert(self, conn, rows: List[tuple]):
+        """Merge scored rows into post_risk in one statement."""
+        staging = pd.DataFrame(rows, columns=RISK_COLUMNS)
+        conn.register('risk_staging', staging)
+        try:
+            conn.execute("""
+                INSERT OR REPLACE INTO post_risk (
+                    post_id, risk_score, matched_terms, matched_tags,
+                    text_hash, dictionary_version, scored_at
+                )
+                SELECT post_id, risk_score,
+                       CAST(matched_terms AS VARCHAR[]), CAST(matched_tags AS VARCHAR[]),
+                       text_hash, dictionary_version, CURRENT_TIMESTAMP
+                FROM risk_staging
+            """)
+        finally:
+            conn.unregister('risk_staging')
+
+    def get_top_posts(self, limit: int = 100, min_score: int = RISK_THRESHOLD,
+                      platform: Optional[str] = None) -> List[Dict]:
+        """Highest-risk posts joined with their post data."""
+        query = """
+            SELECT p.id, p.platform, p.handle, p.post_url, p.date_posted,
+                   left(COALESCE(NULLIF(p.text, ''), p.raw_text_preview, ''), 200) AS snippet,
+                   r.risk_score, r.matched_terms, r.matched_tags
+            FROM post_risk r JOIN posts p ON p.id = r.post_id
+            WHERE r.risk_score >= ?
+        """
+        params = [min_score]
+        if platform:
+            query += " AND p.platform = ?"
+            params.append(platform)
+        query += " ORDER BY r.risk_score DESC, p.date_posted DESC NULLS LAST LIMIT ?"
+        params.append(limit)
+
+        with self.connection() as conn:
+            result = conn.execute(query, params).fetchall()
+            columns = [desc[0] for desc in conn.description]
+        return [dict(zip(columns, row)) for row in result]
+
+    def close(self):
+        """Close database connection."""
+        if self.conn:
+            self.conn.close()
+            self.conn = None
+
+
+def get_risk_scores() -> RiskScores:
+    """Get RiskScores instance."""
+    return RiskScores()
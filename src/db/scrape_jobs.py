@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Scrape job queue - persistent queue of collector targets in posts.duckdb.
+
+One scrape_jobs row per target (profile, post URL, channel) with its status:
+pending -> running -> done, or back to pending with a later next_run_at after a
+failed attempt, and failed once max_attempts is used up. Every attempt is also
+logged in scrape_job_runs. The queue survives restarts: jobs left running by a
+crashed scheduler are put back to pending by recover().
+
+Each queue instance has an owner id. A claimed job records it and a
+heartbeat_at the scheduler refreshes (heartbeat()), so a second scheduler only
+recovers running jobs whose heartbeat is stale, not the live ones of another.
+
+Every operation opens and closes its own connection (connection()), so a batch
+running for hours does not lock posts.duckdb against the web UI and scripts.
+"""
+
+import json
+import os
+import re
+import socket
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from db.posts_db import DB_PATH, connect_db
+
+JOB_STATUSES = ('pending', 'running', 'done', 'failed')
+DEFAULT_MAX_ATTEMPTS = 3
+# A running job whose heartbeat is older than this belongs to a dead scheduler
+STALE_AFTER = 300   # seconds
+
+
+def job_id(kind: str, target: str) -> str:
+    return f"{kind}:{target}"
+
+
+class ScrapeJobQueue:
+    """Manager for the scrape_jobs / scrape_job_runs tables."""
+
+    def __init__(self, db_path: Path = DB_PATH):
+        self.db_path = db_path
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = None
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._lock = threading.RLock()
+        self._init_schema()
+
+    def _init_schema(self):
+        """Initialize job tables."""
+        with self.connection() as conn:
+            self._create_tables(conn)
+
+    def _create_tables(self, conn):
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS scrape_jobs (
+                id VARCHAR PRIMARY KEY,
+                kind VARCHAR NOT NULL,
+                target VARCHAR NOT NULL,
+                status VARCHAR NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL DEFAULT 3,
+                next_run_at TIMESTAMP,
+                last_error VARCHAR,
+                result JSON,
+                created_at TIMESTAMP,
+                started_at TIMESTAMP,
+                finished_at TIMESTAMP,
+                updated_at TIMESTAMP
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS scrape_job_runs (
+                job_id VARCHAR NOT NULL,
+                attempt INTEGER NOT NULL,
+                status VARCHAR NOT NULL,
+                started_at TIMESTAMP,
+                finished_at TIMESTAMP,
+                error VARCHAR,
+                result JSON
+            )
+        """)
+
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_scrape_jobs_status ON scrape_jobs(status)")
+        conn.execute("ALTER TABLE scrape_jobs ADD COLUMN IF NOT EXISTS owner VARCHAR")
+        conn.execute("ALTER TABLE scrape_jobs ADD COLUMN IF NOT EXISTS heartbeat_at TIMESTAMP")
+
+    def get_connection(self):
+        """Get database connection (kept open until close())."""
+        if self.conn is None:
+            self.conn = connect_db(self.db_path)
+        return self.conn
+
+    @contextmanager
+    def connection(self):
+        """Connection for one operation: the open one from get_connection(), else a new one closed afterwards."""
+        with self._lock:
+            if self.conn is not None:
+                yield self.conn
+                return
+            conn = connect_db(self.db_path)
+            try:
+                yield conn
+            finally:
+                conn.close()
+
+    def _query(self, query: str, params: list) -> List[Dict]:
+        with self.connection() as conn:
+            result = conn.execute(query, params).fetchall()
+            columns = [desc[0] for desc in conn.description]
+        return [dict(zip(columns, row)) for row in result]
+
+    def enqueue(self, targets: Iterable[Tuple[str, str]], max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+                requeue: bool = False) -> Dict[str, int]:
+        """
+        Add (kind, target) jobs. Targets already queued are left alone, unless
+        requeue is set: then finished (done / failed) jobs are reset to pending.
+        Returns {'added', 'requeued', 'existing'}.
+        """
+        stats = {'added': 0, 'requeued': 0, 'existing': 0}
+        now = datetime.now()
+        with self.connection() as conn:
+            for kind, target in dict.fromkeys(targets):
+                jid = job_id(kind, target)
+                row = conn.execute("SELECT status FROM scrape_jobs WHERE id = ?", [jid]).fetchone()
+                if row is None:
+                    conn.execute("""
+                        INSERT INTO scrape_jobs (id, kind, target, max_attempts, next_run_at, created_at, updated_at)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)
+                    """, [jid, kind, target, max_attempts, now, now, now])
+                    stats['added'] += 1
+                elif requeue and row[0] in ('done', 'failed'):
+                    conn.execute("""
+                        UPDATE scrape_jobs
+                        SET status = 'pending', attempts = 0, max_attempts = ?, next_run_at = ?,
+                            last_error = NULL, updated_at = ?
+                        WHERE id = ?
+                    """, [max_attempts, now, now, jid])
+                    stats['requeued'] += 1
+                else:
+                    stats['existing'] += 1
+        return stats
+
+    def targets_from_table(self, table: str) -> List[Tuple[Optional[str], str]]:
+        """(kind or None, target) rows of a table in the same database (columns: target[, kind])."""
+        if not re.fullmatch(r'[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)?', table):
+            raise ValueError(f"Invalid table name: {table}")
+        rows = self._query(f"SELECT * FROM {table}", [])
+        if rows and 'target' not in rows[0]:
+            raise ValueError(f"Table {table} has no 'target' column")
+        return [(row.get('kind'), row['target']) for row in rows if row['target']]
+
+    def recover(self, stale_after: float = STALE_AFTER) -> int:
+        """
+        Put jobs left running by a scheduler that died (no heartbeat for
+        stale_after seconds) back to pending; returns how many.
+        """
+        now = datetime.now()
+        with self.connection() as conn:
+            rows = conn.execute("""
+                UPDATE scrape_jobs SET status = 'pending', owner = NULL, next_run_at = ?, updated_at = ?
+                WHERE status = 'running' AND COALESCE(heartbeat_at, started_at, updated_at, ?) < ?
+                RETURNING id
+            """, [now, now, datetime.min, now - timedelta(seconds=stale_after)]).fetchall()
+        return len(rows)
+
+    def claim(self) -> Optional[Dict]:
+        """Mark the oldest due pending job as running and return it (None if nothing is due)."""
+        now = datetime.now()
+        with self.connection() as conn:
+            conn.execute("BEGIN TRANSACTION")
+            try:
+                result = conn.execute("""
+                    UPDATE scrape_jobs
+                    SET status = 'running', attempts = attempts + 1, owner = ?,
+                        started_at = ?, heartbeat_at = ?, updated_at = ?
+                    WHERE status = 'pending' AND id = (
+                        SELECT id FROM scrape_jobs
+                        WHERE status = 'pending' AND next_run_at <= ?
+                        ORDER BY next_run_at, created_at
+                        LIMIT 1
+                    )
+                    RETURNING *
+                """, [self.owner, now, now, now, now])
+                row = result.fetchone()
+                columns = [desc[0] for desc in result.description]
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return dict(zip(columns, row)) if row else None
+
+    def heartbeat(self) -> int:
+        """Refresh heartbeat_at of the jobs this queue is running; returns how many."""
+        now = datetime.now()
+        with self.connection() as conn:
+            rows = conn.execute("""
+                UPDATE scrape_jobs SET heartbeat_at = ?
+                WHERE status = 'running' AND owner = ?
+                RETURNING id
+            """, [now, self.owner]).fetchall()
+        return len(rows)
+
+    def complete(self, jid: str, result: Optional[Dict[str, Any]] = None):
+        """Mark a running job done."""
+        self._finish(jid, 'done', None, result)
+
+    def fail(self, jid: str, error: str, retry_delay: float, retry: bool = True) -> str:
+        """
+        Record a failed attempt. The job goes back to pending, due in retry_delay
+        seconds, or to failed when it has no attempts left (or retry is False).
+        Returns the new status.
+        """
+        job = self.get(jid)
+        retry = retry and job is not None and job['attempts'] < job['max_attempts']
+        status = 'pending' if retry else 'failed'
+        next_run_at = datetime.now() + timedelta(seconds=retry_delay) if retry else None
+        self._finish(jid, status, error, None, next_run_at)
+        return status
+
+    def _finish(self, jid: str, status: str, error: Optional[str], result: Optional[Dict],
+                next_run_at: Optional[datetime] = None):
+        now = datetime.now()
+        result_json = json.dumps(result, ensure_ascii=False, default=str) if result is not None else None
+        with self.connection() as conn:
+            # A job recovered by another scheduler (stale heartbeat) is no longer ours to finish
+            finished = conn.execute("""
+                UPDATE scrape_jobs
+                SET status = ?, last_error = ?, result = COALESCE(?, result),
+                    next_run_at = COALESCE(?, next_run_at), finished_at = ?, updated_at = ?
+                WHERE id = ? AND status = 'running' AND owner = ?
+                RETURNING id
+            """, [status, error, result_json, next_run_at, now, now, jid, self.owner]).fetchall()
+            if not finished:
+                return
+            conn.execute("""
+                INSERT INTO scrape_job_runs (job_id, attempt, status, started_at, finished_at, error, result)
+                SELECT id, attempts, ?, started_at, ?, ?, ? FROM scrape_jobs WHERE id = ?
+            """, ['done' if status == 'done' else 'error', now, error, result_json, jid])
+
+    def get(self, jid: str) -> Optional[Dict]:
+        rows = self._query("SELECT * FROM scrape_jobs WHERE id = ?", [jid])
+        return rows[0] if rows else None
+
+    def next_due(self) -> Optional[datetime]:
+        """Earliest next_run_at of pending jobs (None when nothing is pending)."""
+        with self.connection() as conn:
+            return conn.execute(
+                "SELECT MIN(next_run_at) FROM scrape_jobs WHERE status = 'pending'"
+            ).fetchone()[0]
+
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs per status."""
+        rows = self._query("SELECT status, COUNT(*) AS n FROM scrape_jobs GROUP BY status", [])
+        counts = {status: 0 for status in JOB_STATUSES}
+        counts.update({r['status']: r['n'] for r in rows})
+        return counts
+
+    def jobs(self, status: Optional[str] = None) -> List[Dict]:
+        """Jobs (optionally with one status), oldest first."""
+        query = "SELECT * FROM scrape_jobs"
+        params = []
+        if status:
+            query += " WHERE status = ?"
+            params.append(status)
+        return self._query(query + " ORDER BY created_at, id", params)
+
+    def close(self):
+        """Close database connection."""
+        if self.conn:
+            self.conn.close()
+            self.conn = None
+
+
+def get_scrape_job_queue() -> ScrapeJobQueue:
+    """Get ScrapeJobQueue instance."""
+    return ScrapeJobQueue()
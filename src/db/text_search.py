@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Text normalization for the posts full-text index.
+Diacritic folding (ą->a, ł->l, ё->е) and light PL/RU suffix stemming.
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+from typing import List, Tuple
+
+# Letters that NFKD does not decompose
+_EXTRA_FOLD = str.maketrans({
+    'ł': 'l', 'đ': 'd', 'ø': 'o', 'ß': 'ss', 'æ': 'ae', 'œ': 'oe'
+})
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+_COMBINING_RE = re.compile(r'[\u0300-\u036f]')
+# й is a letter of its own, not и with a diacritic - recomposed before marks are stripped
+_SHORT_I_RE = re.compile('\u0438\u0306')
+_PHRASE_RE = re.compile(r'"([^"]+)"')
+
+# Inflectional endings, longest first (folded like the tokens they are matched against)
+_SUFFIXES = [
+    # Polish
+    'owie', 'ami', 'ach', 'ego', 'emu', 'owi', 'ych', 'ymi', 'ich', 'imi',
+    'iem', 'om', 'ow', 'em', 'ie', 'ia', 'ii', 'a', 'e', 'i', 'o', 'u', 'y',
+    # Russian
+    'ами', 'ями', 'ого', 'его', 'ому', 'ему', 'ыми', 'ими', 'ых', 'их', 'ой',
+    'ей', 'ов', 'ев', 'ам', 'ям', 'ах', 'ях', 'ом', 'ем', 'ий', 'ый', 'ая',
+    'яя', 'ое', 'ее', 'ые', 'ие', 'ым', 'им', 'ую', 'юю',
+    'а', 'я', 'о', 'е', 'ы', 'и', 'у', 'ю', 'ь',
+]
+
+# Shortest stem left after stripping: 3 keeps common adjectives together
+# (новый / новая / нового -> нов, nowy / nowego -> now)
+MIN_STEM = 3
+
+# Bump when fold() / stem() change: posts_db rebuilds the index built by another version
+TOKENIZER_VERSION = 2
+
+
+def fold(text: str) -> str:
+    """Lowercase and strip diacritics."""
+    text = text.lower()
+    if text.isascii():
+        return text
+    decomposed = unicodedata.normalize('NFKD', text.translate(_EXTRA_FOLD))
+    return _COMBINING_RE.sub('', _SHORT_I_RE.sub('\u0439', decomposed))
+
+
+_SUFFIXES = sorted({fold(suffix) for suffix in _SUFFIXES}, key=len, reverse=True)
+
+
+def stem(token: str) -> str:
+    """Strip one inflectional suffix, keeping at least MIN_STEM characters."""
+    for suffix in _SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= MIN_STEM:
+            return token[:-len(suffix)]
+    return token
+
+
+@lru_cache(maxsize=200000)
+def normalize_term(word: str) -> str:
+    """Folded, stemmed form of a single lowercase word (cached per vocabulary entry)."""
+    return stem(fold(word))
+
+
+def tokenize(text: str) -> List[str]:
+    """Normalized, stemmed tokens of text (in order)."""
+    if not text:
+        return []
+    return [normalize_term(w) for w in _TOKEN_RE.findall(text.lower())]
+
+
+def parse_query(query: str) -> Tuple[List[str], List[List[str]]]:
+    """
+    Split a search query into required terms and phrases.
+    "quoted text" is a phrase; every term (including phrase words) must match.
+    """
+    phrases = [tokenize(p) for p in _PHRASE_RE.findall(query)]
+    phrases = [p for p in phrases if len(p) > 1]
+    terms = list(dict.fromkeys(tokenize(query)))
+    return terms, phrases
+
+
+def contains_phrase(tokens: List[str], phrase: List[str]) -> bool:
+    """Check whether phrase occurs as a contiguous token sequence."""
+    n = len(phrase)
+    return any(tokens[i:i + n] == phrase for i in range(len(tokens) - n + 1))
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Graph export - Neo4j graph read page by page into a compact columnar snapshot.
+
+Nodes (label :Node) and their outgoing relationships are paged with keyset
+pagination on n.id (uses the node_id uniqueness index), optionally split into
+id ranges read by parallel sessions. No single query holds the whole graph.
+
+Snapshot (JSON-serializable):
+    {'meta': {...},
+     'nodes': {'id': [...], 'name': [...], 'group': [group index], 'properties': [...]},
+     'links': {'source': [...], 'target': [...], 'type': [type index], 'properties': [...]},
+     'groups': [...], 'types': [...]}
+
+snapshot_records() turns it into the {'nodes': [...], 'links': [...]} shape
+used by the UIs and apply_json_to_neo4j.py.
+"""
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+# Shared label on every node with an `id` (node_id uniqueness constraint, see
+# scripts/migrate_node_label.py). Defined here only; loaders, UIs and scripts import it.
+BASE_LABEL = 'Node'
+PAGE_SIZE = 5000
+SNAPSHOT_FORMAT = 'russint-graph-columnar'
+SNAPSHOT_VERSION = 1
+
+NODES_PAGE_QUERY = f"""
+MATCH (n:{BASE_LABEL})
+WHERE n.id > $after AND ($until IS NULL OR n.id <= $until)
+WITH n ORDER BY n.id LIMIT $limit
+RETURN n.id AS id, labels(n) AS labels, properties(n) AS props
+"""
+
+# Outgoing relationships of one page of source nodes (keyset on the source id)
+EDGES_PAGE_QUERY = f"""
+MATCH (s:{BASE_LABEL})
+WHERE s.id > $after AND ($until IS NULL OR s.id <= $until)
+WITH s ORDER BY s.id LIMIT $limit
+OPTIONAL MATCH (s)-[r]->(t:{BASE_LABEL})
+RETURN s.id AS source_id, t.id AS target_id, type(r) AS type, properties(r) AS props
+"""
+
+NODES_BY_ID_QUERY = f"""
+MATCH (n:{BASE_LABEL}) WHERE n.id IN $ids
+RETURN n.id AS id, labels(n) AS labels, properties(n) AS props
+"""
+
+# Nodes without any relationship - never reached by paging relationships
+ISOLATED_NODES_QUERY = f"""
+MATCH (n:{BASE_LABEL}) WHERE NOT (n)--()
+WITH n ORDER BY n.id LIMIT $limit
+RETURN n.id AS id, labels(n) AS labels, properties(n) AS props
+"""
+
+# n-th id in index order, used as a partition boundary
+NTH_ID_QUERY = f"""
+MATCH (n:{BASE_LABEL}) WHERE n.id IS NOT NULL
+WITH n.id AS id ORDER BY id SKIP $skip LIMIT 1
+RETURN id
+"""
+
+
+def node_group(labels: List[str]) -> str:
+    """Type label of a node (the shared BASE_LABEL is skipped)."""
+    return next((l for l in labels if l != BASE_LABEL), 'Unknown')
+
+
+def _pages(session, query: str, key: str, page_size: int,
+           after: str = '', until: Optional[str] = None) -> Iterator:
+    """Records of consecutive keyset pages in the id range (after, until]."""
+    while True:
+        records = list(session.run(query, after=after, until=until, limit=page_size))
+        if not records:
+            return
+        yield from records
+        after = max(record[key] for record in records)
+
+
+def partition_bounds(driver, parts: int) -> List[tuple]:
+    """Split the id space into `parts` ranges of roughly equal node counts."""
+    if parts <= 1:
+        return [('', None)]
+    with driver.session() as session:
+        total = session.run(f"MATCH (n:{BASE_LABEL}) RETURN count(n) AS count").single()['count']
+        cuts = []
+        for i in range(1, parts):
+            record = session.run(NTH_ID_QUERY, skip=total * i // parts).single()
+            if record and (not cuts or record['id'] > cuts[-1]):
+                cuts.append(record['id'])
+    # Ranges (after, until]: each cut id closes its range, the next one starts after it
+    starts = [''] + cuts
+    ends = cuts + [None]
+    return [(start, end) for start, end in zip(starts, ends)]
+
+
+def _read_range(driver, query: str, key: str, page_size: int, after: str, until: Optional[str]) -> List:
+    with driver.session() as session:
+        return [record.data() for record in _pages(session, query, key, page_size, after, until)]
+
+
+def _read_partitioned(driver, query: str, key: str, page_size: int, workers: int) -> Iterator[Dict]:
+    """Read all pages of query, one session per id range when workers > 1."""
+    bounds = partition_bounds(driver, workers)
+    if len(bounds) == 1:
+        with driver.session() as session:
+            for record in _pages(session, query, key, page_size):
+                yield record.data()
+        return
+
+    def read(bound):
+        return _read_range(driver, query, key, page_size, *bound)
+
+    with ThreadPoolExecutor(max_workers=len(bounds)) as pool:
+        for records in pool.map(read, bounds):
+            yield from records
+
+
+class SnapshotBuilder:
+    """Accumulates nodes and links into columnar lists with dictionary-encoded groups/types."""
+
+    def __init__(self):
+        self.nodes = {'id': [], 'name': [], 'group': [], 'properties': []}
+        self.links = {'source': [], 'target': [], 'type': [], 'properties': []}
+        self.groups: List[str] = []
+        self.types: List[str] = []
+        self._group_index: Dict[str, int] = {}
+        self._type_index: Dict[str, int] = {}
+        self.node_ids = set()
+
+    @staticmethod
+    def _encode(value: str, values: List[str], index: Dict[str, int]) -> int:
+        if value not in index:
+            index[value] = len(values)
+            values.append(value)
+        return index[value]
+
+    def add_node(self, node_id: str, labels: List[str], props: Dict):
+        if node_id in self.node_ids:
+            return
+        self.node_ids.add(node_id)
+        self.nodes['id'].append(node_id)
+        self.nodes['name'].append(props.get('name') or props.get('title') or node_id)
+        self.nodes['group'].append(self._encode(node_group(labels), self.groups, self._group_index))
+        self.nodes['properties'].append(props)
+
+    def add_link(self, source_id: str, target_id: str, rel_type: str, props: Dict):
+        self.links['source'].append(source_id)
+        self.links['target'].append(target_id)
+        self.links['type'].append(self._encode(rel_type, self.types, self._type_index))
+        self.links['properties'].append(props)
+
+    def snapshot(self, **meta) -> Dict:
+        return {
+            'meta': {
+                'format': SNAPSHOT_FORMAT,
+                'version': SNAPSHOT_VERSION,
+                'exported_at': datetime.utcnow().isoformat() + 'Z',
+                'nodes': len(self.nodes['id']),
+                'links': len(self.links['source']),
+                **meta
+            },
+            'nodes': self.nodes,
+            'links': self.links,
+            'groups': self.groups,
+            'types': self.types
+        }
+
+
+def fetch_snapshot(driver, limit: Optional[int] = None, page_size: int = PAGE_SIZE,
+                   workers: int = 1) -> Dict:
+    """
+    Read the graph into a columnar snapshot.
+
+    limit=None exports every node and relationship (workers > 1 reads id ranges
+    in parallel sessions). With a limit, relationships are paged until `limit`
+    and only their endpoint nodes are fetched (for quick UI previews), plus up
+    to `limit` isolated nodes, which no relationship would bring in.
+    """
+    builder = SnapshotBuilder()
+
+    if limit is None:
+        for record in _read_partitioned(driver, NODES_PAGE_QUERY, 'id', page_size, workers):
+            builder.add_node(record['id'], record['labels'], record['props'])
+        for record in _read_partitioned(driver, EDGES_PAGE_QUERY, 'source_id', page_size, workers):
+            if record['type'] is not None:
+                builder.add_link(record['source_id'], record['target_id'], record['type'], record['props'])
+        return builder.snapshot(limit=None)
+
+    endpoint_ids = {}
+    with driver.session() as session:
+        for record in _pages(session, EDGES_PAGE_QUERY, 'source_id', min(page_size, max(limit, 1))):
+            if len(builder.links['source']) >= limit:
+                break
+            if record['type'] is None:
+                continue
+            builder.add_link(record['source_id'], record['target_id'], record['type'], record['props'])
+            endpoint_ids[record['source_id']] = None
+            endpoint_ids[record['target_id']] = None
+
+        ids = list(endpoint_ids)
+        for start in range(0, len(ids), page_size):
+            for record in session.run(NODES_BY_ID_QUERY, ids=ids[start:start + page_size]):
+                builder.add_node(record['id'], record['labels'], record['props'])
+        for record in session.run(ISOLATED_NODES_QUERY, limit=limit):
+            builder.add_node(record['id'], record['labels'], record['props'])
+    return builder.snapshot(limit=limit)
+
+
+def snapshot_records(snapshot: Dict) -> Dict[str, List[Dict]]:
+    """Columnar snapshot -> {'nodes': [{id, name, group, properties}], 'links': [{source, target, type, properties}]}."""
+    nodes_cols = snapshot['nodes']
+    links_cols = snapshot['links']
+    groups = snapshot['groups']
+    types = snapshot['types']
+    nodes = [
+        {'id': node_id, 'name': name, 'group': groups[group], 'properties': props}
+        for node_id, name, group, props in zip(
+            nodes_cols['id'], nodes_cols['name'], nodes_cols['group'], nodes_cols['properties'])
+    ]
+    links = [
+        {'source': source, 'target': target, 'type': types[rel_type], 'properties': props}
+        for source, target, rel_type, props in zip(
+            links_cols['source'], links_cols['target'], links_cols['type'], links_cols['properties'])
+    ]
+    return {'nodes': nodes, 'links': links}
+
+
+def fetch_graph(driver, limit: Optional[int] = None, page_size: int = PAGE_SIZE,
+                workers: int = 1) -> Dict[str, List[Dict]]:
+    """fetch_snapshot() in the record shape used by the UIs."""
+    return snapshot_records(fetch_snapshot(driver, limit=limit, page_size=page_size, workers=workers))
+
+
+def write_snapshot(snapshot: Dict, path: Path):
+    """Write a snapshot as compact JSON (Neo4j temporal values as ISO strings)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(snapshot, f, ensure_ascii=False, separators=(',', ':'),
+                  default=lambda v: v.isoformat() if hasattr(v, 'isoformat') else str(v))
+
+
+def load_records(path: Path) -> Dict[str, List[Dict]]:
+    """Read an export file (columnar snapshot or older record-style JSON) as records."""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if data.get('meta', {}).get('format') == SNAPSHOT_FORMAT:
+        return snapshot_records(data)
+    return {'nodes': data.get('nodes', []), 'links': data.get('links', [])}
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+JSON graph store - in-memory view of data/raw/graph_nodes.json and graph_edges.json.
+
+The files are parsed once per process and indexed (id -> node, id -> edge,
+node -> outgoing / incoming edge ids), so node and neighbour lookups do not
+re-read or scan the JSON. When a file's mtime changes (edited by another tool)
+the store reloads it on the next access.
+
+Mutations are appended to a JSON Lines journal (one absolute operation per line)
+instead of rewriting both files; compact() writes the files and truncates the
+journal. Compaction runs after COMPACT_EVERY operations, COMPACT_DELAY seconds
+after the first pending one, and at exit. Pending journal entries are replayed on
+load, so a crash before compaction loses nothing.
+
+Updates and deletes take an optional if_match (json_etag of the node/edge as last
+read) and raise db.file_store.VersionConflict when it no longer matches.
+"""
+
+import atexit
+import copy
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from db.file_store import atomic_write_json, check_etag, json_etag
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+GRAPH_NODES_FILE = PROJECT_ROOT / "data" / "raw" / "graph_nodes.json"
+GRAPH_EDGES_FILE = PROJECT_ROOT / "data" / "raw" / "graph_edges.json"
+GRAPH_JOURNAL_FILE = PROJECT_ROOT / "data" / "processed" / "graph_journal.jsonl"
+
+COMPACT_EVERY = 200
+COMPACT_DELAY = 5.0
+
+
+def edge_key(edge: Dict) -> str:
+    """Edge id (source/type/target for edges without one)."""
+    return edge.get('id') or json.dumps(
+        [edge.get('source_id'), edge.get('relationship_type'), edge.get('target_id')])
+
+
+def _mtime(path: Path) -> Optional[int]:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def _read_list(path: Path) -> List[Dict]:
+    if not path.exists():
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class JsonGraphStore:
+    """Indexed, journaled graph nodes/edges backed by the JSON files."""
+
+    def __init__(self, nodes_file: Path = GRAPH_NODES_FILE, edges_file: Path = GRAPH_EDGES_FILE,
+                 journal_file: Path = GRAPH_JOURNAL_FILE, compact_every: int = COMPACT_EVERY,
+                 compact_delay: float = COMPACT_DELAY):
+        self.nodes_file = Path(nodes_file)
+        self.edges_file = Path(edges_file)
+        self.journal_file = Path(journal_file)
+        self.compact_every = compact_every
+        self.compact_delay = compact_delay
+        self._lock = threading.RLock()
+        self._nodes: Dict[str, Dict] = {}
+        self._edges: Dict[str, Dict] = {}
+        self._out: Dict[str, Dict[str, None]] = {}  # node id -> ordered set of edge keys
+        self._in: Dict[str, Dict[str, None]] = {}
+        self._mtimes = (None, None)
+        self._loaded = False
+        self._pending = 0
+        self._timer = None
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def _load(self):
+        self._nodes = {}
+        self._edges = {}
+        self._out = {}
+        self._in = {}
+        for node in _read_list(self.nodes_file):
+            self._nodes[node.get('id')] = node
+        for edge in _read_list(self.edges_file):
+            self._put_edge(edge)
+        self._mtimes = (_mtime(self.nodes_file), _mtime(self.edges_file))
+
+        self._pending = 0
+        if self.journal_file.exists():
+            with open(self.journal_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Truncated last line after an interrupted append
+                        continue
+                    self._apply(entry)
+                    self._pending += 1
+        self._loaded = True
+
+    def _fresh(self):
+        """Load on first use and whenever a file was changed outside the store."""
+        if not self._loaded or (_mtime(self.nodes_file), _mtime(self.edges_file)) != self._mtimes:
+            self._load()
+
+    # ------------------------------------------------------------------
+    # Index maintenance (callers hold the lock)
+    # ------------------------------------------------------------------
+
+    def _put_edge(self, edge: Dict):
+        key = edge_key(edge)
+        self._drop_edge(key)
+        self._edges[key] = edge
+        self._out.setdefault(edge.get('source_id'), {})[key] = None
+        self._in.setdefault(edge.get('target_id'), {})[key] = None
+
+    def _drop_edge(self, key: str) -> Optional[Dict]:
+        edge = self._edges.pop(key, None)
+        if edge is not None:
+            self._out.get(edge.get('source_id'), {}).pop(key, None)
+            self._in.get(edge.get('target_id'), {}).pop(key, None)
+        return edge
+
+    def _edge_keys(self, node_id: str) -> List[str]:
+        keys = dict(self._out.get(node_id, {}))
+        keys.update(self._in.get(node_id, {}))
+        return list(keys)
+
+    def _apply(self, entry: Dict):
+        """Apply one journal operation (also used for replay, so operations are absolute)."""
+        op = entry['op']
+        if op == 'put_node':
+            self._nodes[entry['node']['id']] = entry['node']
+        elif op == 'delete_node':
+            self._nodes.pop(entry['id'], None)
+            for key in self._edge_keys(entry['id']):
+                self._drop_edge(key)
+        elif op == 'put_edge':
+            self._put_edge(entry['edge'])
+        elif op == 'delete_edge':
+            self._drop_edge(entry['key'])
+
+    def _commit(self, entry: Dict):
+        """Apply an operation and append it to the journal."""
+        self._apply(entry)
+        self.journal_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.journal_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self._pending += 1
+        if self._pending >= self.compact_every:
+            self.compact()
+        elif self._timer is None:
+            self._timer = threading.Timer(self.compact_delay, self.compact)
+            self._timer.daemon = True
+            self._timer.start()
+
+    # ------------------------------------------------------------------
+    # Reads (copies, so callers can decorate results freely)
+    # ------------------------------------------------------------------
+
+    def nodes(self) -> List[Dict]:
+        with self._lock:
+            self._fresh()
+            return [dict(node) for node in self._nodes.values()]
+
+    def edges(self) -> List[Dict]:
+        with self._lock:
+            self._fresh()
+            return [dict(edge) for edge in self._edges.values()]
+
+    def get_node(self, node_id: str) -> Optional[Dict]:
+        with self._lock:
+            self._fresh()
+            node = self._nodes.get(node_id)
+            return dict(node) if node is not None else None
+
+    def has_node(self, node_id: str) -> bool:
+        with self._lock:
+            self._fresh()
+            return node_id in self._nodes
+
+    def get_edge(self, edge_id: str) -> Optional[Dict]:
+        with self._lock:
+            self._fresh()
+            edge = self._edges.get(edge_id)
+            return dict(edge) if edge is not None else None
+
+    def node_edges(self, node_id: str) -> List[Dict]:
+        """Outgoing and incoming edges of a node."""
+        with self._lock:
+            self._fresh()
+            return [dict(self._edges[key]) for key in self._edge_keys(node_id)]
+
+    # ------------------------------------------------------------------
+    # Mutations
+    # ------------------------------------------------------------------
+
+    def add_node(self, node: Dict) -> Dict:
+        """Insert or replace a node (by id)."""
+        with self._lock:
+            self._fresh()
+            node = copy.deepcopy(node)
+            self._commit({'op': 'put_node', 'node': node})
+            return dict(node)
+
+    def update_node(self, node_id: str, fields: Dict, if_match: Optional[str] = None) -> Optional[Dict]:
+        """Set fields on a node; None if it does not exist."""
+        with self._lock:
+            self._fresh()
+            if node_id not in self._nodes:
+                return None
+            check_etag(json_etag(self._nodes[node_id]), if_match)
+            fields = {k: v for k, v in copy.deepcopy(fields).items() if k != 'id'}
+            node = {**self._nodes[node_id], **fields}
+            self._commit({'op': 'put_node', 'node': node})
+            return dict(node)
+
+    def delete_node(self, node_id: str, if_match: Optional[str] = None) -> Tuple[Optional[Dict], int]:
+        """Delete a node and its edges; returns (node, edges_removed)."""
+        with self._lock:
+            self._fresh()
+            node = self._nodes.get(node_id)
+            if node is None:
+                return None, 0
+            check_etag(json_etag(node), if_match)
+            edges_removed = len(self._edge_keys(node_id))
+            self._commit({'op': 'delete_node', 'id': node_id})
+            return dict(node), edges_removed
+
+    def add_edge(self, edge: Dict) -> Dict:
+        """Insert or replace an edge (by id)."""
+        with self._lock:
+            self._fresh()
+            edge = copy.deepcopy(edge)
+            self._commit({'op': 'put_edge', 'edge': edge})
+            return dict(edge)
+
+    def update_edge(self, edge_id: str, fields: Dict, if_match: Optional[str] = None) -> Optional[Dict]:
+        """Set fields on an edge; None if it does not exist."""
+        with self._lock:
+            self._fresh()
+            if edge_id not in self._edges:
+                return None
+            check_etag(json_etag(self._edges[edge_id]), if_match)
+            fields = {k: v for k, v in copy.deepcopy(fields).items() if k != 'id'}
+            edge = {**self._edges[edge_id], **fields}
+            if edge_key(edge) != edge_id:
+                # Edge without id is keyed by its endpoints, which the update changed
+                self._commit({'op': 'delete_edge', 'key': edge_id})
+            self._commit({'op': 'put_edge', 'edge': edge})
+            return dict(edge)
+
+    def delete_edge(self, edge_id: str, if_match: Optional[str] = None) -> Optional[Dict]:
+        with self._lock:
+            self._fresh()
+            edge = self._edges.get(edge_id)
+            if edge is None:
+                return None
+            check_etag(json_etag(edge), if_match)
+            self._commit({'op': 'delete_edge', 'key': edge_id})
+            return dict(edge)
+
+    # ------------------------------------------------------------------
+    # Compaction
+    # ------------------------------------------------------------------
+
+    def compact(self):
+        """Write pending journal operations to the JSON files and truncate the journal."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._loaded or not self._pending:
+                return
+            # Pick up outside edits first; the journal is replayed on top of them
+            self._fresh()
+            # Temp file + fsync + rename: other readers never see a half-written file
+            atomic_write_json(self.nodes_file, list(self._nodes.values()))
+            atomic_write_json(self.edges_file, list(self._edges.values()))
+            self._mtimes = (_mtime(self.nodes_file), _mtime(self.edges_file))
+            with open(self.journal_file, 'w', encoding='utf-8'):
+                pass
+            self._pending = 0
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_graph_store() -> JsonGraphStore:
+    """Process-wide JsonGraphStore for the default graph files (compacted at exit)."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = JsonGraphStore()
+            atexit.register(_store.compact)
+        return _store
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Graph neighbourhood - bounded breadth-first expansion around one node in Neo4j.
+
+Used by the visualizers to load the graph lazily: start from a node and expand
+its neighbours on click instead of shipping the whole graph to the browser.
+Each BFS level is one query for the whole frontier; fan-out per node is capped
+(max_degree), the result is capped (max_nodes) and nodes are deduplicated, so
+the payload stays small regardless of graph size. Every node carries its total
+`degree`, so the UI can tell whether it has more neighbours to expand.
+"""
+
+from typing import Dict, List, Optional
+
+from graph.graph_export import BASE_LABEL, node_group
+
+MAX_DEPTH = 4
+DEFAULT_MAX_NODES = 200
+MAX_NODES_LIMIT = 2000
+DEFAULT_MAX_DEGREE = 50
+
+ROOT_QUERY = f"""
+MATCH (n:{BASE_LABEL} {{id: $id}})
+RETURN n.id AS id, labels(n) AS labels, properties(n) AS props, COUNT {{ (n)--() }} AS degree
+"""
+
+# One BFS level: up to $max_degree matching relationships of every frontier node
+EXPAND_QUERY = f"""
+UNWIND $ids AS node_id
+MATCH (n:{BASE_LABEL} {{id: node_id}})
+CALL {{
+    WITH n
+    MATCH (n)-[r]-(m:{BASE_LABEL})
+    WHERE ($labels IS NULL OR any(l IN labels(m) WHERE l IN $labels))
+      AND ($rel_types IS NULL OR type(r) IN $rel_types)
+    RETURN r, m
+    LIMIT $max_degree
+}}
+RETURN n.id AS from_id, startNode(r).id AS source, endNode(r).id AS target,
+       type(r) AS type, properties(r) AS rel_props, m.id AS id, labels(m) AS labels, properties(m) AS props, COUNT {{ (m)--() }} AS degree
+"""
+
+
+def _node(row: Dict, depth: int) -> Dict:
+    props = row['props']
+    return {
+        'id': row['id'],
+        'name': props.get('name') or props.get('title') or row['id'],
+        'group': node_group(row['labels']),
+        'properties': props,
+        'degree': row['degree'],
+        'depth': depth
+    }
+
+
+def fetch_neighbourhood(client, node_id: str, depth: int = 1, max_nodes: int = DEFAULT_MAX_NODES,
+                        max_degree: int = DEFAULT_MAX_DEGREE, labels: Optional[List[str]] = None,
+                        rel_types: Optional[List[str]] = None) -> Optional[Dict]:
+    """
+    Nodes within `depth` hops of node_id (graph.neo4j_client client) in the record
+    shape of graph_export.fetch_graph, plus 'root' and 'truncated'. labels / rel_types
+    restrict which neighbours and relationships are followed. None if the node is missing.
+    """
+    depth = max(1, min(depth, MAX_DEPTH))
+    max_nodes = max(1, min(max_nodes, MAX_NODES_LIMIT))
+    max_degree = max(1, max_degree)
+
+    root = client.read_one(ROOT_QUERY, id=node_id)
+    if root is None:
+        return None
+
+    nodes = {node_id: _node(root, 0)}
+    links = {}
+    truncated = False
+    frontier = [node_id]
+
+    for level in range(1, depth + 1):
+        if not frontier:
+            break
+        rows = client.read(EXPAND_QUERY, ids=frontier, labels=labels or None,
+                           rel_types=rel_types or None, max_degree=max_degree)
+        expanded = {}
+        next_frontier = []
+        for row in rows:
+            expanded[row['from_id']] = expanded.get(row['from_id'], 0) + 1
+            if row['id'] not in nodes:
+                if len(nodes) >= max_nodes:
+                    truncated = True
+                    continue
+                nodes[row['id']] = _node(row, level)
+                next_frontier.append(row['id'])
+            key = (row['source'], row['type'], row['target'])
+            if key not in links:
+                links[key] = {
+                    'source': row['source'],
+                    'target': row['target'],
+                    'type': row['type'],
+                    'properties': row['rel_props']
+                }
+        if any(count >= max_degree for count in expanded.values()):
+            truncated = True
+        frontier = next_frontier
+
+    return {
+        'root': node_id,
+        'nodes': list(nodes.values()),
+        'links': list(links.values()),
+        'truncated': truncated
+    }
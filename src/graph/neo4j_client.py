@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Neo4j client - one pooled driver per process, shared by all UIs and scripts.
+
+The driver is created once (get_client) and reused, so requests do not pay a
+new TLS handshake to Aura each time. read()/write() run managed transactions
+(execute_read / execute_write): transient errors are retried by the driver, and
+with a routing URI (neo4j://, neo4j+s://) reads go to read replicas / followers.
+Every query is timed; stats() returns per-query counts, rows and latency.
+"""
+
+import atexit
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from neo4j import GraphDatabase
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv(Path(__file__).resolve().parent.parent.parent / ".env")
+except ImportError:
+    pass
+
+# Pool tuning (overridable via environment)
+MAX_POOL_SIZE = int(os.getenv("NEO4J_MAX_POOL_SIZE", "50"))
+ACQUISITION_TIMEOUT = float(os.getenv("NEO4J_ACQUISITION_TIMEOUT", "30"))
+MAX_CONNECTION_LIFETIME = float(os.getenv("NEO4J_MAX_CONNECTION_LIFETIME", "1800"))
+# Idle connections older than this are pinged before reuse (Aura drops idle sockets)
+LIVENESS_CHECK_TIMEOUT = float(os.getenv("NEO4J_LIVENESS_CHECK_TIMEOUT", "60"))
+MAX_RETRY_TIME = float(os.getenv("NEO4J_MAX_RETRY_TIME", "15"))
+
+# Queries slower than this are printed
+SLOW_QUERY_MS = float(os.getenv("NEO4J_SLOW_QUERY_MS", "1000"))
+
+
+def _query_name(query: str) -> str:
+    """Short, stable key for a query in stats (whitespace collapsed, first 80 chars)."""
+    return ' '.join(query.split())[:80]
+
+
+class Neo4jClient:
+    """Pooled driver with instrumented read/write helpers."""
+
+    def __init__(self, uri: str, user: str, password: str, database: Optional[str] = None):
+        self.uri = uri
+        self.database = database
+        self.driver = GraphDatabase.driver(
+            uri,
+            auth=(user, password),
+            max_connection_pool_size=MAX_POOL_SIZE,
+            connection_acquisition_timeout=ACQUISITION_TIMEOUT,
+            max_connection_lifetime=MAX_CONNECTION_LIFETIME,
+            liveness_check_timeout=LIVENESS_CHECK_TIMEOUT,
+            max_transaction_retry_time=MAX_RETRY_TIME,
+        )
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._stats_lock = threading.Lock()
+
+    def session(self, **kwargs):
+        """Session on the shared pool (for code that manages its own transactions)."""
+        if self.database:
+            kwargs.setdefault('database', self.database)
+        return self.driver.session(**kwargs)
+
+    def _record(self, query: str, elapsed_ms: float, rows: int):
+        name = _query_name(query)
+        with self._stats_lock:
+            entry = self._stats.setdefault(name, {'count': 0, 'rows': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+            entry['count'] += 1
+            entry['rows'] += rows
+            entry['total_ms'] += elapsed_ms
+            entry['max_ms'] = max(entry['max_ms'], elapsed_ms)
+        if elapsed_ms >= SLOW_QUERY_MS:
+            print(f"🐢 Neo4j {elapsed_ms:.0f} ms, {rows} rows: {name}")
+
+    def _run(self, execute: Callable, query: str, params: Dict[str, Any]) -> List[Dict]:
+        def work(tx):
+            return [record.data() for record in tx.run(query, **params)]
+
+        start = time.perf_counter()
+        with self.session() as session:
+            rows = execute(session, work)
+        self._record(query, (time.perf_counter() - start) * 1000, len(rows))
+        return rows
+
+    def read(self, query: str, **params) -> List[Dict]:
+        """Run a read query (retried, routed to readers); returns rows as dicts."""
+        return self._run(lambda session, work: session.execute_read(work), query, params)
+
+    def write(self, query: str, **params) -> List[Dict]:
+        """Run a write query (retried on transient errors); returns rows as dicts."""
+        return self._run(lambda session, work: session.execute_write(work), query, params)
+
+    def read_one(self, query: str, **params) -> Optional[Dict]:
+        """First row of a read query (None if empty)."""
+        rows = self.read(query, **params)
+        return rows[0] if rows else None
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-query counters: count, rows, total_ms, max_ms, avg_ms."""
+        with self._stats_lock:
+            return {
+                name: {**entry, 'avg_ms': entry['total_ms'] / entry['count']}
+                for name, entry in self._stats.items()
+            }
+
+    def close(self):
+        self.driver.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client(uri: Optional[str] = None, user: Optional[str] = None,
+               password: Optional[str] = None) -> Neo4jClient:
+    """
+    Process-wide Neo4jClient. Credentials come from the arguments (first call only)
+    or NEO4J_URI / NEO4J_USER / NEO4J_PASSWORD; raises RuntimeError if missing.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                uri = uri or os.getenv("NEO4J_URI")
+                user = user or os.getenv("NEO4J_USER")
+                password = password or os.getenv("NEO4J_PASSWORD")
+                if not uri or not user or not password:
+                    raise RuntimeError("Missing Neo4j credentials (NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD)")
+                _client = Neo4jClient(uri, user, password, database=os.getenv("NEO4J_DATABASE") or None)
+                atexit.register(_client.close)
+    return _client
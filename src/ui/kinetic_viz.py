@@ -1,6 +1,5 @@
 import streamlit as st
 import os
-from neo4j import GraphDatabase
 import json
 import streamlit.components.v1 as components
 from dotenv import load_dotenv
@@ -8,6 +7,12 @@ import threading
 import http.server
 import socketserver
 from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from graph.graph_export import fetch_graph
+from graph.neo4j_client import get_client
 
 # Load environment variables
 load_dotenv()
@@ -81,14 +86,12 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Neo4j Connection
+# Neo4j Connection (shared pooled client)
 def get_driver():
-    uri = os.getenv("NEO4J_URI")
-    user = os.getenv("NEO4J_USER")
-    password = os.getenv("NEO4J_PASSWORD")
-    if not uri or not user or not password:
+    try:
+        return get_client().driver
+    except RuntimeError:
         return None
-    return GraphDatabase.driver(uri, auth=(user, password))
 
 class Neo4jEncoder(json.JSONEncoder):
     def default(self, obj):
@@ -96,71 +99,29 @@ class Neo4jEncoder(json.JSONEncoder):
             return obj.isoformat()
         return super().default(obj)
 
+def screenshot_url(raw_path):
+    # Zakładamy, że w bazie ścieżka jest np. "data/evidence/..." lub "evidence/..."
+    # Serwer HTTP serwuje zawartość folderu "data", więc URL to http://localhost:8000/evidence/...
+    # Usuń 'data/' z początku jeśli jest, bo root serwera to data/
+    if raw_path.startswith('data/'):
+        return f"http://localhost:{PORT}/{raw_path[5:]}"
+    elif raw_path.startswith('data\\'):
+        return f"http://localhost:{PORT}/{raw_path[5:].replace(os.sep, '/')}"
+    return f"http://localhost:{PORT}/{raw_path}"
+
 def get_graph_data(limit=100):
     driver = get_driver()
     if not driver:
         return None
     
-    query = """
-    MATCH (n)-[r]->(m)
-    RETURN n, r, m
-    LIMIT $limit
-    """
-    
-    nodes = {}
-    links = []
+    data = fetch_graph(driver, limit=limit)
     
-    with driver.session() as session:
-        result = session.run(query, limit=limit)
-        for record in result:
-            n = record["n"]
-            m = record["m"]
-            r = record["r"]
-            
-            # Helper to process node
-            def process_node(node_obj):
-                n_id = node_obj.element_id if hasattr(node_obj, 'element_id') else str(node_obj.id)
-                if 'id' in node_obj:
-                    n_id = node_obj['id']
-                
-                props = dict(node_obj)
-                
-                # Fix screenshot path if exists
-                # Zakładamy, że w bazie ścieżka jest np. "data/evidence/..." lub "evidence/..."
-                # Serwer HTTP serwuje zawartość folderu "data", więc URL to http://localhost:8000/evidence/...
-                if 'screenshot' in props:
-                    raw_path = props['screenshot']
-                    # Usuń 'data/' z początku jeśli jest, bo root serwera to data/
-                    if raw_path.startswith('data/'):
-                        props['screenshot_url'] = f"http://localhost:{PORT}/{raw_path[5:]}"
-                    elif raw_path.startswith('data\\'):
-                        props['screenshot_url'] = f"http://localhost:{PORT}/{raw_path[5:].replace(os.sep, '/')}"
-                    else:
-                        props['screenshot_url'] = f"http://localhost:{PORT}/{raw_path}"
-                
-                return n_id, {
-                    "id": n_id,
-                    "name": node_obj.get("name", node_obj.get("title", "Unknown")),
-                    "group": list(node_obj.labels)[0] if node_obj.labels else "Unknown",
-                    "properties": props
-                }
-
-            src_id, src_node = process_node(n)
-            tgt_id, tgt_node = process_node(m)
-            
-            if src_id not in nodes: nodes[src_id] = src_node
-            if tgt_id not in nodes: nodes[tgt_id] = tgt_node
-            
-            # Process Relationship
-            links.append({
-                "source": src_id,
-                "target": tgt_id,
-                "type": r.type,
-                "properties": dict(r)
-            })
-            
-    driver.close()
-    return {"nodes": list(nodes.values()), "links": links}
+    # Fix screenshot path if exists
+    for node in data["nodes"]:
+        props = node["properties"]
+        if 'screenshot' in props:
+            props['screenshot_url'] = screenshot_url(props['screenshot'])
+    return data
 
 # Sidebar
 with st.sidebar:
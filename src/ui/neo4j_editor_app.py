@@ -4,11 +4,17 @@ Interfejs do zarządzania grafem w Neo4j z podglądem i CRUD.
 """
 
 import streamlit as st
-from neo4j import GraphDatabase
 import pandas as pd
 from datetime import datetime
 import uuid
 import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from graph.graph_export import BASE_LABEL
+from graph.neo4j_client import get_client
 
 # Załaduj zmienne z .env jeśli istnieje
 try:
@@ -37,22 +43,19 @@ if NEO4J_PASSWORD == "YOUR_PASSWORD_HERE":
     st.code("$env:NEO4J_PASSWORD='twoje_haslo'\nstreamlit run src/ui/neo4j_editor_app.py")
     st.stop()
 
-# Połączenie z Neo4j
-@st.cache_resource
-def get_neo4j_driver():
-    try:
-        return GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
-    except Exception as e:
-        st.error(f"Błąd połączenia z Neo4j: {e}")
-        st.stop()
-
-driver = get_neo4j_driver()
+# Połączenie z Neo4j (wspólna pula połączeń procesu)
+try:
+    client = get_client(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD)
+except Exception as e:
+    st.error(f"Błąd połączenia z Neo4j: {e}")
+    st.stop()
 
 # Helpers
 def run_query(query, **params):
-    with driver.session() as session:
-        result = session.run(query, **params)
-        return [record.data() for record in result]
+    return client.read(query, **params)
+
+def write_query(query, **params):
+    return client.write(query, **params)
 
 def generate_id(prefix):
     return f"{prefix}-{uuid.uuid4().hex[:8]}"
@@ -112,7 +115,7 @@ if page == "📍 Węzły":
                 label = label_map.get(new_type, 'Entity')
                 
                 query = f"""
-                CREATE (n:{label}:Entity {{
+                CREATE (n:{BASE_LABEL}:{label}:Entity {{
                     id: $id,
                     name: $name,
                     entity_type: $type,
@@ -123,7 +126,7 @@ if page == "📍 Węzły":
                 }})
                 RETURN n
                 """
-                run_query(query, 
+                write_query(query, 
                     id=new_id, 
                     name=new_name.strip(),
                     type=new_type,
@@ -158,7 +161,7 @@ if page == "📍 Węzły":
         del_id = st.selectbox("Wybierz węzeł", ["--"] + [n['id'] for n in nodes])
         if del_id != "--":
             if st.button("Usuń węzeł i powiązania"):
-                run_query("MATCH (n:Entity {id: $id}) DETACH DELETE n", id=del_id)
+                write_query(f"MATCH (n:{BASE_LABEL} {{id: $id}}) DETACH DELETE n", id=del_id)
                 st.warning("Usunięto węzeł")
                 st.rerun()
 
@@ -189,8 +192,8 @@ elif page == "🔗 Relacje":
                 st.error("Źródło i cel nie mogą być identyczne")
             else:
                 query = f"""
-                MATCH (a:Entity {{id: $src}})
-                MATCH (b:Entity {{id: $tgt}})
+                MATCH (a:{BASE_LABEL} {{id: $src}})
+                MATCH (b:{BASE_LABEL} {{id: $tgt}})
                 MERGE (a)-[r:{r_type}]->(b)
                 SET r.date = $date,
                     r.confidence = $conf,
@@ -199,7 +202,7 @@ elif page == "🔗 Relacje":
                     r.target_name = b.name
                 RETURN r
                 """
-                run_query(query, src=src, tgt=tgt, date=date_val.isoformat(), conf=confidence, evidence=evidence)
+                write_query(query, src=src, tgt=tgt, date=date_val.isoformat(), conf=confidence, evidence=evidence)
                 st.success("✅ Dodano relację")
                 st.rerun()
     
@@ -236,7 +239,7 @@ elif page == "🌐 Zapytania":
     
     if st.button("🚀 Wykonaj", type="primary"):
         try:
-            results = run_query(query)
+            results = write_query(query)  # dowolny Cypher, także zapisujący
             if results:
                 st.success(f"Zwrócono {len(results)} wyników")
                 st.json(results[:50])  # Max 50 dla czytelności
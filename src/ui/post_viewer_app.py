@@ -28,6 +28,10 @@ GRAPH_NODES_FILE = BASE_DIR / "data" / "raw" / "graph_nodes.json"
 GRAPH_EDGES_FILE = BASE_DIR / "data" / "raw" / "graph_edges.json"
 LOADER_SCRIPT = BASE_DIR / "scripts" / "load_to_neo4j.py"
 
+sys.path.insert(0, str(BASE_DIR / "src"))
+
+from db.evidence_catalog import get_evidence_catalog, relative_path, EVIDENCE_ROOT
+
 # Custom CSS
 st.markdown("""
 <style>
@@ -108,19 +112,29 @@ def load_posts_for_profile(profile_name):
     return posts
 
 
+@st.cache_resource
+def get_catalog():
+    """Katalog dowodów (tabela evidence w posts.duckdb)."""
+    return get_evidence_catalog()
+
+
+@st.cache_data(ttl=60)
+def get_evidence_paths():
+    """Zbiór ścieżek plików dowodowych z katalogu (przyrostowa synchronizacja co minutę)."""
+    catalog = get_catalog()
+    catalog.scan(EVIDENCE_ROOT)
+    return frozenset(catalog.list_paths())
+
+
 def get_screenshot_path(post, profile_name):
     """Pobiera ścieżkę do screenshotu dla posta."""
     screenshot = post.get('screenshot')
     if not screenshot:
         return None
     
-    # Jeśli screenshot zawiera pełną ścieżkę względną
-    if screenshot.startswith('data/'):
-        full_path = BASE_DIR / screenshot
-        if full_path.exists():
-            return full_path
+    known_paths = get_evidence_paths()
     
-    # Próbuj różnych lokalizacji (kompatybilność wsteczna)
+    # Próbuj różnych lokalizacji (kompatybilność wsteczna) - sprawdzane w katalogu, nie na dysku
     possible_paths = [
         EVIDENCE_DIR / profile_name / screenshot,
         EVIDENCE_DIR / profile_name / Path(screenshot).name,
@@ -128,9 +142,14 @@ def get_screenshot_path(post, profile_name):
         BASE_DIR / screenshot
     ]
     
+    # Jeśli screenshot zawiera pełną ścieżkę względną
+    if screenshot.startswith('data/'):
+        possible_paths.insert(0, BASE_DIR / screenshot)
+    
     for path in possible_paths:
-        if path.exists():
-            return path
+        rel = relative_path(path)
+        if rel in known_paths:
+            return BASE_DIR / rel
     
     return None
 
@@ -4,8 +4,13 @@ import os
 import json
 import re
 from pathlib import Path
-from neo4j import GraphDatabase
 from dotenv import load_dotenv
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from graph.graph_export import fetch_graph
+from graph.neo4j_client import get_client
 
 # --- CONFIGURATION ---
 st.set_page_config(layout="wide", page_title="RUSSINT Graph Explorer", initial_sidebar_state="collapsed")
@@ -69,7 +74,8 @@ def get_neo4j_driver():
         return None
         
     try:
-        return GraphDatabase.driver(uri, auth=(user, password))
+        # Shared pooled client - created on the first call, reused by later reruns
+        return get_client(uri, user, password).driver
     except Exception as e:
         st.error(f"Connection failed: {e}")
         return None
@@ -80,57 +86,11 @@ def get_graph_data():
     if not driver:
         return None
         
-    query = """
-    MATCH (n)-[r]->(m)
-    RETURN n, r, m
-    LIMIT 1000
-    """
-    
-    nodes = {}
-    links = []
-    
     try:
-        with driver.session() as session:
-            result = session.run(query)
-            for record in result:
-                n = record["n"]
-                m = record["m"]
-                r = record["r"]
-                
-                def process_node(node):
-                    nid = node.element_id if hasattr(node, 'element_id') else str(node.id)
-                    if 'id' in node: nid = node['id']
-                    props = dict(node)
-                    
-                    # Label/Group
-                    group = list(node.labels)[0] if node.labels else "Unknown"
-                    
-                    return nid, {
-                        "id": nid,
-                        "name": node.get("name", node.get("title", "Unknown")),
-                        "group": group,
-                        "properties": props
-                    }
-
-                src_id, src_node = process_node(n)
-                tgt_id, tgt_node = process_node(m)
-                
-                if src_id not in nodes: nodes[src_id] = src_node
-                if tgt_id not in nodes: nodes[tgt_id] = tgt_node
-                
-                links.append({
-                    "source": src_id,
-                    "target": tgt_id,
-                    "type": r.type,
-                    "properties": dict(r)
-                })
-        
-        return {"nodes": list(nodes.values()), "links": links}
+        return fetch_graph(driver, limit=1000)
     except Exception as e:
         st.error(f"Neo4j Error: {e}")
         return {"nodes": [], "links": []}
-    finally:
-        driver.close()
 
 # --- FRONTEND: Asset Loading & Injection ---
 def load_frontend_assets():
@@ -1,12 +1,17 @@
 import os
+import sys
 import json
 from pathlib import Path
 from dotenv import load_dotenv
 import streamlit as st
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from graph.graph_export import fetch_graph
+
 # Use neo4j driver if available; otherwise attempt to call local /api/graph
 try:
-    from neo4j import GraphDatabase
+    from graph.neo4j_client import get_client
     _has_neo4j = True
 except Exception:
     _has_neo4j = False
@@ -36,46 +41,7 @@ def get_graph_from_neo4j(limit=500):
         st.error('NEO4J_URI / NEO4J_USER / NEO4J_PASSWORD not set in .env')
         return {'nodes': [], 'links': []}
 
-    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
-    query = '''
-    MATCH (n)-[r]->(m)
-    RETURN n, r, m
-    LIMIT $limit
-    '''
-
-    nodes = {}
-    links = []
-    with driver.session() as session:
-        result = session.run(query, limit=limit)
-        for record in result:
-            n = record['n']
-            m = record['m']
-            r = record['r']
-
-            def process_node(node):
-                nid = str(node.id)
-                if 'id' in node:
-                    nid = node['id']
-                props = dict(node)
-                return nid, {
-                    'id': nid,
-                    'name': node.get('name', node.get('title', 'Unknown')),
-                    'group': list(node.labels)[0] if node.labels else 'Unknown',
-                    'properties': props
-                }
-
-            src_id, src_node = process_node(n)
-            tgt_id, tgt_node = process_node(m)
-
-            if src_id not in nodes:
-                nodes[src_id] = src_node
-            if tgt_id not in nodes:
-                nodes[tgt_id] = tgt_node
-
-            links.append({'source': src_id, 'target': tgt_id, 'type': r.type, 'properties': dict(r)})
-
-    driver.close()
-    return {'nodes': list(nodes.values()), 'links': links}
+    return fetch_graph(get_client(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD).driver, limit=limit)
 
 @st.cache(ttl=10)
 def get_graph_from_api(api_url, limit=500):
@@ -19,6 +19,86 @@ let highlightLinks = new Set();
 // Image cache for node symbols/logos
 const nodeImageCache = new Map();
 
+// Lazy loading: a capped preview (or the neighbourhood of ?focus=<id>) is loaded first,
+// clicking a node fetches its neighbours from /api/graph/neighbourhood
+const INITIAL_LINK_LIMIT = 500;
+const EXPAND_MAX_NODES = 100;
+const expandedNodes = new Set();
+
+function normalizeNodes(nodes) {
+    // Map Page to Site
+    (nodes || []).forEach(node => {
+        if (node.group === 'Page') {
+            node.group = 'Site';
+        }
+    });
+    return nodes;
+}
+
+function linkKey(link) {
+    const sId = (link.source && link.source.id) || link.source;
+    const tId = (link.target && link.target.id) || link.target;
+    return `${sId}|${link.type}|${tId}`;
+}
+
+async function fetchNeighbourhood(nodeId, depth = 1, maxNodes = EXPAND_MAX_NODES) {
+    const params = new URLSearchParams({ id: nodeId, depth, max_nodes: maxNodes });
+    const response = await fetch(`/api/graph/neighbourhood?${params}`);
+    if (!response.ok) throw new Error(`Server returned ${response.status} ${response.statusText}`);
+    return response.json();
+}
+
+// Add nodes/links not yet in the graph; returns the number of new nodes
+function mergeGraphData(data, anchor = null) {
+    const current = Graph.graphData();
+    const nodeIds = new Set(current.nodes.map(n => n.id));
+    const linkKeys = new Set(current.links.map(linkKey));
+
+    const newNodes = normalizeNodes(data.nodes.filter(n => !nodeIds.has(n.id)));
+    const newLinks = data.links.filter(l => !linkKeys.has(linkKey(l)));
+    if (newNodes.length === 0 && newLinks.length === 0) return 0;
+
+    // Start new neighbours next to the expanded node
+    if (anchor) {
+        newNodes.forEach(n => { n.x = anchor.x; n.y = anchor.y; });
+    }
+    Graph.graphData({
+        nodes: current.nodes.concat(newNodes),
+        links: current.links.concat(newLinks)
+    });
+    return newNodes.length;
+}
+
+async function expandNode(node) {
+    if (!Graph || !node || expandedNodes.has(node.id)) return;
+    expandedNodes.add(node.id);
+    try {
+        const data = await fetchNeighbourhood(node.id);
+        const added = mergeGraphData(data, node);
+
+        // Keep focus mode in sync if the expanded node is still selected
+        if (selectedNode === node) {
+            // New links may still hold ids until the graph re-renders - resolve by id
+            const byId = new Map(Graph.graphData().nodes.map(n => [n.id, n]));
+            Graph.graphData().links.forEach(link => {
+                const source = byId.get((link.source && link.source.id) || link.source);
+                const target = byId.get((link.target && link.target.id) || link.target);
+                if (source === node || target === node) {
+                    highlightLinks.add(link);
+                    highlightNodes.add(source);
+                    highlightNodes.add(target);
+                }
+            });
+        }
+        if (data.truncated) {
+            showStatusBanner(`${node.name}: pokazano ${added} nowych sąsiadów (limit)`, 'info');
+        }
+    } catch (err) {
+        expandedNodes.delete(node.id);
+        console.error('Failed to expand node:', err);
+    }
+}
+
 function loadNodeImage(node) {
     if (!node || !node.properties) return null;
     
@@ -67,18 +147,17 @@ function loadNodeImage(node) {
 
 async function init() {
     try {
-        const response = await fetch('/api/graph');
-        if (!response.ok) throw new Error(`Server returned ${response.status} ${response.statusText}`);
-        const data = await response.json();
-        
-        // Map Page to Site
-        if (data.nodes) {
-            data.nodes.forEach(node => {
-                if (node.group === 'Page') {
-                    node.group = 'Site';
-                }
-            });
+        const focusId = new URLSearchParams(window.location.search).get('focus');
+        let data;
+        if (focusId) {
+            data = await fetchNeighbourhood(focusId, 2);
+            expandedNodes.add(focusId);
+        } else {
+            const response = await fetch(`/api/graph?limit=${INITIAL_LINK_LIMIT}`);
+            if (!response.ok) throw new Error(`Server returned ${response.status} ${response.statusText}`);
+            data = await response.json();
         }
+        normalizeNodes(data.nodes);
         
         const container = document.getElementById('graph-container');
         
@@ -308,6 +387,7 @@ async function init() {
                     
                     selectedNode = node;
                     isEditing = false; // Reset edit mode on new selection
+                    expandNode(node);
                     
                     // Highlight logic
                     highlightNodes.clear();
@@ -1079,10 +1159,20 @@ window.addEventListener('message', (event) => {
     }
 });
 
-function focusNodeById(nodeId) {
+async function focusNodeById(nodeId) {
     if (!Graph) return;
     
-    const node = Graph.graphData().nodes.find(n => n.id === nodeId);
+    let node = Graph.graphData().nodes.find(n => n.id === nodeId);
+    if (!node && !expandedNodes.has(nodeId)) {
+        // Not in the loaded part of the graph - fetch its neighbourhood
+        try {
+            mergeGraphData(await fetchNeighbourhood(nodeId));
+            expandedNodes.add(nodeId);
+            node = Graph.graphData().nodes.find(n => n.id === nodeId);
+        } catch (err) {
+            console.warn('Failed to load node neighbourhood:', err);
+        }
+    }
     if (!node) {
         console.warn('Node not found:', nodeId);
         return;
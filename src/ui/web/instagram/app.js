@@ -7,6 +7,7 @@
 
 const API_BASE = '/api/social';
 const GRAPH_API = '/api/graph';
+const POSTS_PAGE_SIZE = 100;
 
 // ============================================
 // STATE
@@ -18,6 +19,9 @@ const state = {
     currentPlatform: null, // 'instagram' or 'facebook'
     posts: [],
     filteredPosts: [],
+    nextCursor: null, // keyset cursor for the next page of posts
+    loadingMore: false,
+    postsQuery: 0, // bumped by loadPosts so responses of an older query are dropped
     currentPost: null,
     pendingUploads: [],
     viewMode: 'gallery', // 'gallery', 'detail', 'entities', 'entity-detail'
@@ -172,21 +176,42 @@ const elements = {
 // ============================================
 // API CALLS
 // ============================================
-async function api(endpoint, method = 'GET', data = null) {
+// ETag of each resource as last read; sent back as If-Match so a save based on
+// stale data is rejected (412) instead of overwriting another analyst's change
+const etags = new Map();
+
+async function fetchVersioned(url, method = 'GET', data = null) {
     const options = {
         method,
         headers: { 'Content-Type': 'application/json' }
     };
     if (data) options.body = JSON.stringify(data);
+    if ((method === 'PUT' || method === 'DELETE') && etags.has(url)) {
+        options.headers['If-Match'] = etags.get(url);
+    }
     
-    const response = await fetch(`${API_BASE}${endpoint}`, options);
+    const response = await fetch(url, options);
+    if (response.status === 412) {
+        etags.delete(url);
+        throw new Error('Dane zostały zmienione przez kogoś innego - odśwież widok');
+    }
     if (!response.ok) {
         const error = await response.text();
         throw new Error(error || `HTTP ${response.status}`);
     }
+    const etag = response.headers.get('ETag');
+    if (method === 'DELETE') {
+        etags.delete(url);
+    } else if (etag) {
+        etags.set(url, etag);
+    }
     return response.json();
 }
 
+async function api(endpoint, method = 'GET', data = null) {
+    return fetchVersioned(`${API_BASE}${endpoint}`, method, data);
+}
+
 async function loadProfiles() {
     try {
         const profiles = await api('/profiles');
@@ -235,22 +260,67 @@ async function loadProfiles() {
     }
 }
 
+function postsPageEndpoint(cursor = null) {
+    // Search, content type and date order are applied server-side
+    const params = new URLSearchParams({ limit: POSTS_PAGE_SIZE });
+    if (cursor) params.set('cursor', cursor);
+    const searchTerm = elements.searchInput.value.trim();
+    if (searchTerm) params.set('q', searchTerm);
+    if (state.contentTypeFilter !== 'all') params.set('type', state.contentTypeFilter);
+    if (elements.sortSelect.value === 'oldest') params.set('order', 'asc');
+    return `/profiles/${encodeURIComponent(state.currentProfile)}/posts?${params}`;
+}
+
 async function loadPosts() {
     if (!state.currentProfile) return;
     
+    const query = ++state.postsQuery;
+    state.loadingMore = false;
     elements.galleryGrid.innerHTML = '<div class="loading"><div class="spinner"></div></div>';
     
     try {
-        const posts = await api(`/posts/${state.currentProfile}`);
-        state.posts = posts;
+        const page = await api(postsPageEndpoint());
+        if (query !== state.postsQuery) return;
+        state.posts = page.posts;
+        state.nextCursor = page.nextCursor;
         applyFilters();
         updateStats();
+        fillGalleryViewport();
     } catch (err) {
+        if (query !== state.postsQuery) return;
         showToast('Błąd ładowania postów: ' + err.message, 'error');
         elements.galleryGrid.innerHTML = '<div class="empty-state"><i class="fas fa-exclamation-circle"></i><p>Błąd ładowania</p></div>';
     }
 }
 
+async function loadMorePosts() {
+    if (!state.currentProfile || !state.nextCursor || state.loadingMore) return;
+    
+    const query = state.postsQuery;
+    state.loadingMore = true;
+    try {
+        const page = await api(postsPageEndpoint(state.nextCursor));
+        if (query !== state.postsQuery) return;
+        state.posts = state.posts.concat(page.posts);
+        state.nextCursor = page.nextCursor;
+        applyFilters();
+        updateStats();
+        setTimeout(fillGalleryViewport, 0);
+    } catch (err) {
+        if (query === state.postsQuery) showToast('Błąd ładowania postów: ' + err.message, 'error');
+    } finally {
+        if (query === state.postsQuery) state.loadingMore = false;
+    }
+}
+
+function fillGalleryViewport() {
+    // Keep loading while the gallery is too short to scroll
+    const grid = elements.galleryGrid;
+    if (state.nextCursor && grid.offsetParent && grid.scrollHeight <= grid.clientHeight) {
+        loadMorePosts();
+    }
+}
+
 async function loadPostDetail(postId) {
     try {
         const data = await api(`/post/${state.currentProfile}/${postId}`);
@@ -288,18 +358,7 @@ async function savePost() {
 // GRAPH ENTITIES API
 // ============================================
 async function graphApi(endpoint, method = 'GET', data = null) {
-    const options = {
-        method,
-        headers: { 'Content-Type': 'application/json' }
-    };
-    if (data) options.body = JSON.stringify(data);
-    
-    const response = await fetch(`${GRAPH_API}${endpoint}`, options);
-    if (!response.ok) {
-        const error = await response.text();
-        throw new Error(error || `HTTP ${response.status}`);
-    }
-    return response.json();
+    return fetchVersioned(`${GRAPH_API}${endpoint}`, method, data);
 }
 
 // ============================================
@@ -803,14 +862,19 @@ function renderDetailView() {
         elements.openUrlBtn.style.display = 'none';
     }
     
-    // Screenshots
+    // Screenshots - compressed preview (WebP) when available, original PNG for download
+    const previews = post.previews || {};
     if (post.screenshots && post.screenshots.length > 0) {
         elements.screenshotsGrid.innerHTML = post.screenshots.map(s => `
             <div class="media-item">
-                <img src="${evidencePath}/${s}" 
+                <img src="${evidencePath}/${previews[s] || s}" 
                      alt="${s}" 
+                     loading="lazy"
                      onclick="openLightbox(this.src)">
                 <div class="media-item-actions">
+                    <a class="btn btn-secondary btn-small" href="${evidencePath}/${s}" download="${s}" title="Oryginał">
+                        <i class="fas fa-download"></i>
+                    </a>
                     <button class="btn btn-danger btn-small" onclick="confirmDeleteScreenshot('${s}')">
                         <i class="fas fa-trash"></i>
                     </button>
@@ -836,7 +900,7 @@ function renderDetailView() {
 }
 
 function updateStats() {
-    elements.postCount.textContent = state.posts.length;
+    elements.postCount.textContent = state.posts.length + (state.nextCursor ? '+' : '');
     const totalMedia = state.posts.reduce((sum, p) => sum + (p.screenshotCount || 0) + (p.imageCount || 0), 0);
     elements.mediaCount.textContent = totalMedia;
 }
@@ -1126,29 +1190,11 @@ function confirmDeleteEdge(edgeId) {
 // FILTERS & SORTING
 // ============================================
 function applyFilters() {
+    // Content type, search and date order come from the server (see postsPageEndpoint)
     let posts = [...state.posts];
     
-    // Content type filter (all/post/story)
-    if (state.contentTypeFilter !== 'all') {
-        posts = posts.filter(p => p.contentType === state.contentTypeFilter);
-    }
-    
-    // Search filter
-    const searchTerm = elements.searchInput.value.toLowerCase();
-    if (searchTerm) {
-        posts = posts.filter(p => 
-            p.id.toLowerCase().includes(searchTerm) ||
-            (p.text && p.text.toLowerCase().includes(searchTerm))
-        );
-    }
-    
-    // Sorting
-    const sortBy = elements.sortSelect.value;
-    if (sortBy === 'newest') {
-        posts.sort((a, b) => (b.scraped_at || '').localeCompare(a.scraped_at || ''));
-    } else if (sortBy === 'oldest') {
-        posts.sort((a, b) => (a.scraped_at || '').localeCompare(b.scraped_at || ''));
-    } else {
+    // Sorting by ID only applies to already loaded pages
+    if (elements.sortSelect.value === 'id') {
         posts.sort((a, b) => a.id.localeCompare(b.id));
     }
     
@@ -1674,13 +1720,25 @@ function initEventListeners() {
             elements.contentTypeBtns.forEach(b => b.classList.remove('active'));
             btn.classList.add('active');
             state.contentTypeFilter = btn.dataset.type;
-            applyFilters();
+            loadPosts();
         });
     });
     
-    // Search & Sort
-    elements.searchInput.addEventListener('input', applyFilters);
-    elements.sortSelect.addEventListener('change', applyFilters);
+    // Search & Sort (server-side, debounced)
+    let searchTimer = null;
+    elements.searchInput.addEventListener('input', () => {
+        clearTimeout(searchTimer);
+        searchTimer = setTimeout(loadPosts, 300);
+    });
+    elements.sortSelect.addEventListener('change', loadPosts);
+    
+    // Infinite scroll - fetch next page near the bottom of the gallery
+    elements.galleryGrid.addEventListener('scroll', () => {
+        const grid = elements.galleryGrid;
+        if (grid.scrollTop + grid.clientHeight >= grid.scrollHeight - 400) {
+            loadMorePosts();
+        }
+    });
     
     // Back button
     elements.backBtn.addEventListener('click', () => {
@@ -16,6 +16,7 @@ import urllib.parse
 import cgi
 import subprocess
 import threading
+import bisect
 
 # Paths
 PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent.parent.parent
@@ -28,11 +29,17 @@ sys.path.insert(0, str(PROJECT_ROOT / "src"))
 
 # Import DuckDB manager and Neo4j client
 from db.posts_db import get_posts_db
+from db.evidence_catalog import get_evidence_catalog
+from db.evidence_media import get_evidence_writer, remove_previews, thumb_name, web_name, THUMBS_DIR, WEB_DIR as PREVIEW_DIR
 from graph.neo4j_client import get_client as get_neo4j_client
+from graph.graph_export import BASE_LABEL
+from graph.json_graph_store import get_graph_store
+from db.file_store import (
+    VersionConflict, atomic_write_json, check_etag, file_lock, json_etag, read_json, update_json, write_json
+)
 
-# Graph data paths
-GRAPH_NODES_FILE = PROJECT_ROOT / "data" / "raw" / "graph_nodes.json"
-GRAPH_EDGES_FILE = PROJECT_ROOT / "data" / "raw" / "graph_edges.json"
+# Graph data (data/raw/graph_nodes.json, graph_edges.json) - indexed in memory, journaled writes
+GRAPH_STORE = get_graph_store()
 
 # Entity types configuration
 ENTITY_TYPES = {
@@ -77,6 +84,111 @@ PLATFORMS = {
 
 PORT = 8084
 
+IMAGE_SUFFIXES = ('.png', '.jpg', '.jpeg', '.webp')
+
+
+class EvidenceListing:
+    """Sorted snapshot of file names in one evidence directory."""
+    
+    def __init__(self, names):
+        self.names = names
+        self._name_set = set(names)
+    
+    def __contains__(self, name):
+        return name in self._name_set
+    
+    def with_prefix(self, prefix):
+        """Return file names starting with prefix (same as glob(f"{prefix}*"), sorted)."""
+        start = bisect.bisect_left(self.names, prefix)
+        matches = []
+        for name in self.names[start:]:
+            if not name.startswith(prefix):
+                break
+            matches.append(name)
+        return matches
+
+
+class EvidenceIndex:
+    """
+    Process-wide cache of evidence directory listings.
+    
+    Listings come from the DuckDB evidence catalog. A directory is re-synced
+    into the catalog only when its mtime changes or it is invalidated
+    explicitly (upload/delete handlers), so listing posts for a profile costs
+    one stat() instead of a glob per post.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._listings = {}  # directory -> (mtime_ns, EvidenceListing)
+        self._catalog = None
+    
+    @property
+    def catalog(self):
+        with self._lock:
+            if self._catalog is None:
+                self._catalog = get_evidence_catalog()
+            return self._catalog
+    
+    def get(self, directory):
+        """Get listing for directory (empty if it does not exist)."""
+        directory = Path(directory)
+        try:
+            mtime_ns = directory.stat().st_mtime_ns
+        except OSError:
+            self.invalidate(directory)
+            return EvidenceListing([])
+        
+        with self._lock:
+            cached = self._listings.get(directory)
+        if cached and cached[0] == mtime_ns:
+            return cached[1]
+        
+        self.catalog.scan(directory, recursive=False)
+        listing = EvidenceListing(self.catalog.list_directory(directory))
+        with self._lock:
+            self._listings[directory] = (mtime_ns, listing)
+        return listing
+    
+    def thumbnails(self, directory):
+        """Listing of the thumbnail subdirectory of directory."""
+        return self._derived(Path(directory) / THUMBS_DIR)
+    
+    def previews(self, directory):
+        """Listing of the compressed preview subdirectory of directory."""
+        return self._derived(Path(directory) / PREVIEW_DIR)
+    
+    def _derived(self, subdir):
+        """
+        Previews and thumbnails are not cataloged (they are derived from the
+        masters), so their listing is a plain listdir, cached by mtime like get().
+        """
+        try:
+            mtime_ns = subdir.stat().st_mtime_ns
+        except OSError:
+            return EvidenceListing([])
+        
+        with self._lock:
+            cached = self._listings.get(subdir)
+        if cached and cached[0] == mtime_ns:
+            return cached[1]
+        
+        listing = EvidenceListing(sorted(os.listdir(subdir)))
+        with self._lock:
+            self._listings[subdir] = (mtime_ns, listing)
+        return listing
+    
+    def invalidate(self, directory=None):
+        """Drop cached listing for directory (or all listings)."""
+        with self._lock:
+            if directory is None:
+                self._listings.clear()
+            else:
+                self._listings.pop(Path(directory), None)
+
+
+EVIDENCE_INDEX = EvidenceIndex()
+
 
 class SocialMediaAPIHandler(http.server.SimpleHTTPRequestHandler):
     """Custom HTTP handler for Social Media Manager API."""
@@ -98,11 +210,14 @@ class SocialMediaAPIHandler(http.server.SimpleHTTPRequestHandler):
         """Get config for platform."""
         return PLATFORMS.get(platform, PLATFORMS['instagram'])
     
-    def send_json(self, data, status=200):
-        """Send JSON response."""
+    def send_json(self, data, status=200, etag=None):
+        """Send JSON response (with ETag header for versioned resources)."""
         self.send_response(status)
         self.send_header('Content-Type', 'application/json')
         self.send_header('Access-Control-Allow-Origin', '*')
+        if etag:
+            self.send_header('ETag', f'"{etag}"')
+            self.send_header('Access-Control-Expose-Headers', 'ETag')
         self.end_headers()
         self.wfile.write(json.dumps(data, ensure_ascii=False).encode('utf-8'))
     
@@ -114,12 +229,29 @@ class SocialMediaAPIHandler(http.server.SimpleHTTPRequestHandler):
         self.end_headers()
         self.wfile.write(json.dumps({'error': message}, ensure_ascii=False).encode('utf-8'))
     
+    def if_match(self):
+        """ETag from the If-Match header (None if absent)."""
+        value = self.headers.get('If-Match')
+        if not value:
+            return None
+        value = value.strip()
+        if value.startswith('W/'):
+            value = value[2:]
+        return value.strip('"')
+    
+    def send_conflict(self, conflict):
+        """412 - the resource changed since the client read it."""
+        self.send_json({
+            'error': 'Zasób został zmieniony przez kogoś innego - odśwież i spróbuj ponownie',
+            'etag': conflict.etag
+        }, status=412, etag=conflict.etag)
+    
     def do_OPTIONS(self):
         """Handle CORS preflight."""
         self.send_response(200)
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, PUT, DELETE, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type, If-Match')
         self.end_headers()
     
     def do_GET(self):
@@ -146,6 +278,13 @@ class SocialMediaAPIHandler(http.server.SimpleHTTPRequestHandler):
         # API Routes - unified endpoint /api/social/*
         if path == '/api/social/profiles':
             self.handle_get_profiles()
+        elif path.startswith('/api/social/profiles/') and path.endswith('/posts'):
+            # Paged posts: /api/social/profiles/<prefixed_profile>/posts?cursor=...&limit=...&q=...&type=...
+            prefixed_profile = urllib.parse.unquote(path.split('/')[-2])
+            self.handle_get_posts(prefixed_profile, paged=True)
+        elif path == '/api/social/search':
+            # Full-text search: /api/social/search?q=...&limit=...&profile=<prefixed_profile>
+            self.handle_search_posts()
         elif path.startswith('/api/social/posts/'):
             prefixed_profile = urllib.parse.unquote(path.split('/')[-1])
             self.handle_get_posts(prefixed_profile)
@@ -325,30 +464,31 @@ class SocialMediaAPIHandler(http.server.SimpleHTTPRequestHandler):
     # ==========================================
     
     def handle_get_profiles(self):
-        """Get list of available profiles from DuckDB."""
+        """Get list of available profiles from DuckDB (single aggregated query)."""
         try:
             db = get_posts_db()
             profiles = []
             
-            for platform_name, config in PLATFORMS.items():
+            for summary in db.get_profile_summaries():
+                platform_name = summary['platform']
+                if platform_name not in PLATFORMS:
+                    continue
+                config = PLATFORMS[platform_name]
                 prefix = config['prefix']
+                handle = summary['handle']
                 
-                # Get unique handles from DuckDB for this platform
-                handles = db.get_handles(platform=platform_name)
-                
-                for handle in handles:
-                    # Get post count for this profile
-                    post_count = db.count_posts(platform=platform_name, handle=handle)
-                    
-                    profiles.append({
-                        'id': f"{prefix}-{handle}",
-                        'name': handle,
-                        'platform': platform_name,
-                        'prefix': prefix,
-                        'icon': config['icon'],
-                        'color': config['color'],
-                        'postCount': post_count
-                    })
+                profiles.append({
+                    'id': f"{prefix}-{handle}",
+                    'name': handle,
+                    'platform': platform_name,
+                    'prefix': prefix,
+                    'icon': config['icon'],
+                    'color': config['color'],
+                    'postCount': summary['post_count'],
+                    'newestPost': str(summary['newest_post']) if summary['newest_post'] else None,
+                    'oldestPost': str(summary['oldest_post']) if summary['oldest_post'] else None,
+                    'lastScrapedAt': str(summary['last_scraped_at']) if summary['last_scraped_at'] else None
+                })
             
             # Sort: Instagram first, then Facebook, then by name
             profiles.sort(key=lambda x: (x['platform'] != 'instagram', x['name'].lower()))
@@ -357,17 +497,46 @@ class SocialMediaAPIHandler(http.server.SimpleHTTPRequestHandler):
         except Exception as e:
             self.send_error_json(str(e), 500)
     
-    def handle_get_posts(self, prefixed_profile):
-        """Get list of posts for a profile from DuckDB."""
+    def handle_get_posts(self, prefixed_profile, paged=False):
+        """
+        Get list of posts for a profile from DuckDB.
+        
+        Query params: cursor, limit, q (text search), type (post|story),
+        order (desc|asc). The paged variant returns {'posts', 'nextCursor'};
+        the legacy variant returns a bare list (first page, up to 1000 posts).
+        """
         try:
             platform, profile = self.parse_profile_id(prefixed_profile)
             config = self.get_platform_config(platform)
             evidence_dir = config['evidence_dir']
             posts_subdir = config['posts_subdir']
             
+            params = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
+            default_limit = 100 if paged else 1000
+            try:
+                limit = max(1, min(int(params.get('limit', [default_limit])[0]), 1000))
+            except ValueError:
+                self.send_error_json('Invalid limit', 400)
+                return
+            content_type = params.get('type', [None])[0]
+            if content_type not in (None, '', 'all', 'post', 'story'):
+                self.send_error_json('Invalid type (post|story)', 400)
+                return
+            
             # Get posts from DuckDB
             db = get_posts_db()
-            db_posts = db.get_posts(platform=platform, handle=profile, limit=1000)
+            try:
+                page = db.get_posts_page(
+                    platform=platform, handle=profile,
+                    cursor=params.get('cursor', [None])[0] or None,
+                    limit=limit,
+                    search=params.get('q', [None])[0] or None,
+                    content_type=content_type if content_type in ('post', 'story') else None,
+                    order=params.get('order', ['desc'])[0]
+                )
+            except ValueError as e:
+                self.send_error_json(str(e), 400)
+                return
             
             posts = []
             # Dla FB posts_subdir jest pusty, więc używamy bezpośrednio katalogu profilu
@@ -375,54 +544,41 @@ class SocialMediaAPIHandler(http.server.SimpleHTTPRequestHandler):
                 evidence_posts_dir = evidence_dir / profile / posts_subdir
             else:
                 evidence_posts_dir = evidence_dir / profile
-            evidence_images_dir = evidence_dir / profile / "images"
             
-            for db_post in db_posts:
+            # One directory listing per request (cached between requests)
+            evidence_files = EVIDENCE_INDEX.get(evidence_posts_dir)
+            thumbnail_files = EVIDENCE_INDEX.thumbnails(evidence_posts_dir)
+            
+            for db_post in page['posts']:
                 post_id = db_post['id']
+                post_files = evidence_files.with_prefix(post_id)
                 
-                # Find thumbnail - scan evidence folder for first matching screenshot
+                # Find thumbnail - first matching screenshot in evidence folder
                 thumbnail = None
-                if evidence_posts_dir.exists():
-                    # Look for files starting with post_id
-                    for img_file in sorted(evidence_posts_dir.glob(f"{post_id}*")):
-                        if img_file.suffix.lower() in ['.png', '.jpg', '.jpeg', '.webp']:
-                            thumbnail = img_file.name
-                            break
+                for name in post_files:
+                    if Path(name).suffix.lower() in IMAGE_SUFFIXES:
+                        thumbnail = name
+                        break
                 
                 # Fallback to screenshot_path from DB
                 if not thumbnail and db_post.get('screenshot_path'):
-                    screenshot_field = db_post['screenshot_path']
-                    thumb_name = Path(screenshot_field).name
-                    if evidence_posts_dir.exists():
-                        thumb_path = evidence_posts_dir / thumb_name
-                        if thumb_path.exists():
-                            thumbnail = thumb_name
+                    screenshot_name = Path(db_post['screenshot_path']).name
+                    if screenshot_name in evidence_files:
+                        thumbnail = screenshot_name
+                
+                # Prefer the small WebP thumbnail (see db/evidence_media.py) over the full screenshot
+                if thumbnail:
+                    small = thumb_name(thumbnail)
+                    if small.rpartition('/')[2] in thumbnail_files:
+                        thumbnail = small
                 
                 # Count screenshots - based on actual files in evidence folder
-                screenshot_count = 0
-                if evidence_posts_dir.exists():
-                    screenshot_count = len(list(evidence_posts_dir.glob(f"{post_id}*")))
+                screenshot_count = len(post_files)
                 
                 # Fallback to 1 if screenshot_path exists
                 if screenshot_count == 0 and db_post.get('screenshot_path'):
                     screenshot_count = 1
                 
-                # Get metadata for carousel images (only for Instagram)
-                metadata_dict = db_post.get('metadata')
-                if isinstance(metadata_dict, str):
-                    try:
-                        metadata_dict = json.loads(metadata_dict)
-                    except:
-                        metadata_dict = {}
-                
-                image_count = len(metadata_dict.get('images', [])) if metadata_dict else 0
-                
-                # Determine content type (post/story)
-                content_type = 'post'
-                url = db_post.get('post_url') or ''
-                if url and ('/stories/' in url or '/story/' in url):
-                    content_type = 'story'
-                
                 post_date = db_post.get('date_posted')
                 if post_date:
                     post_date = str(post_date)
@@ -436,14 +592,65 @@ class SocialMediaAPIHandler(http.server.SimpleHTTPRequestHandler):
                     'thumbnail': thumbnail,
                     'date': post_date or created_at or '',
                     'scraped_at': created_at or '',
-                    'text': (db_post.get('text') or db_post.get('raw_text_preview') or '')[:100],
+                    'text': db_post['snippet'],
                     'screenshotCount': screenshot_count,
-                    'imageCount': image_count,
-                    'contentType': content_type,
+                    'imageCount': db_post['image_count'],
+                    'contentType': db_post['content_type'],
                     'platform': platform
                 })
             
-            self.send_json(posts)
+            if paged:
+                self.send_json({'posts': posts, 'nextCursor': page['next_cursor']})
+            else:
+                self.send_json(posts)
+        except Exception as e:
+            self.send_error_json(str(e), 500)
+    
+    def handle_search_posts(self):
+        """
+        Full-text search across all posts (BM25 ranked, diacritic-insensitive).
+        
+        Query params: q (terms, "quoted phrases"), limit (max 500),
+        platform, profile (prefixed profile id, e.g. fb-handle).
+        """
+        try:
+            params = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
+            query = params.get('q', [''])[0].strip()
+            if not query:
+                self.send_error_json('Missing q parameter', 400)
+                return
+            try:
+                limit = max(1, min(int(params.get('limit', [50])[0]), 500))
+            except ValueError:
+                self.send_error_json('Invalid limit', 400)
+                return
+            
+            platform = params.get('platform', [None])[0] or None
+            handle = None
+            profile = params.get('profile', [None])[0]
+            if profile:
+                platform, handle = self.parse_profile_id(profile)
+            
+            db = get_posts_db()
+            results = []
+            for db_post in db.search_posts(query, limit=limit, platform=platform, handle=handle):
+                config = PLATFORMS.get(db_post['platform'])
+                if not config:
+                    continue
+                text = db_post.get('text') or db_post.get('raw_text_preview') or ''
+                post_date = db_post.get('date_posted') or db_post.get('created_at')
+                results.append({
+                    'id': db_post['id'],
+                    'profileId': f"{config['prefix']}-{db_post['handle']}",
+                    'platform': db_post['platform'],
+                    'handle': db_post['handle'],
+                    'url': db_post.get('post_url'),
+                    'date': str(post_date) if post_date else '',
+                    'text': text[:200],
+                    'score': round(db_post['score'], 4)
+                })
+            
+            self.send_json({'query': query, 'results': results})
         except Exception as e:
             self.send_error_json(str(e), 500)
     
@@ -461,8 +668,7 @@ class SocialMediaAPIHandler(http.server.SimpleHTTPRequestHandler):
                 self.send_error_json('Post not found', 404)
                 return
             
-            with open(json_path, 'r', encoding='utf-8') as f:
-                metadata = json.load(f)
+            metadata, etag = read_json(json_path)
             
             evidence_profile_dir = evidence_dir / profile
             if posts_subdir:
@@ -471,6 +677,9 @@ class SocialMediaAPIHandler(http.server.SimpleHTTPRequestHandler):
                 posts_dir = evidence_profile_dir
             images_dir = evidence_profile_dir / "images"
             
+            posts_files = EVIDENCE_INDEX.get(posts_dir)
+            images_files = EVIDENCE_INDEX.get(images_dir)
+            
             # Collect screenshots
             screenshots = []
             
@@ -478,21 +687,28 @@ class SocialMediaAPIHandler(http.server.SimpleHTTPRequestHandler):
             if 'screenshots' in metadata and isinstance(metadata['screenshots'], list):
                 for s in metadata['screenshots']:
                     s_name = Path(s).name
-                    if (posts_dir / s_name).exists():
+                    if s_name in posts_files:
                         screenshots.append(s_name)
             
             # From metadata single
             if 'screenshot' in metadata and metadata['screenshot']:
                 s = metadata['screenshot']
                 s_name = Path(s).name
-                if (posts_dir / s_name).exists() and s_name not in screenshots:
+                if s_name in posts_files and s_name not in screenshots:
                     screenshots.append(s_name)
             
-            # Scan directory fallback
-            if posts_dir.exists():
-                for f in posts_dir.iterdir():
-                    if f.is_file() and post_id in f.stem and f.name not in screenshots:
-                        screenshots.append(f.name)
+            # Evidence catalog fallback
+            for name in posts_files.names:
+                if post_id in Path(name).stem and name not in screenshots:
+                    screenshots.append(name)
+            
+            # Compressed previews for display; the masters stay linked for download
+            preview_files = EVIDENCE_INDEX.previews(posts_dir)
+            previews = {}
+            for name in screenshots:
+                preview = web_name(name)
+                if preview.rpartition('/')[2] in preview_files:
+                    previews[name] = preview
             
             # Collect carousel images (only for Instagram)
             images = []
@@ -500,7 +716,7 @@ class SocialMediaAPIHandler(http.server.SimpleHTTPRequestHandler):
                 for img_id in metadata['images']:
                     for ext in ['.jpg', '.jpeg', '.png', '.heic', '.webp']:
                         img_name = f"{img_id}{ext}"
-                        if (images_dir / img_name).exists():
+                        if img_name in images_files:
                             images.append(img_name)
                             break
 
@@ -511,7 +727,7 @@ class SocialMediaAPIHandler(http.server.SimpleHTTPRequestHandler):
                 if 'screenshot' in sanitized_meta and sanitized_meta['screenshot']:
                     s = str(sanitized_meta['screenshot'])
                     s_name = Path(s).name
-                    if (posts_dir / s_name).exists():
+                    if s_name in posts_files:
                         sanitized_meta['screenshot'] = s_name
                     else:
                         # remove full remote URL if local not present to avoid external hotlinking
@@ -522,7 +738,7 @@ class SocialMediaAPIHandler(http.server.SimpleHTTPRequestHandler):
                     new_list = []
                     for s in sanitized_meta['screenshots']:
                         s_name = Path(s).name
-                        if (posts_dir / s_name).exists():
+                        if s_name in posts_files:
                             new_list.append(s_name)
                     sanitized_meta['screenshots'] = new_list
             except Exception:
@@ -533,8 +749,9 @@ class SocialMediaAPIHandler(http.server.SimpleHTTPRequestHandler):
                 'platform': platform,
                 'metadata': sanitized_meta,
                 'screenshots': screenshots,
+                'previews': previews,
                 'images': images
-            })
+            }, etag=etag)
         except Exception as e:
             self.send_error_json(str(e), 500)
     
@@ -559,10 +776,11 @@ class SocialMediaAPIHandler(http.server.SimpleHTTPRequestHandler):
                 self.send_error_json('Post not found', 404)
                 return
             
-            with open(json_path, 'w', encoding='utf-8') as f:
-                json.dump(metadata, f, indent=2, ensure_ascii=False)
+            etag = write_json(json_path, metadata, if_match=self.if_match())
             
-            self.send_json({'status': 'success'})
+            self.send_json({'status': 'success'}, etag=etag)
+        except VersionConflict as e:
+            self.send_conflict(e)
         except Exception as e:
             self.send_error_json(str(e), 500)
     
@@ -613,8 +831,7 @@ class SocialMediaAPIHandler(http.server.SimpleHTTPRequestHandler):
             
             # Zapisz JSON
             json_path = profile_data_dir / f"{post_id}.json"
-            with open(json_path, 'w', encoding='utf-8') as f:
-                json.dump(metadata, f, indent=2, ensure_ascii=False)
+            atomic_write_json(json_path, metadata)
             
             self.send_json({
                 'status': 'success',
@@ -843,6 +1060,8 @@ class SocialMediaAPIHandler(http.server.SimpleHTTPRequestHandler):
                         print(f"[Scraper] 📸 Starting to capture {slide_count} slide(s)...")
                         
                         screenshots_saved = []
+                        screenshot_writes = []
+                        evidence = get_evidence_writer()
                         
                         for slide_num in range(1, slide_count + 1):
                             try:
@@ -864,10 +1083,12 @@ class SocialMediaAPIHandler(http.server.SimpleHTTPRequestHandler):
                                 else:
                                     out_file = str(profile_posts_dir / f"{post_id}_slide_{slide_num}.png")
                                 
+                                # Master + WebP preview + thumbnail written in the background
                                 if art and art.is_visible():
-                                    art.screenshot(path=out_file)
+                                    png = art.screenshot()
                                 else:
-                                    page.screenshot(path=out_file)
+                                    png = page.screenshot()
+                                screenshot_writes.append(evidence.submit(png, out_file))
                                 
                                 screenshots_saved.append(out_file)
                                 print(f"[Scraper]   ✅ Slide {slide_num}/{slide_count} -> {Path(out_file).name}")
@@ -875,6 +1096,9 @@ class SocialMediaAPIHandler(http.server.SimpleHTTPRequestHandler):
                             except Exception as e:
                                 print(f"[Scraper]   ❌ Slide {slide_num} error: {e}")
                         
+                        evidence.flush(screenshot_writes)
+                        EVIDENCE_INDEX.invalidate(profile_posts_dir)
+                        
                         # =============================================
                         # SAVE METADATA JSON
                         # =============================================
@@ -899,8 +1123,7 @@ class SocialMediaAPIHandler(http.server.SimpleHTTPRequestHandler):
                             pass
                         
                         json_path = profile_data_dir / f"{post_id}.json"
-                        with open(json_path, 'w', encoding='utf-8') as f:
-                            json.dump(metadata, f, indent=2, ensure_ascii=False)
+                        write_json(json_path, metadata)
                         
                         print(f"[Scraper] 💾 Metadata saved: {json_path.name}")
                         print(f"[Scraper] ✅ Done! {len(screenshots_saved)} screenshots saved for {slide_count} slides")
@@ -944,24 +1167,33 @@ class SocialMediaAPIHandler(http.server.SimpleHTTPRequestHandler):
             posts_subdir = config['posts_subdir']
             ts = datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')
             backup_subdir = BACKUP_DIR / f"post_delete_{ts}"
-            backup_subdir.mkdir(parents=True, exist_ok=True)
-            
-            # Move JSON
             json_path = data_dir / profile / f"{post_id}.json"
-            if json_path.exists():
-                shutil.move(str(json_path), str(backup_subdir / json_path.name))
             
-            # Move screenshots
-            if posts_subdir:
-                posts_dir = evidence_dir / profile / posts_subdir
-            else:
-                posts_dir = evidence_dir / profile
-            if posts_dir.exists():
-                for f in posts_dir.iterdir():
-                    if f.is_file() and post_id in f.stem:
-                        shutil.move(str(f), str(backup_subdir / f.name))
+            # Under the JSON's lock, so a concurrent edit cannot land between the check and the move
+            with file_lock(json_path):
+                current = read_json(json_path)[1] if json_path.exists() else None
+                check_etag(current, self.if_match())
+                backup_subdir.mkdir(parents=True, exist_ok=True)
+                
+                # Move JSON
+                if json_path.exists():
+                    shutil.move(str(json_path), str(backup_subdir / json_path.name))
+                
+                # Move screenshots
+                if posts_subdir:
+                    posts_dir = evidence_dir / profile / posts_subdir
+                else:
+                    posts_dir = evidence_dir / profile
+                if posts_dir.exists():
+                    for f in posts_dir.iterdir():
+                        if f.is_file() and post_id in f.stem:
+                            shutil.move(str(f), str(backup_subdir / f.name))
+                            remove_previews(f)
+                    EVIDENCE_INDEX.invalidate(posts_dir)
             
             self.send_json({'status': 'success', 'backup': str(backup_subdir)})
+        except VersionConflict as e:
+            self.send_conflict(e)
         except Exception as e:
             self.send_error_json(str(e), 500)
     
@@ -993,24 +1225,23 @@ class SocialMediaAPIHandler(http.server.SimpleHTTPRequestHandler):
             backup_subdir = BACKUP_DIR / f"screenshot_remove_{ts}"
             backup_subdir.mkdir(parents=True, exist_ok=True)
             shutil.move(str(file_path), str(backup_subdir / filename))
+            remove_previews(file_path)
+            EVIDENCE_INDEX.invalidate(file_path.parent)
             
             # Update metadata
             json_path = data_dir / profile / f"{post_id}.json"
             if json_path.exists():
-                with open(json_path, 'r', encoding='utf-8') as f:
-                    meta = json.load(f)
-                
-                # Remove from screenshots list
-                if 'screenshots' in meta and isinstance(meta['screenshots'], list):
-                    if filename in meta['screenshots']:
-                        meta['screenshots'].remove(filename)
-                
-                # Remove single screenshot field
-                if 'screenshot' in meta and meta['screenshot'] == filename:
-                    del meta['screenshot']
+                def remove_screenshot(meta):
+                    # Remove from screenshots list
+                    if 'screenshots' in meta and isinstance(meta['screenshots'], list):
+                        if filename in meta['screenshots']:
+                            meta['screenshots'].remove(filename)
+                    
+                    # Remove single screenshot field
+                    if 'screenshot' in meta and meta['screenshot'] == filename:
+                        del meta['screenshot']
                 
-                with open(json_path, 'w', encoding='utf-8') as f:
-                    json.dump(meta, f, indent=2, ensure_ascii=False)
+                update_json(json_path, remove_screenshot)
             
             self.send_json({'status': 'success'})
         except Exception as e:
@@ -1047,6 +1278,7 @@ class SocialMediaAPIHandler(http.server.SimpleHTTPRequestHandler):
             posts_dir.mkdir(parents=True, exist_ok=True)
             
             uploaded_files = []
+            evidence = get_evidence_writer()
             
             # Handle file(s)
             files = form.getlist('files')
@@ -1062,26 +1294,27 @@ class SocialMediaAPIHandler(http.server.SimpleHTTPRequestHandler):
                     dest_path = posts_dir / new_name
                     with open(dest_path, 'wb') as f:
                         f.write(item.file.read())
+                    evidence.add_previews(dest_path)
                     
                     uploaded_files.append(new_name)
             
+            if uploaded_files:
+                EVIDENCE_INDEX.invalidate(posts_dir)
+            
             # Update metadata
             if uploaded_files:
                 json_path = data_dir / profile / f"{post_id}.json"
                 if json_path.exists():
-                    with open(json_path, 'r', encoding='utf-8') as f:
-                        meta = json.load(f)
-                    
-                    # Migrate to screenshots list if needed
-                    if 'screenshots' not in meta or not isinstance(meta['screenshots'], list):
-                        meta['screenshots'] = []
-                        if 'screenshot' in meta and meta['screenshot']:
-                            meta['screenshots'].append(meta['screenshot'])
-                    
-                    meta['screenshots'].extend(uploaded_files)
+                    def add_screenshots(meta):
+                        # Migrate to screenshots list if needed
+                        if 'screenshots' not in meta or not isinstance(meta['screenshots'], list):
+                            meta['screenshots'] = []
+                            if 'screenshot' in meta and meta['screenshot']:
+                                meta['screenshots'].append(meta['screenshot'])
+                        
+                        meta['screenshots'].extend(uploaded_files)
                     
-                    with open(json_path, 'w', encoding='utf-8') as f:
-                        json.dump(meta, f, indent=2, ensure_ascii=False)
+                    update_json(json_path, add_screenshots)
             
             self.send_json({'status': 'success', 'uploaded': uploaded_files})
         except Exception as e:
@@ -1093,30 +1326,6 @@ class SocialMediaAPIHandler(http.server.SimpleHTTPRequestHandler):
     # GRAPH API HANDLERS
     # ==========================================
     
-    def _load_graph_nodes(self):
-        """Load graph nodes from JSON file."""
-        if GRAPH_NODES_FILE.exists():
-            with open(GRAPH_NODES_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return []
-    
-    def _save_graph_nodes(self, nodes):
-        """Save graph nodes to JSON file."""
-        with open(GRAPH_NODES_FILE, 'w', encoding='utf-8') as f:
-            json.dump(nodes, f, indent=2, ensure_ascii=False)
-    
-    def _load_graph_edges(self):
-        """Load graph edges from JSON file."""
-        if GRAPH_EDGES_FILE.exists():
-            with open(GRAPH_EDGES_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return []
-    
-    def _save_graph_edges(self, edges):
-        """Save graph edges to JSON file."""
-        with open(GRAPH_EDGES_FILE, 'w', encoding='utf-8') as f:
-            json.dump(edges, f, indent=2, ensure_ascii=False)
-    
     def handle_get_entity_types(self):
         """Get available entity types."""
         self.send_json(ENTITY_TYPES)
@@ -1128,7 +1337,7 @@ class SocialMediaAPIHandler(http.server.SimpleHTTPRequestHandler):
     def handle_get_graph_nodes(self):
         """Get all graph nodes with optional filtering."""
         try:
-            nodes = self._load_graph_nodes()
+            nodes = GRAPH_STORE.nodes()
             
             # Parse query params for filtering
             parsed = urllib.parse.urlparse(self.path)
@@ -1164,24 +1373,19 @@ class SocialMediaAPIHandler(http.server.SimpleHTTPRequestHandler):
     def handle_get_graph_edges(self):
         """Get all graph edges with optional filtering."""
         try:
-            edges = self._load_graph_edges()
-            
             # Parse query params
             parsed = urllib.parse.urlparse(self.path)
             params = urllib.parse.parse_qs(parsed.query)
             
+            # Filter by node ID (source or target) - adjacency index
+            node_id = params.get('node', [None])[0]
+            edges = GRAPH_STORE.node_edges(node_id) if node_id else GRAPH_STORE.edges()
+            
             # Filter by relationship type
             rel_type = params.get('type', [None])[0]
             if rel_type:
                 edges = [e for e in edges if e.get('relationship_type') == rel_type]
             
-            # Filter by node ID (source or target)
-            node_id = params.get('node', [None])[0]
-            if node_id:
-                edges = [e for e in edges if 
-                    e.get('source_id') == node_id or e.get('target_id') == node_id
-                ]
-            
             self.send_json(edges)
         except Exception as e:
             self.send_error_json(str(e), 500)
@@ -1189,12 +1393,12 @@ class SocialMediaAPIHandler(http.server.SimpleHTTPRequestHandler):
     def handle_get_graph_node(self, node_id):
         """Get a single graph node by ID."""
         try:
-            nodes = self._load_graph_nodes()
-            node = next((n for n in nodes if n.get('id') == node_id), None)
+            node = GRAPH_STORE.get_node(node_id)
             
             if not node:
                 self.send_error_json('Node not found', 404)
                 return
+            etag = json_etag(node)
             
             # Add entity type metadata
             et = node.get('entity_type', 'unknown')
@@ -1203,18 +1407,14 @@ class SocialMediaAPIHandler(http.server.SimpleHTTPRequestHandler):
                 node['_color'] = ENTITY_TYPES[et]['color']
                 node['_label'] = ENTITY_TYPES[et]['label']
             
-            self.send_json(node)
+            self.send_json(node, etag=etag)
         except Exception as e:
             self.send_error_json(str(e), 500)
     
     def handle_get_node_edges(self, node_id):
         """Get all edges connected to a node."""
         try:
-            edges = self._load_graph_edges()
-            node_edges = [e for e in edges if 
-                e.get('source_id') == node_id or e.get('target_id') == node_id
-            ]
-            self.send_json(node_edges)
+            self.send_json(GRAPH_STORE.node_edges(node_id))
         except Exception as e:
             self.send_error_json(str(e), 500)
     
@@ -1227,42 +1427,41 @@ class SocialMediaAPIHandler(http.server.SimpleHTTPRequestHandler):
             
             neo4j_client = get_neo4j_client()
             
-            with neo4j_client.driver.session() as session:
-                # Search in node names, descriptions, and IDs
-                # Use 'term' instead of 'query' to avoid argument name conflict in session.run()
-                result = session.run("""
-                    MATCH (n)
-                    WHERE toLower(n.name) CONTAINS toLower($term)
-                       OR toLower(n.description) CONTAINS toLower($term)
-                       OR toLower(n.id) CONTAINS toLower($term)
-                    RETURN n.id as id, n.name as name, n.entity_type as entity_type,
-                           n.description as description, labels(n) as labels
-                    LIMIT 50
-                """, term=search_query)
+            # Search in node names, descriptions, and IDs
+            # Use 'term' instead of 'query' to avoid argument name conflict in client.read()
+            result = neo4j_client.read(f"""
+                MATCH (n)
+                WHERE toLower(n.name) CONTAINS toLower($term)
+                   OR toLower(n.description) CONTAINS toLower($term)
+                   OR toLower(n.id) CONTAINS toLower($term)
+                RETURN n.id as id, n.name as name, n.entity_type as entity_type,
+                       n.description as description, [l IN labels(n) WHERE l <> '{BASE_LABEL}'] as labels
+                LIMIT 50
+            """, term=search_query)
+            
+            nodes = []
+            for record in result:
+                node = {
+                    'id': record['id'],
+                    'name': record['name'] or 'Unknown',
+                    'entity_type': record['entity_type'],
+                    'description': record['description'],
+                    'labels': record['labels']
+                }
                 
-                nodes = []
-                for record in result:
-                    node = {
-                        'id': record['id'],
-                        'name': record['name'] or 'Unknown',
-                        'entity_type': record['entity_type'],
-                        'description': record['description'],
-                        'labels': record['labels']
-                    }
-                    
-                    # Add icon based on entity type
-                    et = node.get('entity_type', 'unknown')
-                    if et in ENTITY_TYPES:
-                        node['icon'] = ENTITY_TYPES[et]['icon']
-                        node['color'] = ENTITY_TYPES[et]['color']
-                    else:
-                        node['icon'] = 'fas fa-circle'
-                        node['color'] = '#888'
-                    
-                    nodes.append(node)
+                # Add icon based on entity type
+                et = node.get('entity_type', 'unknown')
+                if et in ENTITY_TYPES:
+                    node['icon'] = ENTITY_TYPES[et]['icon']
+                    node['color'] = ENTITY_TYPES[et]['color']
+                else:
+                    node['icon'] = 'fas fa-circle'
+                    node['color'] = '#888'
                 
-                print(f"[SEARCH] Found {len(nodes)} results for query: {search_query}")
-                self.send_json(nodes)
+                nodes.append(node)
+            
+            print(f"[SEARCH] Found {len(nodes)} results for query: {search_query}")
+            self.send_json(nodes)
         except Exception as e:
             print(f"[SEARCH ERROR] {e}")
             self.send_error_json(str(e), 500)
@@ -1305,11 +1504,8 @@ class SocialMediaAPIHandler(http.server.SimpleHTTPRequestHandler):
                 name_slug = re.sub(r'[^a-z0-9]+', '-', name.lower())[:30]
                 node_id = f"{prefix}-{name_slug}"
             
-            # Load existing nodes
-            nodes = self._load_graph_nodes()
-            
             # Check for duplicate ID
-            if any(n.get('id') == node_id for n in nodes):
+            if GRAPH_STORE.has_node(node_id):
                 # Add suffix to make unique
                 node_id = f"{node_id}-{str(uuid.uuid4())[:6]}"
             
@@ -1358,13 +1554,12 @@ class SocialMediaAPIHandler(http.server.SimpleHTTPRequestHandler):
                 if key not in new_node and key not in ['_icon', '_color', '_label']:
                     new_node[key] = value
             
-            nodes.append(new_node)
-            self._save_graph_nodes(nodes)
+            GRAPH_STORE.add_node(new_node)
             
             self.send_json({
                 'status': 'success',
                 'node': new_node
-            })
+            }, etag=json_etag(new_node))
         except Exception as e:
             import traceback
             traceback.print_exc()
@@ -1377,56 +1572,40 @@ class SocialMediaAPIHandler(http.server.SimpleHTTPRequestHandler):
             post_data = self.rfile.read(content_length)
             data = json.loads(post_data.decode('utf-8'))
             
-            nodes = self._load_graph_nodes()
-            node_idx = next((i for i, n in enumerate(nodes) if n.get('id') == node_id), None)
+            # Update fields
+            fields = {key: value for key, value in data.items()
+                      if key != 'id' and key not in ['_icon', '_color', '_label']}
+            node = GRAPH_STORE.update_node(node_id, fields, if_match=self.if_match())
             
-            if node_idx is None:
+            if node is None:
                 self.send_error_json('Node not found', 404)
                 return
             
-            # Update fields
-            for key, value in data.items():
-                if key != 'id' and key not in ['_icon', '_color', '_label']:
-                    nodes[node_idx][key] = value
-            
-            self._save_graph_nodes(nodes)
-            
             self.send_json({
                 'status': 'success',
-                'node': nodes[node_idx]
-            })
+                'node': node
+            }, etag=json_etag(node))
+        except VersionConflict as e:
+            self.send_conflict(e)
         except Exception as e:
             self.send_error_json(str(e), 500)
     
     def handle_delete_graph_node(self, node_id):
         """Delete a graph node (and related edges)."""
         try:
-            nodes = self._load_graph_nodes()
-            edges = self._load_graph_edges()
-            
-            # Find node
-            node_idx = next((i for i, n in enumerate(nodes) if n.get('id') == node_id), None)
-            if node_idx is None:
+            # Delete node with related edges
+            deleted_node, edges_removed = GRAPH_STORE.delete_node(node_id, if_match=self.if_match())
+            if deleted_node is None:
                 self.send_error_json('Node not found', 404)
                 return
             
-            deleted_node = nodes.pop(node_idx)
-            
-            # Remove related edges
-            edges_before = len(edges)
-            edges = [e for e in edges if 
-                e.get('source_id') != node_id and e.get('target_id') != node_id
-            ]
-            edges_removed = edges_before - len(edges)
-            
-            self._save_graph_nodes(nodes)
-            self._save_graph_edges(edges)
-            
             self.send_json({
                 'status': 'success',
                 'deleted_node': deleted_node,
                 'edges_removed': edges_removed
             })
+        except VersionConflict as e:
+            self.send_conflict(e)
         except Exception as e:
             self.send_error_json(str(e), 500)
     
@@ -1445,10 +1624,9 @@ class SocialMediaAPIHandler(http.server.SimpleHTTPRequestHandler):
                 self.send_error_json('Missing source_id, target_id, or relationship_type', 400)
                 return
             
-            # Load nodes to get names
-            nodes = self._load_graph_nodes()
-            source_node = next((n for n in nodes if n.get('id') == source_id), None)
-            target_node = next((n for n in nodes if n.get('id') == target_id), None)
+            # Look up nodes to get names
+            source_node = GRAPH_STORE.get_node(source_id)
+            target_node = GRAPH_STORE.get_node(target_id)
             
             if not source_node:
                 self.send_error_json(f'Source node not found: {source_id}', 404)
@@ -1457,13 +1635,11 @@ class SocialMediaAPIHandler(http.server.SimpleHTTPRequestHandler):
                 self.send_error_json(f'Target node not found: {target_id}', 404)
                 return
             
-            edges = self._load_graph_edges()
-            
             # Generate edge ID
             edge_id = data.get('id') or f"rel-{source_id}-{target_id}-{relationship_type.lower()}"
             
             # Check for duplicate
-            if any(e.get('id') == edge_id for e in edges):
+            if GRAPH_STORE.get_edge(edge_id):
                 edge_id = f"{edge_id}-{str(uuid.uuid4())[:6]}"
             
             new_edge = {
@@ -1478,13 +1654,12 @@ class SocialMediaAPIHandler(http.server.SimpleHTTPRequestHandler):
                 'evidence': data.get('evidence', '')
             }
             
-            edges.append(new_edge)
-            self._save_graph_edges(edges)
+            GRAPH_STORE.add_edge(new_edge)
             
             self.send_json({
                 'status': 'success',
                 'edge': new_edge
-            })
+            }, etag=json_etag(new_edge))
         except Exception as e:
             import traceback
             traceback.print_exc()
@@ -1500,6 +1675,9 @@ class SocialMediaAPIHandler(http.server.SimpleHTTPRequestHandler):
                 self.send_error_json('Script load_to_neo4j.py not found', 404)
                 return
             
+            # The loader reads the JSON files - write pending journal entries first
+            GRAPH_STORE.compact()
+            
             # Run the script
             result = subprocess.run(
                 ['python', str(script_path)],
@@ -1536,57 +1714,56 @@ class SocialMediaAPIHandler(http.server.SimpleHTTPRequestHandler):
             post_data = self.rfile.read(content_length)
             data = json.loads(post_data.decode('utf-8'))
             
-            edges = self._load_graph_edges()
-            edge_idx = next((i for i, e in enumerate(edges) if e.get('id') == edge_id), None)
+            # Update fields
+            edge = GRAPH_STORE.update_edge(edge_id, {key: value for key, value in data.items() if key != 'id'},
+                                           if_match=self.if_match())
             
-            if edge_idx is None:
+            if edge is None:
                 self.send_error_json('Edge not found', 404)
                 return
             
-            # Update fields
-            for key, value in data.items():
-                if key != 'id':
-                    edges[edge_idx][key] = value
-            
-            self._save_graph_edges(edges)
-            
             self.send_json({
                 'status': 'success',
-                'edge': edges[edge_idx]
-            })
+                'edge': edge
+            }, etag=json_etag(edge))
+        except VersionConflict as e:
+            self.send_conflict(e)
         except Exception as e:
             self.send_error_json(str(e), 500)
     
     def handle_delete_graph_edge(self, edge_id):
         """Delete a graph edge."""
         try:
-            edges = self._load_graph_edges()
-            edge_idx = next((i for i, e in enumerate(edges) if e.get('id') == edge_id), None)
+            deleted_edge = GRAPH_STORE.delete_edge(edge_id, if_match=self.if_match())
             
-            if edge_idx is None:
+            if deleted_edge is None:
                 self.send_error_json('Edge not found', 404)
                 return
             
-            deleted_edge = edges.pop(edge_idx)
-            self._save_graph_edges(edges)
-            
             self.send_json({
                 'status': 'success',
                 'deleted_edge': deleted_edge
             })
+        except VersionConflict as e:
+            self.send_conflict(e)
         except Exception as e:
             self.send_error_json(str(e), 500)
     
     def handle_data_file(self):
-        """Serve static data files (evidence images)."""
+        """
+        Serve static data files (evidence images), streamed in chunks.
+        ETag / Last-Modified let the browser revalidate with a 304 instead of
+        downloading the file again.
+        """
         try:
             # Parse path: /data/evidence/instagram/profile/posts/file.jpg
-            path = urllib.parse.unquote(self.path)
+            path = urllib.parse.unquote(urllib.parse.urlparse(self.path).path)
             # Remove /data prefix and map to actual path
             relative_path = path[5:]  # Remove /data
-            file_path = PROJECT_ROOT / "data" / relative_path.lstrip('/')
+            data_root = (PROJECT_ROOT / "data").resolve()
+            file_path = (data_root / relative_path.lstrip('/')).resolve()
             
-            if not file_path.exists():
+            if data_root not in file_path.parents or not file_path.is_file():
                 self.send_error(404, 'File not found')
                 return
             
@@ -1598,22 +1775,36 @@ class SocialMediaAPIHandler(http.server.SimpleHTTPRequestHandler):
                 '.png': 'image/png',
                 '.gif': 'image/gif',
                 '.webp': 'image/webp',
+                '.avif': 'image/avif',
                 '.heic': 'image/heic'
             }
             content_type = content_types.get(ext, 'application/octet-stream')
             
+            st = file_path.stat()
+            etag = f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+            last_modified = self.date_time_string(int(st.st_mtime))
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.send_header('Cache-Control', 'max-age=3600')
+                self.end_headers()
+                return
+            
             self.send_response(200)
             self.send_header('Content-Type', content_type)
-            self.send_header('Content-Length', file_path.stat().st_size)
+            self.send_header('Content-Length', str(st.st_size))
+            self.send_header('ETag', etag)
+            self.send_header('Last-Modified', last_modified)
             self.send_header('Cache-Control', 'max-age=3600')
             self.end_headers()
             
             with open(file_path, 'rb') as f:
-                self.wfile.write(f.read())
+                shutil.copyfileobj(f, self.wfile, 64 * 1024)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
         except Exception as e:
             self.send_error(500, str(e))
 
-
 def run_server():
     """Start the server."""
     print(f"=" * 60)
@@ -1635,6 +1826,8 @@ def run_server():
     class ThreadedTCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
         allow_reuse_address = True
         daemon_threads = True
+        # File writes are locked and atomic, so concurrent saves are safe
+        request_queue_size = 64
     
     with ThreadedTCPServer(("", PORT), SocialMediaAPIHandler) as httpd:
         httpd.serve_forever()
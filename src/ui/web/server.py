@@ -2,23 +2,34 @@ import http.server
 import socketserver
 import json
 import os
-from neo4j import GraphDatabase
 from dotenv import load_dotenv
 from pathlib import Path
 import mimetypes
+import sys
 
 # Load env vars from project root
 project_root = Path(__file__).parent.parent.parent.parent
 load_dotenv(project_root / ".env")
 
+sys.path.insert(0, str(project_root / "src"))
+
+from graph.graph_export import BASE_LABEL, fetch_graph
+from graph.neo4j_client import get_client
+from graph.neighbourhood import DEFAULT_MAX_DEGREE, DEFAULT_MAX_NODES, fetch_neighbourhood
+
 PORT = 8082
+# /api/graph relationship cap: default when ?limit is missing, and the maximum
+DEFAULT_GRAPH_LIMIT = 500
+MAX_GRAPH_LIMIT = 20000
 WEB_DIR = Path(__file__).parent
 
 import urllib.parse
 
 class Handler(http.server.SimpleHTTPRequestHandler):
     def do_GET(self):
-        if self.path == '/api/graph':
+        if self.path.startswith('/api/graph/neighbourhood'):
+            self.handle_api_neighbourhood()
+        elif self.path == '/api/graph' or self.path.startswith('/api/graph?'):
             self.handle_api_graph()
         elif self.path.startswith('/data/'):
             self.handle_data_file()
@@ -156,12 +167,53 @@ class Handler(http.server.SimpleHTTPRequestHandler):
 
     def handle_api_graph(self):
         try:
-            data = get_graph_data()
+            # ?limit=N caps relationships (and isolated nodes); the full graph is
+            # exported by scripts/export_graph_to_json.py, not served here
+            query = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
+            limit = int(query['limit'][0]) if query.get('limit') else DEFAULT_GRAPH_LIMIT
+            data = get_graph_data(max(1, min(limit, MAX_GRAPH_LIMIT)))
             self.send_response(200)
             self.send_header('Content-type', 'application/json')
             self.send_header('Access-Control-Allow-Origin', '*')
             self.end_headers()
-            self.wfile.write(json.dumps(data).encode('utf-8'))
+            self.wfile.write(json.dumps(data, default=str).encode('utf-8'))
+        except Exception as e:
+            self.send_error(500, str(e))
+
+    def handle_api_neighbourhood(self):
+        # ?id=...&depth=k&max_nodes=N&max_degree=N&types=Person,Event&rel_types=SPEAKER_AT
+        try:
+            query = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
+            node_id = query.get('id', [None])[0]
+            if not node_id:
+                self.send_error(400, "Missing id")
+                return
+
+            def int_param(name, default):
+                return int(query[name][0]) if query.get(name) else default
+
+            def list_param(name):
+                value = query.get(name, [''])[0]
+                return [v for v in value.split(',') if v] or None
+
+            data = get_neighbourhood(
+                node_id,
+                depth=int_param('depth', 1),
+                max_nodes=int_param('max_nodes', DEFAULT_MAX_NODES),
+                max_degree=int_param('max_degree', DEFAULT_MAX_DEGREE),
+                labels=list_param('types'),
+                rel_types=list_param('rel_types')
+            )
+            if data is None:
+                self.send_error(404, "Node not found")
+                return
+            self.send_response(200)
+            self.send_header('Content-type', 'application/json')
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+            self.wfile.write(json.dumps(data, default=str).encode('utf-8'))
+        except ValueError as e:
+            self.send_error(400, str(e))
         except Exception as e:
             self.send_error(500, str(e))
 
@@ -187,103 +239,46 @@ class Handler(http.server.SimpleHTTPRequestHandler):
             print(f"File not found: {file_path}")
             self.send_error(404, "File not found")
 
-def get_driver():
-    uri = os.getenv("NEO4J_URI")
-    user = os.getenv("NEO4J_USER")
-    password = os.getenv("NEO4J_PASSWORD")
-    if not uri or not user or not password:
+def get_neo4j():
+    """Shared pooled client (None without credentials)."""
+    try:
+        return get_client()
+    except RuntimeError:
         return None
-    return GraphDatabase.driver(uri, auth=(user, password))
 
-def get_graph_data(limit=10000):
-    driver = get_driver()
-    if not driver:
-        return {"nodes": [], "links": []}
-
-    nodes = {}
-    links = []
-
-    def process_node(node):
-        nid = node.element_id if hasattr(node, 'element_id') else str(node.id)
-        # prefer explicit 'id' property if present
-        try:
-            if 'id' in node:
-                nid = node['id']
-        except Exception:
-            pass
-        props = dict(node)
-        return nid, {
-            "id": nid,
-            "name": node.get("name", node.get("title", "Unknown")),
-            "group": list(node.labels)[0] if node.labels else "Unknown",
-            "properties": props
-        }
-
-    with driver.session() as session:
-        # 1) Fetch standalone nodes (limit applied)
-        node_query = """
-        MATCH (n)
-        RETURN n
-        LIMIT $limit
-        """
-        try:
-            results = session.run(node_query, limit=limit)
-            for rec in results:
-                n = rec['n']
-                nid, nobj = process_node(n)
-                if nid not in nodes:
-                    nodes[nid] = nobj
-        except Exception as e:
-            # fallback: ignore node-only query failures
-            print(f"Warning fetching nodes: {e}")
-
-        # 2) Fetch relationships and ensure connected nodes are present
-        rel_query = """
-        MATCH (s)-[r]->(t)
-        RETURN s, r, t
-        LIMIT $limit
-        """
-        result = session.run(rel_query, limit=limit)
-        for record in result:
-            s = record['s']
-            t = record['t']
-            r = record['r']
-
-            src_id, src_node = process_node(s)
-            tgt_id, tgt_node = process_node(t)
+def node_group(node):
+    """Type label of a node (the shared BASE_LABEL is skipped)."""
+    labels = [l for l in node.labels if l != BASE_LABEL]
+    return labels[0] if labels else "Unknown"
 
-            if src_id not in nodes:
-                nodes[src_id] = src_node
-            if tgt_id not in nodes:
-                nodes[tgt_id] = tgt_node
-
-            links.append({
-                "source": src_id,
-                "target": tgt_id,
-                "type": r.type,
-                "properties": dict(r)
-            })
+def get_graph_data(limit=DEFAULT_GRAPH_LIMIT):
+    client = get_neo4j()
+    if not client:
+        return {"nodes": [], "links": []}
+    return fetch_graph(client.driver, limit=limit)
 
-    driver.close()
-    return {"nodes": list(nodes.values()), "links": links}
+def get_neighbourhood(node_id, **options):
+    client = get_neo4j()
+    if not client:
+        raise Exception("Database connection failed")
+    return fetch_neighbourhood(client, node_id, **options)
 
 def update_node_properties(node_id, properties):
-    driver = get_driver()
-    if not driver:
+    client = get_neo4j()
+    if not client:
         raise Exception("Database connection failed")
         
-    query = """
-    MATCH (n {id: $id})
+    query = f"""
+    MATCH (n:{BASE_LABEL} {{id: $id}})
     SET n += $props
     RETURN n
     """
     
-    with driver.session() as session:
-        session.run(query, id=node_id, props=properties)
+    client.write(query, id=node_id, props=properties)
 
 def create_node_in_db(data):
-    driver = get_driver()
-    if not driver:
+    client = get_neo4j()
+    if not client:
         raise Exception("Database connection failed")
     
     # data: {id, group, properties}
@@ -301,17 +296,16 @@ def create_node_in_db(data):
     # Dynamic label in Cypher requires APOC or string formatting (risky if not sanitized)
     # Using string formatting with sanitized label
     query = f"""
-    MERGE (n:{label} {{id: $id}})
-    SET n += $props
+    MERGE (n:{BASE_LABEL} {{id: $id}})
+    SET n:{label}, n += $props
     RETURN n
     """
     
-    with driver.session() as session:
-        session.run(query, id=node_id, props=props)
+    client.write(query, id=node_id, props=props)
 
 def create_edge_in_db(data):
-    driver = get_driver()
-    if not driver:
+    client = get_neo4j()
+    if not client:
         raise Exception("Database connection failed")
         
     source_id = data.get('source')
@@ -324,32 +318,30 @@ def create_edge_in_db(data):
         rel_type = "RELATED_TO"
         
     query = f"""
-    MATCH (s {{id: $source_id}})
-    MATCH (t {{id: $target_id}})
+    MATCH (s:{BASE_LABEL} {{id: $source_id}})
+    MATCH (t:{BASE_LABEL} {{id: $target_id}})
     MERGE (s)-[r:{rel_type}]->(t)
     SET r += $props
     RETURN r
     """
     
-    with driver.session() as session:
-        session.run(query, source_id=source_id, target_id=target_id, props=props)
+    client.write(query, source_id=source_id, target_id=target_id, props=props)
 
 def delete_node_in_db(node_id):
-    driver = get_driver()
-    if not driver:
+    client = get_neo4j()
+    if not client:
         raise Exception("Database connection failed")
         
-    query = """
-    MATCH (n {id: $id})
+    query = f"""
+    MATCH (n:{BASE_LABEL} {{id: $id}})
     DETACH DELETE n
     """
     
-    with driver.session() as session:
-        session.run(query, id=node_id)
+    client.write(query, id=node_id)
 
 def delete_edge_in_db(data):
-    driver = get_driver()
-    if not driver:
+    client = get_neo4j()
+    if not client:
         raise Exception("Database connection failed")
         
     source_id = data.get('source')
@@ -363,24 +355,23 @@ def delete_edge_in_db(data):
         raise Exception("Invalid relationship type")
 
     query = f"""
-    MATCH (s {{id: $source_id}})-[r:{rel_type}]->(t {{id: $target_id}})
+    MATCH (s:{BASE_LABEL} {{id: $source_id}})-[r:{rel_type}]->(t:{BASE_LABEL} {{id: $target_id}})
     DELETE r
     """
     
-    with driver.session() as session:
-        session.run(query, source_id=source_id, target_id=target_id)
+    client.write(query, source_id=source_id, target_id=target_id)
 
 def find_node_in_db(node_id):
-    driver = get_driver()
-    if not driver:
+    client = get_neo4j()
+    if not client:
         raise Exception("Database connection failed")
 
-    query = """
-    MATCH (n {id: $id})
+    query = f"""
+    MATCH (n:{BASE_LABEL} {{id: $id}})
     RETURN n
     LIMIT 1
     """
-    with driver.session() as session:
+    with client.session() as session:
         result = session.run(query, id=node_id)
         for record in result:
             node = record['n']
@@ -389,7 +380,7 @@ def find_node_in_db(node_id):
             return {
                 'id': nid,
                 'name': node.get('name', nid),
-                'group': list(node.labels)[0] if node.labels else 'Unknown',
+                'group': node_group(node),
                 'properties': props
             }
     return None